@@ -16,6 +16,12 @@ class Settings(BaseSettings):
     database_max_overflow: int = 20
     database_pool_timeout: int = 30
     database_pool_recycle: int = 3600
+    # SQLite file databases
+    sqlite_journal_mode: str = "WAL"  # Readers don't block the writer; DELETE on network filesystems
+    sqlite_synchronous: str = "NORMAL"  # Safe with WAL; a power loss may drop only the last commits
+    sqlite_cache_size_kb: int = 16 * 1024  # Page cache per connection
+    sqlite_mmap_size_mb: int = 256
+    sqlite_busy_timeout_ms: int = 5000  # Wait for the write lock instead of failing
     
     # Security
     secret_key: str = secrets.token_urlsafe(32)
@@ -35,10 +41,17 @@ class Settings(BaseSettings):
     rate_limit_window: int = 60
     ai_rate_limit_requests: int = 10
     ai_rate_limit_window: int = 300
+    ai_token_budget: int = 500_000  # Claude tokens per client
+    ai_token_budget_window: int = 3600
+    rate_limit_backend: str = "memory"  # memory (per worker) or sqlite (shared across workers)
+    rate_limit_storage_path: str = "./rate_limits.db"
     
     # File Upload
     max_file_size: int = 10 * 1024 * 1024  # 10MB
     allowed_file_types: List[str] = [".pdf", ".docx", ".txt", ".md", ".xlsx"]
+    parser_pool_workers: int = 2  # 0 parses in a thread instead of worker processes
+    parser_timeout_seconds: int = 120  # per file
+    parser_memory_limit_mb: int = 1024  # per worker process, plus the file parsed (POSIX only)
     
     # Logging
     log_level: str = "INFO"
@@ -48,6 +61,7 @@ class Settings(BaseSettings):
     enable_compression: bool = True
     enable_caching: bool = True
     cache_ttl: int = 300  # 5 minutes
+    draft_flush_interval_seconds: float = 2.0  # Autosaves are written to the database at most this often
     
     class Config:
         env_file = ".env"
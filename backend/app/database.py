@@ -1,44 +1,134 @@
-from sqlalchemy import create_engine, event
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
-from sqlalchemy.pool import StaticPool, QueuePool
-from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool, QueuePool
+from sqlalchemy.engine import Engine, URL, make_url
 from contextlib import contextmanager
+from pathlib import Path
 import logging
 from .config import get_settings
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
-# Configure engine based on database type
-if "sqlite" in settings.database_url:
-    engine = create_engine(
-        settings.database_url,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        pool_pre_ping=True,
-        echo=settings.debug
+
+def _set_sqlite_pragmas(dbapi_connection, in_memory: bool):
+    cursor = dbapi_connection.cursor()
+    # Enable foreign key constraints for SQLite
+    cursor.execute("PRAGMA foreign_keys=ON")
+    if not in_memory:
+        # WAL lets readers run alongside the single writer
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+        cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size_mb * 1024 * 1024}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def create_db_engine(database_url: str) -> Engine:
+    """Create an engine configured for the database type."""
+    if "sqlite" not in database_url:
+        return create_engine(
+            database_url,
+            poolclass=QueuePool,
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout,
+            pool_recycle=settings.database_pool_recycle,
+            pool_pre_ping=True,
+            echo=settings.debug
+        )
+    
+    # In-memory databases exist per connection and can't be pooled
+    in_memory = make_url(database_url).database in (None, "", ":memory:")
+    if in_memory:
+        sqlite_engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+            echo=settings.debug
+        )
+    else:
+        # Each session checks out its own connection, so requests on
+        # different threads don't share (and serialise on) one connection.
+        # Connections move between threads only while idle in the pool.
+        sqlite_engine = create_engine(
+            database_url,
+            connect_args={
+                "check_same_thread": False,
+                "timeout": settings.sqlite_busy_timeout_ms / 1000
+            },
+            poolclass=QueuePool,
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout,
+            echo=settings.debug
+        )
+    event.listen(
+        sqlite_engine, "connect",
+        lambda dbapi_connection, connection_record: _set_sqlite_pragmas(dbapi_connection, in_memory)
     )
-else:
-    engine = create_engine(
-        settings.database_url,
-        poolclass=QueuePool,
-        pool_size=settings.database_pool_size,
-        max_overflow=settings.database_max_overflow,
-        pool_timeout=settings.database_pool_timeout,
-        pool_recycle=settings.database_pool_recycle,
-        pool_pre_ping=True,
-        echo=settings.debug
+    return sqlite_engine
+
+
+# Async drivers for the database types the sync engine supports
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(database_url: str) -> URL:
+    """The database URL with the async driver of its database type."""
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def create_async_db_engine(database_url: str) -> AsyncEngine:
+    """Create an async engine, configured like create_db_engine(), for async endpoints."""
+    url = async_database_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return create_async_engine(
+            url,
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout,
+            pool_recycle=settings.database_pool_recycle,
+            pool_pre_ping=True,
+            echo=settings.debug
+        )
+    
+    in_memory = url.database in (None, "", ":memory:")
+    if in_memory:
+        # A separate database from the sync engine's: async endpoints need a file database
+        logger.warning("Async endpoints don't share in-memory SQLite databases; use a file database")
+        async_engine = create_async_engine(url, poolclass=StaticPool, echo=settings.debug)
+    else:
+        async_engine = create_async_engine(
+            url,
+            connect_args={"timeout": settings.sqlite_busy_timeout_ms / 1000},
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout,
+            echo=settings.debug
+        )
+    event.listen(
+        async_engine.sync_engine, "connect",
+        lambda dbapi_connection, connection_record: _set_sqlite_pragmas(dbapi_connection, in_memory)
     )
+    return async_engine
 
-# Enable foreign key constraints for SQLite
-@event.listens_for(Engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    if "sqlite" in settings.database_url:
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
 
+engine = create_db_engine(settings.database_url)
+async_engine = create_async_db_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Loaded attributes stay readable after commit; reloading them would need an await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 class Base(DeclarativeBase):
@@ -59,6 +149,17 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency to get an async database session, for async endpoints."""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            await db.rollback()
+            raise
+
+
 @contextmanager
 def get_db_context():
     """Context manager for database operations."""
@@ -74,10 +175,32 @@ def get_db_context():
         db.close()
 
 
+MIGRATIONS_CONFIG = Path(__file__).resolve().parent.parent / "alembic.ini"
+# Schema of databases created with create_all() before there were migrations
+BASELINE_REVISION = "0001"
+
+
+def migrate_db(bind: Engine, revision: str = "head"):
+    """
+    Upgrade the database schema to a migration revision.
+    
+    Databases created with create_all() before there were migrations are
+    stamped with the baseline revision first, so only later ones run.
+    """
+    config = Config(str(MIGRATIONS_CONFIG))
+    with bind.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+        if tables and "alembic_version" not in tables:
+            logger.info(f"Stamping existing database with baseline revision {BASELINE_REVISION}")
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
+
+
 def init_db():
-    """Initialize database tables."""
+    """Create or upgrade the database schema."""
     try:
-        Base.metadata.create_all(bind=engine)
+        migrate_db(engine)
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
@@ -88,7 +211,7 @@ def check_db_connection():
     """Check database connection health."""
     try:
         with engine.connect() as conn:
-            conn.execute("SELECT 1")
+            conn.execute(text("SELECT 1"))
         return True
     except Exception as e:
         logger.error(f"Database connection check failed: {e}")
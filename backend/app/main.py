@@ -10,7 +10,9 @@ import logging
 import time
 import uvicorn
 from .config import get_settings
-from .database import init_db, check_db_connection
+from .database import init_db, check_db_connection, async_engine
+from .utils.parse_pool import parser_pool
+from .services.draft_buffer import draft_buffer
 from .routers import (
     projects_router,
     step1_router,
@@ -21,6 +23,8 @@ from .routers import (
 from .routers.drafts import router as drafts_router
 from .routers.documents import router as documents_router
 from .routers.downloads import router as downloads_router
+from .routers.portfolio import router as portfolio_router
+from .routers.search import router as search_router
 
 settings = get_settings()
 
@@ -47,10 +51,17 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}")
         raise
     
+    # Warm up document parser processes before the first upload
+    parser_pool.start()
+    draft_buffer.start()
+    
     yield
     
     # Shutdown
     logger.info(f"Shutting down {settings.app_name}...")
+    await draft_buffer.shutdown()
+    parser_pool.shutdown()
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -78,8 +89,9 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -107,6 +119,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
             "message": exc.detail,
             "status_code": exc.status_code
         },
+        headers=getattr(exc, "headers", None),
     )
 
 
@@ -144,6 +157,8 @@ app.include_router(projects_router)
 app.include_router(drafts_router)
 app.include_router(documents_router)
 app.include_router(downloads_router)
+app.include_router(portfolio_router)
+app.include_router(search_router)
 app.include_router(step1_router)
 app.include_router(step2_router)
 app.include_router(step3_router)
@@ -1,60 +1,191 @@
 from fastapi import Request, HTTPException, status
-from datetime import datetime, timedelta, timezone
-from collections import defaultdict
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, Optional, Tuple
+import logging
+import math
+import sqlite3
 import threading
+import time
+from ..config import get_settings
+from .rate_limit_store import SQLiteRateLimitStore
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
 
-# Simple in-memory rate limiter (for production use Redis)
 class RateLimiter:
-    def __init__(self):
-        self.requests = defaultdict(list)
+    """
+    In-memory rate limiter based on GCRA (Generic Cell Rate Algorithm).
+
+    Each key holds a single float - its theoretical arrival time (TAT) on the
+    monotonic clock - instead of a list of request timestamps, so memory per
+    key is constant and every check is O(1). Keys whose TAT has passed are
+    fully replenished and carry no information; they are evicted by a
+    periodic sweep so scans from many distinct IPs cannot grow the table
+    without bound.
+
+    With a shared store, the local table acts as a fast path: it mirrors the
+    last TAT this worker saw in the store and rejects without a store
+    round-trip. Requests only move the shared TAT forward, but refunds (see
+    adjust) move it back, and a refund made by another worker is only seen
+    here on the next store check. Until then a local rejection can be
+    stricter than the shared state, by at most the amount refunded, and its
+    Retry-After that much too long; the limit itself is never exceeded.
+    """
+
+    def __init__(
+        self,
+        cleanup_interval: float = 60.0,
+        clock=time.monotonic,
+        store: Optional[SQLiteRateLimitStore] = None
+    ):
+        self.tats: Dict[str, float] = {}
         self.lock = threading.Lock()
-    
+        self.cleanup_interval = cleanup_interval
+        self.clock = clock
+        self.store = store
+        self._next_cleanup = clock() + cleanup_interval
+
+    def check(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int,
+        cost: float = 1
+    ) -> Tuple[bool, int]:
+        """
+        Check and record a request.
+
+        Allows bursts of up to max_requests and a sustained rate of
+        max_requests per window_seconds. A request with cost n counts as n
+        requests, which lets the same limiter meter e.g. tokens.
+
+        Returns:
+            Tuple of (allowed, retry_after_seconds)
+        """
+        emission_interval = window_seconds / max_requests
+        now = self.clock()
+
+        with self.lock:
+            if now >= self._next_cleanup:
+                self._evict_idle(now)
+
+            tat = max(self.tats.get(key, now), now)
+            new_tat = tat + emission_interval * cost
+
+            # Request would push the key past its burst allowance
+            if new_tat - now > window_seconds:
+                retry_after = new_tat - window_seconds - now
+                return False, max(1, math.ceil(retry_after))
+
+            if self.store is None:
+                self.tats[key] = new_tat
+                return True, 0
+
+        try:
+            allowed, backlog = self.store.acquire(key, emission_interval, window_seconds, cost)
+        except sqlite3.Error as e:
+            # Fail open to the per-process limit rather than rejecting traffic
+            logger.warning(f"Shared rate limit store unavailable, using local state: {e}")
+            with self.lock:
+                self.tats[key] = max(self.tats.get(key, now), now) + emission_interval * cost
+            return True, 0
+
+        with self.lock:
+            self.tats[key] = max(self.tats.get(key, now), now + backlog)
+
+        if not allowed:
+            retry_after = backlog + emission_interval * cost - window_seconds
+            return False, max(1, math.ceil(retry_after))
+        return True, 0
+
+    def adjust(self, key: str, max_requests: int, window_seconds: int, delta: float):
+        """
+        Charge (positive delta) or refund (negative delta) a key without a
+        limit check, e.g. to replace an estimated cost with the actual one.
+        """
+        emission_interval = window_seconds / max_requests
+        now = self.clock()
+
+        if self.store is not None:
+            try:
+                backlog = self.store.adjust(key, emission_interval, delta)
+                with self.lock:
+                    self.tats[key] = now + backlog
+                return
+            except sqlite3.Error as e:
+                logger.warning(f"Shared rate limit store unavailable, using local state: {e}")
+
+        with self.lock:
+            tat = max(self.tats.get(key, now), now)
+            self.tats[key] = max(tat + emission_interval * delta, now)
+
     def is_allowed(self, key: str, max_requests: int, window_seconds: int) -> bool:
         """Check if request is allowed based on rate limit."""
-        now = datetime.now(timezone.utc)
-        cutoff = now - timedelta(seconds=window_seconds)
-        
-        with self.lock:
-            # Clean old requests
-            self.requests[key] = [
-                req_time for req_time in self.requests[key]
-                if req_time > cutoff
-            ]
-            
-            # Check if limit exceeded
-            if len(self.requests[key]) >= max_requests:
-                return False
-            
-            # Add current request
-            self.requests[key].append(now)
-            return True
-    
+        allowed, _ = self.check(key, max_requests, window_seconds)
+        return allowed
+
     def get_retry_after(self, key: str, window_seconds: int) -> int:
-        """Get seconds until rate limit resets."""
-        if not self.requests[key]:
+        """Get seconds until the key is fully replenished."""
+        with self.lock:
+            tat = self.tats.get(key)
+        if tat is None:
             return 0
-        
-        oldest = min(self.requests[key])
-        reset_time = oldest + timedelta(seconds=window_seconds)
-        retry_after = (reset_time - datetime.now(timezone.utc)).total_seconds()
-        return max(0, int(retry_after))
+        return max(0, math.ceil(tat - self.clock()))
+
+    def _evict_idle(self, now: float):
+        """Drop keys whose allowance is fully replenished. Caller holds the lock."""
+        idle_keys = [key for key, tat in self.tats.items() if tat <= now]
+        for key in idle_keys:
+            del self.tats[key]
+        self._next_cleanup = now + self.cleanup_interval
+
+    def cleanup(self):
+        """Force eviction of idle keys."""
+        with self.lock:
+            self._evict_idle(self.clock())
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get limiter statistics."""
+        with self.lock:
+            return {"tracked_keys": len(self.tats)}
+
+
+def _create_rate_limiter() -> RateLimiter:
+    """Create the limiter for the configured backend."""
+    if settings.rate_limit_backend == "sqlite":
+        store = SQLiteRateLimitStore(settings.rate_limit_storage_path)
+        logger.info(f"Using shared SQLite rate limit store: {settings.rate_limit_storage_path}")
+        return RateLimiter(store=store)
+    return RateLimiter()
 
 # Global rate limiter instance
-rate_limiter = RateLimiter()
+rate_limiter = _create_rate_limiter()
 
 
-def rate_limit(max_requests: int = 60, window_seconds: int = 60):
+def rate_limit(max_requests: int = 60, window_seconds: int = 60, scope: Optional[str] = None):
     """
     Rate limiting decorator.
     Default: 60 requests per minute per IP.
+
+    Each scope keeps its own allowance per IP, so e.g. auth attempts do not
+    consume the AI analysis budget.
     """
+    scope = scope or f"{max_requests}/{window_seconds}"
+
     async def dependency(request: Request):
         # Get client IP
         client_ip = request.client.host if request.client else "unknown"
-        
-        # Check rate limit
-        if not rate_limiter.is_allowed(client_ip, max_requests, window_seconds):
-            retry_after = rate_limiter.get_retry_after(client_ip, window_seconds)
+        key = f"{scope}:{client_ip}"
+
+        # Check rate limit (shared store does blocking I/O, keep it off the event loop)
+        if rate_limiter.store is None:
+            allowed, retry_after = rate_limiter.check(key, max_requests, window_seconds)
+        else:
+            allowed, retry_after = await run_in_threadpool(
+                rate_limiter.check, key, max_requests, window_seconds
+            )
+        if not allowed:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail={
@@ -64,13 +195,68 @@ def rate_limit(max_requests: int = 60, window_seconds: int = 60):
                 },
                 headers={"Retry-After": str(retry_after)}
             )
-        
+
         return True
-    
+
+    return dependency
+
+
+class TokenBudget:
+    """
+    Token budget of one client for the duration of a request.
+
+    Handlers reserve the estimated token cost before calling Claude and
+    settle with the actual usage afterwards, so expensive calls (e.g. Step 3
+    over many processes) draw down the budget proportionally.
+    """
+
+    def __init__(self, key: str, budget_tokens: int, window_seconds: int):
+        self.key = key
+        self.budget_tokens = budget_tokens
+        self.window_seconds = window_seconds
+        self.reserved = 0
+
+    def reserve(self, tokens: int):
+        """Reserve estimated tokens or raise 429 with the time until they refill."""
+        # A single call larger than the whole budget can run once it is full
+        tokens = min(tokens, self.budget_tokens)
+        allowed, retry_after = rate_limiter.check(
+            self.key, self.budget_tokens, self.window_seconds, cost=tokens
+        )
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail={
+                    "error": "Przekroczono budżet tokenów AI",
+                    "message": f"Maksymalnie {self.budget_tokens} tokenów na {self.window_seconds} sekund",
+                    "retry_after": retry_after
+                },
+                headers={"Retry-After": str(retry_after)}
+            )
+        self.reserved += tokens
+
+    def settle(self, actual_tokens: int):
+        """Replace the reserved estimate with the actual token usage."""
+        delta = actual_tokens - self.reserved
+        if delta:
+            rate_limiter.adjust(self.key, self.budget_tokens, self.window_seconds, delta)
+        self.reserved = actual_tokens
+
+
+def token_budget(budget_tokens: int, window_seconds: int, scope: str = "ai_tokens"):
+    """
+    Token budget dependency.
+    Provides a per-IP TokenBudget for the handler to reserve and settle.
+    """
+    def dependency(request: Request) -> TokenBudget:
+        client_ip = request.client.host if request.client else "unknown"
+        return TokenBudget(f"{scope}:{client_ip}", budget_tokens, window_seconds)
+
     return dependency
 
 
 # Specific rate limiters for different endpoints
-ai_analysis_rate_limit = rate_limit(max_requests=10, window_seconds=300)  # 10 per 5 min
-form_generation_rate_limit = rate_limit(max_requests=5, window_seconds=300)  # 5 per 5 min
-auth_rate_limit = rate_limit(max_requests=5, window_seconds=60)  # 5 per minute
+ai_analysis_rate_limit = rate_limit(max_requests=10, window_seconds=300, scope="ai_analysis")  # 10 per 5 min
+form_generation_rate_limit = rate_limit(max_requests=5, window_seconds=300, scope="form_generation")  # 5 per 5 min
+auth_rate_limit = rate_limit(max_requests=5, window_seconds=60, scope="auth")  # 5 per minute
+ai_token_budget = token_budget(settings.ai_token_budget, settings.ai_token_budget_window)
@@ -0,0 +1,123 @@
+"""Shared rate-limit state for running several uvicorn workers."""
+import sqlite3
+import threading
+import time
+import logging
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteRateLimitStore:
+    """
+    GCRA state shared by all worker processes through a SQLite file.
+
+    Every check runs in a BEGIN IMMEDIATE transaction, which takes SQLite's
+    write lock before reading, so concurrent workers never lose updates.
+    Times are stored on the wall clock because monotonic clocks are not
+    comparable across processes.
+    """
+
+    def __init__(self, path: str, cleanup_interval: float = 60.0, busy_timeout: float = 5.0):
+        self.path = path
+        self.cleanup_interval = cleanup_interval
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._next_cleanup = time.time() + cleanup_interval
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection (sqlite3 connections are not thread-safe)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "key TEXT PRIMARY KEY, "
+            "tat REAL NOT NULL)"
+        )
+
+    def acquire(
+        self,
+        key: str,
+        emission_interval: float,
+        window_seconds: float,
+        cost: float = 1
+    ) -> Tuple[bool, float]:
+        """
+        Atomically check and record a request of the given cost.
+
+        Returns:
+            Tuple of (allowed, backlog) where backlog is the key's theoretical
+            arrival time minus now, in seconds, after the check
+        """
+        conn = self._connect()
+        now = time.time()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            tat = max(row[0], now) if row else now
+            new_tat = tat + emission_interval * cost
+
+            if new_tat - now > window_seconds:
+                conn.execute("COMMIT")
+                return False, tat - now
+
+            self._write(conn, key, new_tat)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if now >= self._next_cleanup:
+            self.cleanup()
+
+        return True, new_tat - now
+
+    def adjust(self, key: str, emission_interval: float, delta: float) -> float:
+        """
+        Atomically charge (positive delta) or refund (negative delta) a key
+        without a limit check.
+
+        Returns:
+            The key's backlog in seconds after the adjustment
+        """
+        conn = self._connect()
+        now = time.time()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            tat = max(row[0], now) if row else now
+            new_tat = max(tat + emission_interval * delta, now)
+            self._write(conn, key, new_tat)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return new_tat - now
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, key: str, tat: float):
+        conn.execute(
+            "INSERT INTO rate_limits (key, tat) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+            (key, tat)
+        )
+
+    def cleanup(self):
+        """Delete keys whose allowance is fully replenished."""
+        now = time.time()
+        self._next_cleanup = now + self.cleanup_interval
+        try:
+            self._connect().execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+        except sqlite3.Error as e:
+            logger.warning(f"Rate limit store cleanup failed: {e}")
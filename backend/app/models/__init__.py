@@ -4,8 +4,10 @@ from .step1 import Step1Data
 from .step2 import Step2Process
 from .step3 import Step3Data
 from .step4 import Step4Output
-from .draft import ProjectDraft
-from .document import UploadedDocument, DocumentProcessingResult
+from .draft import ProjectDraft, DraftVersion
+from .document import UploadedDocument, DocumentBlob, UploadSession, DocumentChunk, ChunkTerm, DocumentProcessingResult
+from .portfolio import ProjectMetrics, PortfolioMetrics
+from .search import Finding
 
 __all__ = [
     "User",
@@ -15,6 +17,14 @@ __all__ = [
     "Step3Data",
     "Step4Output",
     "ProjectDraft",
+    "DraftVersion",
     "UploadedDocument",
-    "DocumentProcessingResult"
+    "DocumentBlob",
+    "UploadSession",
+    "DocumentChunk",
+    "ChunkTerm",
+    "DocumentProcessingResult",
+    "ProjectMetrics",
+    "PortfolioMetrics",
+    "Finding"
 ]
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, BigInteger
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, BigInteger, Index
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime, timezone
 from ..database import Base
+from .types import CompressedJSON
 
 
 def get_utc_now():
@@ -13,23 +14,77 @@ class UploadedDocument(Base):
     __tablename__ = "uploaded_documents"
     
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
     filename = Column(String, nullable=False)
-    file_path = Column(String, nullable=False)
-    file_type = Column(String, nullable=False)  # excel, pdf, txt, md, csv
+    file_path = Column(String, nullable=False)  # Blob store path; project directory for legacy uploads
+    file_type = Column(String, nullable=False)  # excel, pdf, docx, txt, md, csv
     file_size = Column(BigInteger, nullable=False)
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256, keys the parsed cache
     uploaded_at = Column(DateTime, default=get_utc_now)
     
     # Relationships
     project = relationship("Project", back_populates="uploaded_documents")
 
 
+class DocumentBlob(Base):
+    """Stored file content shared by every upload with the same hash"""
+    __tablename__ = "document_blobs"
+    
+    content_hash = Column(String(64), primary_key=True)  # SHA-256
+    file_path = Column(String, nullable=False)
+    file_size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=1)  # UploadedDocument/UploadSession rows using the blob
+    created_at = Column(DateTime, default=get_utc_now)
+
+
+class UploadSession(Base):
+    """Resumable upload of one file, received in chunks until finalised"""
+    __tablename__ = "upload_sessions"
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+    filename = Column(String, nullable=False)  # As sent by the client, sanitized on finalise
+    file_size = Column(BigInteger, nullable=False)  # Declared by the client at initiation
+    received_bytes = Column(BigInteger, nullable=False, default=0)  # Contiguous bytes on disk
+    status = Column(String, nullable=False, default="uploading")  # uploading, completing, complete
+    file_path = Column(String, nullable=False)  # Incoming file; blob path once complete
+    content_hash = Column(String(64), nullable=True)  # Set once complete; holds a blob reference
+    created_at = Column(DateTime, default=get_utc_now)
+    updated_at = Column(DateTime, default=get_utc_now, onupdate=get_utc_now, index=True)  # Expiry
+    
+    # Relationships
+    project = relationship("Project", back_populates="upload_sessions")
+
+
+class DocumentChunk(Base):
+    """Passage of an uploaded document, the unit of document search"""
+    __tablename__ = "document_chunks"
+    
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    document_id = Column(Integer, ForeignKey("uploaded_documents.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)  # Order within the document
+    location = Column(String, nullable=True)  # Section title, page or sheet
+    text = Column(Text, nullable=False)
+    term_count = Column(Integer, nullable=False)  # Chunk length for BM25
+
+
+class ChunkTerm(Base):
+    """Posting of the per-project inverted index: a term and a chunk containing it"""
+    __tablename__ = "chunk_terms"
+    
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    term = Column(String(16), primary_key=True)
+    chunk_id = Column(Integer, ForeignKey("document_chunks.id", ondelete="CASCADE"), primary_key=True, index=True)
+    frequency = Column(Integer, nullable=False)
+
+
 class DocumentProcessingResult(Base):
     __tablename__ = "document_processing_results"
     
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    extracted_data = Column(JSON, nullable=True)
+    extracted_data = deferred(Column(CompressedJSON, nullable=True))  # Loaded on access
     confidence_scores = Column(JSON, nullable=True)
     missing_fields = Column(JSON, nullable=True)
     processing_summary = Column(JSON, nullable=True)
@@ -37,5 +92,9 @@ class DocumentProcessingResult(Base):
     processing_time_seconds = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=get_utc_now)
     
+    __table_args__ = (
+        Index("idx_processing_result_project_created", "project_id", "created_at"),  # Latest analysis
+    )
+    
     # Relationships
     project = relationship("Project", back_populates="document_processing_results")
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from ..database import Base
+from .types import CompressedJSON
 
 
 def get_utc_now():
@@ -17,8 +18,34 @@ class ProjectDraft(Base):
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
     step = Column(String, nullable=False, index=True)  # step1, step2, step3, step4
     draft_data = Column(JSON, nullable=False)
+    version = Column(Integer, nullable=False, default=0)  # Incremented by every autosave
     created_at = Column(DateTime, default=get_utc_now, index=True)
     updated_at = Column(DateTime, default=get_utc_now, onupdate=get_utc_now)
     
+    __table_args__ = (
+        Index("idx_draft_project_step", "project_id", "step"),
+    )
+    
     # Relationships
     project = relationship("Project", back_populates="drafts")
+
+
+class DraftVersion(Base):
+    """
+    A saved version of a draft, kept so earlier versions can be restored.
+
+    Every few versions hold the full draft; the others hold a JSON merge
+    patch from the version before (see DraftHistory).
+    """
+    __tablename__ = "draft_versions"
+    
+    id = Column(Integer, primary_key=True)
+    draft_id = Column(Integer, ForeignKey("project_drafts.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)  # ProjectDraft.version when saved
+    is_snapshot = Column(Boolean, nullable=False)  # data is the full draft, else a merge patch
+    data = Column(CompressedJSON, nullable=False)
+    created_at = Column(DateTime, default=get_utc_now)
+    
+    __table_args__ = (
+        Index("idx_draft_version", "draft_id", "version", unique=True),
+    )
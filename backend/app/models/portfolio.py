@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from datetime import datetime, timezone
+from ..database import Base
+
+
+def get_utc_now():
+    """Get current UTC time for database defaults."""
+    return datetime.now(timezone.utc)
+
+
+class ProjectMetrics(Base):
+    """Headline numbers of a project's step results, kept current by PortfolioService."""
+    __tablename__ = "project_metrics"
+    
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    process_count = Column(Integer, nullable=False, default=0)
+    analyzed_process_count = Column(Integer, nullable=False, default=0)
+    current_cost = Column(Float, nullable=False, default=0)  # PLN/rok, Step 2 process costs
+    waste_cost = Column(Float, nullable=False, default=0)  # PLN/rok, Step 2 MUDA
+    savings_potential = Column(Float, nullable=False, default=0)  # PLN/rok, best Step 3 scenario per process
+    maturity_score = Column(Float, nullable=True)  # Step 1 digital maturity, 0-100
+    updated_at = Column(DateTime, default=get_utc_now, onupdate=get_utc_now)
+
+
+class PortfolioMetrics(Base):
+    """ProjectMetrics summed over all projects, in a single row updated by deltas."""
+    __tablename__ = "portfolio_metrics"
+    
+    id = Column(Integer, primary_key=True)  # Always 1
+    project_count = Column(Integer, nullable=False, default=0)
+    process_count = Column(Integer, nullable=False, default=0)
+    analyzed_process_count = Column(Integer, nullable=False, default=0)
+    current_cost = Column(Float, nullable=False, default=0)
+    waste_cost = Column(Float, nullable=False, default=0)
+    savings_potential = Column(Float, nullable=False, default=0)
+    maturity_score_total = Column(Float, nullable=False, default=0)
+    maturity_scored_projects = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=get_utc_now, onupdate=get_utc_now)
@@ -34,6 +34,7 @@ class Project(Base):
         CheckConstraint("length(client_name) >= 3", name="check_client_name_length"),
         Index("idx_project_name_client", "name", "client_name"),
         Index("idx_project_status_updated", "status", "updated_at"),
+        Index("idx_project_client_updated", "client_name", "updated_at"),
     )
     
     # Relationships (removed user relationship - internal app without authentication)
@@ -43,4 +44,5 @@ class Project(Base):
     step4_outputs = relationship("Step4Output", back_populates="project", cascade="all, delete-orphan")
     drafts = relationship("ProjectDraft", back_populates="project", cascade="all, delete-orphan")
     uploaded_documents = relationship("UploadedDocument", back_populates="project", cascade="all, delete-orphan")
+    upload_sessions = relationship("UploadSession", back_populates="project", cascade="all, delete-orphan")
     document_processing_results = relationship("DocumentProcessingResult", back_populates="project", cascade="all, delete-orphan")
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from datetime import datetime, timezone
+from ..database import Base
+
+
+def get_utc_now():
+    """Get current UTC time for database defaults."""
+    return datetime.now(timezone.utc)
+
+
+class Finding(Base):
+    """
+    A searchable piece of a project's analysis results: a key finding, a
+    process score, a bottleneck or a recommendation.
+
+    Rows are replaced whenever the results they come from are saved. The
+    full-text index over them (FTS5 on SQLite, a tsvector column on
+    PostgreSQL) is created by migration and kept in sync by the database.
+    """
+    __tablename__ = "findings"
+    
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    step = Column(String, nullable=False)  # step1, step2, step3
+    process_id = Column(Integer, ForeignKey("step2_processes.id", ondelete="CASCADE"), nullable=True)
+    field = Column(String, nullable=False)  # key_findings, processes_scoring, bottlenecks, recommendations
+    title = Column(String, nullable=True)  # Process name
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=get_utc_now)
+    
+    __table_args__ = (
+        Index("idx_finding_project_step", "project_id", "step"),
+    )
@@ -1,7 +1,8 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime, timezone
 from ..database import Base
+from .types import CompressedJSON
 
 
 def get_utc_now():
@@ -17,7 +18,7 @@ class Step1Data(Base):
     organization_data = Column(JSON, nullable=True)
     questionnaire_answers = Column(JSON, nullable=True)
     processes_list = Column(JSON, nullable=True)
-    analysis_results = Column(JSON, nullable=True)
+    analysis_results = deferred(Column(CompressedJSON, nullable=True))  # Loaded on access
     created_at = Column(DateTime, default=get_utc_now, index=True)
     updated_at = Column(DateTime, default=get_utc_now, onupdate=get_utc_now, index=True)
     
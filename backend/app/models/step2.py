@@ -1,7 +1,8 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index, CheckConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime, timezone
 from ..database import Base
+from .types import CompressedJSON
 
 
 def get_utc_now():
@@ -16,7 +17,7 @@ class Step2Process(Base):
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
     process_name = Column(String(200), nullable=False, index=True)
     process_data = Column(JSON, nullable=True)  # Sekcje A-E
-    analysis_results = Column(JSON, nullable=True)  # Wyniki Claude
+    analysis_results = deferred(Column(CompressedJSON, nullable=True))  # Wyniki Claude, loaded on access
     created_at = Column(DateTime, default=get_utc_now, index=True)
     updated_at = Column(DateTime, default=get_utc_now, onupdate=get_utc_now, index=True)
     
@@ -1,7 +1,8 @@
 from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime, timezone
 from ..database import Base
+from .types import CompressedJSON
 
 
 def get_utc_now():
@@ -13,10 +14,10 @@ class Step3Data(Base):
     __tablename__ = "step3_data"
     
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
     budget_preferences = Column(JSON, nullable=True)
     tech_preferences = Column(JSON, nullable=True)
-    analysis_results = Column(JSON, nullable=True)  # Scenariusze, vendorzy, ROI
+    analysis_results = deferred(Column(CompressedJSON, nullable=True))  # Scenariusze, vendorzy, ROI; loaded on access
     created_at = Column(DateTime, default=get_utc_now)
     updated_at = Column(DateTime, default=get_utc_now, onupdate=get_utc_now)
     
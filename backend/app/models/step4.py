@@ -13,7 +13,7 @@ class Step4Output(Base):
     __tablename__ = "step4_outputs"
     
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
     output_type = Column(String, nullable=False)  # presentation, report, summary
     gamma_url = Column(String, nullable=True)  # Dla prezentacji
     file_path = Column(String, nullable=True)  # Dla PDF/DOCX
@@ -0,0 +1,47 @@
+"""Column types shared by the models"""
+import json
+import zstandard
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+# Values smaller than this are stored as plain JSON; a zstd frame would not save anything
+COMPRESS_MIN_BYTES = 256
+COMPRESSION_LEVEL = 3
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"  # Start of every zstd frame
+
+
+def encode_json(value) -> bytes:
+    """JSON bytes of a value, zstd-compressed unless small."""
+    data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(data) < COMPRESS_MIN_BYTES:
+        return data
+    return zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(data)
+
+
+def decode_json(data):
+    """Value of stored JSON: zstd-compressed, plain bytes, or text written before compression."""
+    if isinstance(data, str):
+        return json.loads(data)
+    data = bytes(data)
+    if data.startswith(ZSTD_MAGIC):
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return json.loads(data)
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON stored as zstd-compressed bytes.
+
+    Analysis results are tens of KB of repetitive JSON and compress several
+    times over. Rows written as plain JSON (before compression, or by the
+    JSON type) are still read; migration 0006 rewrites them.
+    Unlike JSON, values can't be queried with JSON operators.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else encode_json(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else decode_json(value)
@@ -1,19 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request
+from starlette.requests import ClientDisconnect
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer
+from typing import List, Dict, Any, Tuple
+import asyncio
+import hashlib
 import logging
 import time
 import os
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models.project import Project
-from ..models.document import UploadedDocument, DocumentProcessingResult
+from ..models.document import UploadedDocument, UploadSession, DocumentProcessingResult, get_utc_now
 from ..models.step1 import Step1Data
+from ..schemas.document import UploadSessionCreate, UploadFinalize
 from ..services.claude_service import ClaudeService
-from ..utils.file_parsers import parse_file
-from ..middleware.rate_limit import ai_analysis_rate_limit
+from ..services.blob_store import blob_store, Released
+from ..services.document_index import document_index
+from ..services.portfolio_service import PortfolioService
+from ..services.search_index import search_index
+from ..utils.parse_pool import parser_pool
+from ..utils.parsed_cache import compute_file_hash, load_parsed, store_parsed
+from ..middleware.rate_limit import ai_analysis_rate_limit, ai_token_budget, TokenBudget
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/projects/{project_id}/documents", tags=["documents"])
@@ -27,7 +38,17 @@ MAX_TOTAL_SIZE = 200 * 1024 * 1024  # 200MB
 MAX_FILES = 10
 MAX_FILES_PER_PROJECT = 100  # Increased limit per project
 MAX_FILENAME_LENGTH = 255  # Maximum filename length
-ALLOWED_EXTENSIONS = {'.xlsx', '.xls', '.pdf', '.txt', '.md', '.csv'}
+ALLOWED_EXTENSIONS = {'.xlsx', '.xls', '.pdf', '.docx', '.txt', '.md', '.csv'}
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB read/written at a time
+
+# Resumable uploads
+MAX_RESUMABLE_FILE_SIZE = 500 * 1024 * 1024  # 500MB, no total limit across files
+RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024  # Suggested to clients
+MAX_RESUMABLE_CHUNK_SIZE = 32 * 1024 * 1024  # Largest single PUT
+UPLOAD_SESSION_TTL = timedelta(hours=24)  # Since the last chunk
+
+# Background parses of completed resumable uploads, by content hash
+_parse_tasks: Dict[str, asyncio.Task] = {}
 
 
 def sanitize_filename(filename: str) -> str:
@@ -60,6 +81,62 @@ def cleanup_uploaded_files(file_paths: List[str]):
             logger.error(f"Failed to cleanup file {file_path}: {e}")
 
 
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds its size limit while being streamed"""
+
+
+def _write_chunk(f, hasher, chunk: bytes):
+    f.write(chunk)
+    hasher.update(chunk)
+
+
+async def stream_upload_to_disk(file: UploadFile, file_path: Path, max_bytes: int) -> Tuple[int, str]:
+    """
+    Copy an upload to disk in fixed-size chunks, hashing it on the way.
+    
+    Only one chunk is held in memory regardless of file size, and the
+    limit is enforced as bytes arrive, since the client-declared size
+    cannot be trusted.
+    
+    Returns:
+        Tuple of (size in bytes, SHA-256 hex digest)
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    f = await asyncio.to_thread(open, file_path, 'wb')
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(f"{file.filename} exceeds {max_bytes} bytes")
+            await asyncio.to_thread(_write_chunk, f, hasher, chunk)
+    finally:
+        await asyncio.to_thread(f.close)
+    return size, hasher.hexdigest()
+
+
+async def add_blob(db: AsyncSession, incoming: Path, content_hash: str, file_size: int) -> str:
+    """blob_store.add() for async sessions, moving the file in a thread."""
+    file_path = await db.run_sync(blob_store.add_reference, content_hash, file_size)
+    await asyncio.to_thread(blob_store.store_file, incoming, content_hash)
+    return file_path
+
+
+async def purge_blobs(db: AsyncSession, released: List[Released]):
+    """blob_store.purge() for async sessions, deleting the files in a thread."""
+    for content_hash, file_path in released:
+        if content_hash is None:
+            await asyncio.to_thread(blob_store.remove_files, [(content_hash, file_path)])
+            continue
+        try:
+            if await db.run_sync(blob_store.claim_unreferenced, content_hash):
+                await asyncio.to_thread(blob_store.remove_files, [(content_hash, file_path)])
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Failed to purge blob {content_hash}: {e}")
+
+
 def create_step1_data_from_analysis(
     db: Session,
     project_id: int,
@@ -77,6 +154,8 @@ def create_step1_data_from_analysis(
         existing.analysis_results = analysis_result
         existing.processes_list = analysis_result.get('processes_scoring', [])
         existing.updated_at = datetime.utcnow()
+        PortfolioService.refresh_project(db, project_id)
+        search_index.index_results(db, project_id, "step1", analysis_result)
         db.commit()
         db.refresh(existing)
         return existing
@@ -91,22 +170,171 @@ def create_step1_data_from_analysis(
     )
     
     db.add(step1_data)
+    PortfolioService.refresh_project(db, project_id)
+    search_index.index_results(db, project_id, "step1", analysis_result)
     db.commit()
     db.refresh(step1_data)
     return step1_data
 
 
+async def parse_uploaded_files(
+    files_to_parse: List[Tuple[str, str]],
+    content_hashes: List[str]
+) -> List[Dict[str, Any]]:
+    """
+    Parse stored uploads, given as (file_path, filename), reusing parser
+    output of content seen before.
+    
+    Cache misses are parsed in parallel in the parser pool (off the event
+    loop); duplicate files are parsed once.
+    """
+    parsed_documents = await asyncio.to_thread(
+        lambda: [load_parsed(h, name) for (_, name), h in zip(files_to_parse, content_hashes)]
+    )
+    misses = {}
+    for i, parsed_doc in enumerate(parsed_documents):
+        if parsed_doc is None:
+            misses.setdefault(content_hashes[i], []).append(i)
+    parse_results = await parser_pool.parse_many([files_to_parse[indexes[0]] for indexes in misses.values()])
+    for (content_hash, indexes), parsed_doc in zip(misses.items(), parse_results):
+        filename = files_to_parse[indexes[0]][1]
+        if isinstance(parsed_doc, Exception):
+            logger.error(f"Failed to parse {filename}: {parsed_doc}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to parse {filename}: {str(parsed_doc)}"
+            )
+        for i in indexes:
+            parsed_documents[i] = dict(parsed_doc, filename=files_to_parse[i][1])
+        logger.info(f"Parsed file: {filename}")
+        await asyncio.to_thread(store_parsed, content_hash, parsed_doc)
+    return parsed_documents
+
+
+async def index_documents(
+    db: AsyncSession,
+    documents: List[UploadedDocument],
+    parsed_documents: List[Dict[str, Any]]
+):
+    """Add documents to the project's search index within the session."""
+    # Built before the flush, which takes the database write lock
+    built = await asyncio.to_thread(document_index.build, parsed_documents)
+    await db.flush()  # Document ids for the index
+    await db.run_sync(document_index.store, documents, built)
+
+
+def run_document_analysis(
+    parsed_documents: List[Dict[str, Any]],
+    token_budget: TokenBudget
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Run the BFA analysis of parsed documents within the token budget.
+    
+    Blocks on Claude (and the shared rate limit store); run it in a thread.
+    
+    Returns:
+        Tuple of (analysis result, processing time in seconds)
+    """
+    start_time = time.time()
+    claude_service = ClaudeService()
+    token_budget.reserve(ClaudeService.estimate_tokens("document_analysis"))
+    try:
+        analysis_result = claude_service.extract_data_from_documents(parsed_documents)
+    finally:
+        token_budget.settle(claude_service.tokens_used)
+    return analysis_result, int(time.time() - start_time)
+
+
+def save_processing_result(
+    db: Session,
+    project_id: int,
+    analysis_result: Dict[str, Any],
+    documents_processed: int,
+    processing_time: int
+) -> DocumentProcessingResult:
+    """Store the BFA analysis of the project's documents."""
+    processing_result = DocumentProcessingResult(
+        project_id=project_id,
+        extracted_data=analysis_result,  # Full BFA analysis here
+        confidence_scores=analysis_result.get('confidence_scores', {}),
+        missing_fields=analysis_result.get('missing_information', []),
+        processing_summary={
+            'documents_processed': documents_processed,
+            'processing_time_seconds': processing_time,
+            'key_findings': analysis_result.get('key_findings', []),
+            'overall_confidence': analysis_result.get('confidence_scores', {}).get('overall', 0.0),
+            'top_processes': analysis_result.get('top_processes', []),
+            'digital_maturity_score': analysis_result.get('digital_maturity', {}).get('overall_score', 0)
+        },
+        processing_time_seconds=processing_time
+    )
+    db.add(processing_result)
+    db.commit()
+    db.refresh(processing_result)
+    return processing_result
+
+
+async def analyze_uploaded_documents(
+    db: AsyncSession,
+    project_id: int,
+    parsed_documents: List[Dict[str, Any]],
+    uploaded_docs: List[UploadedDocument],
+    token_budget: TokenBudget
+) -> Dict[str, Any]:
+    """Run the BFA analysis of newly uploaded documents and store its results."""
+    # Perform BFA analysis using Claude
+    logger.info(f"Starting BFA analysis for project {project_id} with {len(parsed_documents)} documents")
+    analysis_result, processing_time = await asyncio.to_thread(
+        run_document_analysis, parsed_documents, token_budget
+    )
+    
+    # Save processing results
+    processing_result = await db.run_sync(
+        save_processing_result, project_id, analysis_result, len(parsed_documents), processing_time
+    )
+    
+    # Create Step1Data from analysis
+    step1_data = None
+    try:
+        step1_data = await db.run_sync(create_step1_data_from_analysis, project_id, analysis_result)
+        logger.info(f"Successfully created Step1Data (id={step1_data.id}) for project {project_id}")
+    except Exception as e:
+        logger.error(f"Failed to create Step1Data: {e}")
+        # Continue - DocumentProcessingResult is saved
+    
+    logger.info(f"Document processing completed for project {project_id} in {processing_time}s")
+    
+    return {
+        "success": True,
+        "project_id": project_id,
+        "processing_result_id": processing_result.id,
+        "step1_data_id": step1_data.id if step1_data else None,
+        "files_uploaded": len(uploaded_docs),
+        "files": [{"filename": doc.filename, "id": doc.id} for doc in uploaded_docs],
+        "analysis_summary": {
+            "top_processes": analysis_result.get('top_processes', []),
+            "overall_confidence": analysis_result.get('confidence_scores', {}).get('overall', 0.0),
+            "key_findings": analysis_result.get('key_findings', []),
+            "missing_information": analysis_result.get('missing_information', [])
+        },
+        "digital_maturity": analysis_result.get('digital_maturity', {}),
+        "processes_scoring": analysis_result.get('processes_scoring', []),
+        "processing_time_seconds": processing_time
+    }
+
+
 @router.post("/upload")
 async def upload_documents(
     project_id: int,
     files: List[UploadFile] = File(...),
-    db: Session = Depends(get_db),
-    _rate_limit: bool = Depends(ai_analysis_rate_limit)
+    db: AsyncSession = Depends(get_async_db),
+    _rate_limit: bool = Depends(ai_analysis_rate_limit),
+    token_budget: TokenBudget = Depends(ai_token_budget)
 ):
     """Upload and process documents for Step 1 BFA analysis"""
     
     # Verify project exists
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -121,9 +349,9 @@ async def upload_documents(
         )
     
     # Check project document limit
-    existing_docs_count = db.query(UploadedDocument).filter(
-        UploadedDocument.project_id == project_id
-    ).count()
+    existing_docs_count = await db.scalar(
+        select(func.count()).select_from(UploadedDocument).where(UploadedDocument.project_id == project_id)
+    )
     
     if existing_docs_count + len(files) > MAX_FILES_PER_PROJECT:
         raise HTTPException(
@@ -141,7 +369,12 @@ async def upload_documents(
     # Process files
     uploaded_docs = []
     parsed_documents = []
-    uploaded_file_paths = []
+    incoming_paths = []
+    added_blobs = []
+    files_to_parse = []
+    content_hashes = []
+    received = []
+    total_written = 0
     
     try:
         for file in files:
@@ -167,132 +400,458 @@ async def upload_documents(
                     detail=f"Unsupported file type: {ext}. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
                 )
             
-            # Read content
-            content = await file.read()
+            # Sanitize filename
+            safe_filename = sanitize_filename(file.filename)
+            
+            # Stream to disk; size limits are enforced on the bytes received
+            incoming_path = blob_store.incoming_path()
+            incoming_paths.append(str(incoming_path))
+            remaining_total = MAX_TOTAL_SIZE - total_written
+            try:
+                file_size, content_hash = await stream_upload_to_disk(
+                    file, incoming_path, min(MAX_FILE_SIZE, remaining_total)
+                )
+            except UploadTooLargeError:
+                if remaining_total < MAX_FILE_SIZE:
+                    detail = f"Total file size exceeds {MAX_TOTAL_SIZE / 1024 / 1024}MB"
+                else:
+                    detail = f"File {file.filename} is too large. Maximum {MAX_FILE_SIZE / 1024 / 1024}MB per file."
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+            total_written += file_size
             
             # Validate empty file
-            if len(content) == 0:
+            if file_size == 0:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"File {file.filename} is empty"
                 )
             
-            # Sanitize filename
-            safe_filename = sanitize_filename(file.filename)
-            
-            # Save file
-            project_dir = UPLOAD_DIR / f"project_{project_id}"
-            project_dir.mkdir(exist_ok=True)
-            
-            # Ensure unique filename
-            file_path = project_dir / safe_filename
-            counter = 1
-            original_stem = Path(safe_filename).stem
-            original_ext = Path(safe_filename).suffix
-            while file_path.exists():
-                file_path = project_dir / f"{original_stem}_{counter}{original_ext}"
-                counter += 1
-            
-            with open(file_path, 'wb') as f:
-                f.write(content)
-            
-            uploaded_file_paths.append(str(file_path))
+            received.append((incoming_path, safe_filename, ext, file_size, content_hash))
+            files_to_parse.append((str(incoming_path), file.filename))
+            content_hashes.append(content_hash)
+        
+        # Reuse parser output of content seen before, parse the rest in
+        # parallel in the parser pool (off the event loop)
+        parsed_documents = await parse_uploaded_files(files_to_parse, content_hashes)
+        
+        # Database writes come last, so the write lock isn't held while
+        # receiving and parsing files
+        for incoming_path, safe_filename, ext, file_size, content_hash in received:
+            # Identical content is stored once and shared between uploads
+            file_path = await add_blob(db, incoming_path, content_hash, file_size)
+            added_blobs.append((content_hash, file_path))
             
             # Save to database
             uploaded_doc = UploadedDocument(
                 project_id=project_id,
-                filename=file_path.name,
-                file_path=str(file_path),
+                filename=safe_filename,
+                file_path=file_path,
                 file_type=ext.lstrip('.'),
-                file_size=len(content)
+                file_size=file_size,
+                content_hash=content_hash
             )
             db.add(uploaded_doc)
             uploaded_docs.append(uploaded_doc)
-            
-            # Parse file
-            try:
-                parsed_doc = parse_file(content, file.filename)
-                parsed_documents.append(parsed_doc)
-                logger.info(f"Parsed file: {file.filename}")
-            except Exception as e:
-                logger.error(f"Failed to parse {file.filename}: {e}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to parse {file.filename}: {str(e)}"
-                )
         
-        db.commit()
+        await index_documents(db, uploaded_docs, parsed_documents)
         
-        # Step 3: Perform BFA analysis using Claude
-        logger.info(f"Starting BFA analysis for project {project_id} with {len(parsed_documents)} documents")
-        start_time = time.time()
+        await db.commit()
         
-        claude_service = ClaudeService()
-        analysis_result = claude_service.extract_data_from_documents(parsed_documents)
-        
-        processing_time = int(time.time() - start_time)
+        return await analyze_uploaded_documents(db, project_id, parsed_documents, uploaded_docs, token_budget)
         
-        # Save processing results
-        processing_result = DocumentProcessingResult(
-            project_id=project_id,
-            extracted_data=analysis_result,  # Full BFA analysis here
-            confidence_scores=analysis_result.get('confidence_scores', {}),
-            missing_fields=analysis_result.get('missing_information', []),
-            processing_summary={
-                'documents_processed': len(parsed_documents),
-                'processing_time_seconds': processing_time,
-                'key_findings': analysis_result.get('key_findings', []),
-                'overall_confidence': analysis_result.get('confidence_scores', {}).get('overall', 0.0),
-                'top_processes': analysis_result.get('top_processes', []),
-                'digital_maturity_score': analysis_result.get('digital_maturity', {}).get('overall_score', 0)
-            },
-            processing_time_seconds=processing_time
+    except HTTPException:
+        await db.rollback()
+        await asyncio.to_thread(cleanup_uploaded_files, incoming_paths)
+        # Blobs added by this upload stay only if already committed
+        await purge_blobs(db, added_blobs)
+        raise
+    except Exception as e:
+        logger.error(f"Document upload/processing failed: {e}")
+        await db.rollback()
+        await asyncio.to_thread(cleanup_uploaded_files, incoming_paths)
+        await purge_blobs(db, added_blobs)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Document processing failed: {str(e)}"
         )
-        db.add(processing_result)
-        db.commit()
-        db.refresh(processing_result)
-        
-        # Step 4: Create Step1Data from analysis
-        step1_data = None
+
+
+def _validate_new_file(filename: str):
+    """Validate filename length and type of a file about to be uploaded."""
+    if len(filename) > MAX_FILENAME_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Filename too long: {filename}. Maximum {MAX_FILENAME_LENGTH} characters."
+        )
+    ext = Path(filename).suffix.lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type: {ext}. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+
+
+def _upload_session_status(session: UploadSession) -> Dict[str, Any]:
+    return {
+        "upload_id": session.id,
+        "filename": session.filename,
+        "file_size": session.file_size,
+        "received_bytes": session.received_bytes,
+        "status": session.status,
+        "chunk_size": RESUMABLE_CHUNK_SIZE
+    }
+
+
+def _get_upload_session(db: Session, project_id: int, upload_id: str) -> UploadSession:
+    session = db.query(UploadSession).filter(
+        UploadSession.id == upload_id,
+        UploadSession.project_id == project_id
+    ).first()
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    return session
+
+
+def expire_upload_sessions(db: Session):
+    """Remove resumable uploads not resumed or finalised within the TTL."""
+    stale = db.query(UploadSession).filter(
+        UploadSession.updated_at < get_utc_now() - UPLOAD_SESSION_TTL
+    ).all()
+    if not stale:
+        return
+    released = blob_store.release(db, stale)
+    for session in stale:
+        db.delete(session)
+    db.commit()
+    blob_store.purge(db, released)
+    logger.info(f"Expired {len(stale)} abandoned uploads")
+
+
+async def write_request_at(request: Request, file_path: str, offset: int, max_bytes: int) -> int:
+    """
+    Write a request body into a file at the given offset, in 1MB writes.
+    
+    Bytes received before the client disconnects are kept, so the next
+    chunk can resume after them.
+    
+    Returns:
+        Number of bytes written
+    """
+    written = 0
+    buffer = bytearray()
+    f = await asyncio.to_thread(open, file_path, 'r+b')
+    try:
+        await asyncio.to_thread(f.seek, offset)
         try:
-            step1_data = create_step1_data_from_analysis(
-                db=db,
-                project_id=project_id,
-                analysis_result=analysis_result
-            )
-            logger.info(f"Successfully created Step1Data (id={step1_data.id}) for project {project_id}")
-        except Exception as e:
-            logger.error(f"Failed to create Step1Data: {e}")
-            # Continue - DocumentProcessingResult is saved
+            async for data in request.stream():
+                if written + len(buffer) + len(data) > max_bytes:
+                    raise UploadTooLargeError(f"Chunk exceeds {max_bytes} bytes")
+                buffer += data
+                if len(buffer) >= UPLOAD_CHUNK_SIZE:
+                    await asyncio.to_thread(f.write, buffer)
+                    written += len(buffer)
+                    buffer = bytearray()
+        except ClientDisconnect:
+            logger.info(f"Client disconnected after {written + len(buffer)} bytes of chunk at offset {offset}")
+        if buffer:
+            await asyncio.to_thread(f.write, buffer)
+            written += len(buffer)
+    finally:
+        await asyncio.to_thread(f.close)
+    return written
+
+
+async def _parse_in_background(file_path: str, filename: str, content_hash: str):
+    """Parse a completed upload into the parsed cache ahead of finalisation."""
+    try:
+        if await asyncio.to_thread(load_parsed, content_hash, filename) is None:
+            parsed_doc = await parser_pool.parse(file_path, filename)
+            await asyncio.to_thread(store_parsed, content_hash, parsed_doc)
+            logger.info(f"Parsed completed upload: {filename}")
+    except Exception as e:
+        # Finalisation parses the file again and reports the error
+        logger.warning(f"Background parse of {filename} failed: {e}")
+    finally:
+        _parse_tasks.pop(content_hash, None)
+
+
+async def _complete_upload(db: AsyncSession, session: UploadSession):
+    """
+    Move a fully received upload into the blob store and start parsing it.
+    
+    Only one request completes a session, even if the last chunk is sent twice.
+    """
+    claimed = (await db.execute(
+        update(UploadSession).where(
+            UploadSession.id == session.id,
+            UploadSession.status == "uploading"
+        ).values(status="completing")
+    )).rowcount
+    await db.commit()
+    if not claimed:
+        await db.refresh(session)
+        return
+    
+    incoming_path = Path(session.file_path)
+    added = None
+    try:
+        content_hash = await asyncio.to_thread(compute_file_hash, str(incoming_path))
+        file_path = await add_blob(db, incoming_path, content_hash, session.file_size)
+        added = (content_hash, file_path)
+        # The session holds the blob reference until it is finalised
+        session.file_path = file_path
+        session.content_hash = content_hash
+        session.status = "complete"
+        await db.commit()
+    except Exception as e:
+        logger.error(f"Failed to complete upload {session.id}: {e}")
+        await db.rollback()
+        await db.refresh(session)
+        if added:
+            await purge_blobs(db, [added])
+        # Start the file over if it left the incoming directory
+        if not await asyncio.to_thread(incoming_path.exists):
+            await asyncio.to_thread(incoming_path.touch)
+            session.received_bytes = 0
+        session.status = "uploading"
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to complete upload of {session.filename}"
+        )
+    
+    # Parse now, while the client is still sending other files
+    if content_hash not in _parse_tasks:
+        _parse_tasks[content_hash] = asyncio.create_task(
+            _parse_in_background(file_path, session.filename, content_hash)
+        )
+    logger.info(f"Upload {session.id} complete: {session.filename} ({session.file_size} bytes)")
+
+
+@router.post("/uploads")
+def create_upload_session(
+    project_id: int,
+    upload: UploadSessionCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Start a resumable upload of one file.
+    
+    The file is then sent with PUT /uploads/{upload_id}?offset=N in chunks
+    of any size up to MAX_RESUMABLE_CHUNK_SIZE. After a dropped connection
+    GET /uploads/{upload_id} returns the bytes received so far, and the
+    upload resumes from there. Completed files are parsed right away;
+    POST /uploads/finalize adds them to the project and runs the analysis.
+    """
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    _validate_new_file(upload.filename)
+    if upload.file_size > MAX_RESUMABLE_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File {upload.filename} is too large. Maximum {MAX_RESUMABLE_FILE_SIZE / 1024 / 1024}MB per file."
+        )
+    
+    expire_upload_sessions(db)
+    
+    # Uploads in progress count towards the project document limit
+    existing_docs_count = db.query(UploadedDocument).filter(
+        UploadedDocument.project_id == project_id
+    ).count()
+    open_uploads_count = db.query(UploadSession).filter(
+        UploadSession.project_id == project_id
+    ).count()
+    if existing_docs_count + open_uploads_count + 1 > MAX_FILES_PER_PROJECT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Project document limit exceeded. Maximum {MAX_FILES_PER_PROJECT} documents per project. Current: {existing_docs_count}"
+        )
+    
+    incoming_path = blob_store.incoming_path()
+    incoming_path.touch()
+    session = UploadSession(
+        id=incoming_path.name,
+        project_id=project_id,
+        filename=upload.filename,
+        file_size=upload.file_size,
+        received_bytes=0,
+        status="uploading",
+        file_path=str(incoming_path)
+    )
+    db.add(session)
+    db.commit()
+    
+    logger.info(f"Started upload {session.id} of {upload.filename} ({upload.file_size} bytes) for project {project_id}")
+    return _upload_session_status(session)
+
+
+@router.get("/uploads/{upload_id}")
+def get_upload_session(
+    project_id: int,
+    upload_id: str,
+    db: Session = Depends(get_db)
+):
+    """Get progress of a resumable upload; resume sending from received_bytes."""
+    return _upload_session_status(_get_upload_session(db, project_id, upload_id))
+
+
+@router.put("/uploads/{upload_id}")
+async def upload_chunk(
+    project_id: int,
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Position of the chunk in the file"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Receive a chunk of a resumable upload as the raw request body.
+    
+    The offset may not skip past the bytes received so far; resending an
+    earlier chunk (e.g. after a lost response) overwrites it with the same bytes.
+    """
+    session = await db.run_sync(_get_upload_session, project_id, upload_id)
+    if session.status != "uploading":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload {upload_id} is already {session.status}"
+        )
+    if offset > session.received_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Chunk offset {offset} is past the {session.received_bytes} bytes received"
+        )
+    
+    max_bytes = min(MAX_RESUMABLE_CHUNK_SIZE, session.file_size - offset)
+    try:
+        written = await write_request_at(request, session.file_path, offset, max_bytes)
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Chunk too large. At most {max_bytes} bytes accepted at offset {offset}."
+        )
+    
+    # Progress only moves forward, also with concurrent retries of a chunk
+    end = offset + written
+    await db.execute(
+        update(UploadSession).where(
+            UploadSession.id == session.id,
+            UploadSession.received_bytes < end
+        ).values(received_bytes=end)
+    )
+    await db.commit()
+    await db.refresh(session)
+    
+    if session.received_bytes == session.file_size:
+        await _complete_upload(db, session)
+    
+    return _upload_session_status(session)
+
+
+@router.delete("/uploads/{upload_id}")
+def cancel_upload_session(
+    project_id: int,
+    upload_id: str,
+    db: Session = Depends(get_db)
+):
+    """Cancel a resumable upload and discard the bytes received."""
+    session = _get_upload_session(db, project_id, upload_id)
+    released = blob_store.release(db, [session])
+    db.delete(session)
+    db.commit()
+    blob_store.purge(db, released)
+    
+    return {"message": "Upload cancelled"}
+
+
+@router.post("/uploads/finalize")
+async def finalize_uploads(
+    project_id: int,
+    finalize: UploadFinalize,
+    db: AsyncSession = Depends(get_async_db),
+    _rate_limit: bool = Depends(ai_analysis_rate_limit),
+    token_budget: TokenBudget = Depends(ai_token_budget)
+):
+    """Add completed resumable uploads to the project and process them for Step 1 BFA analysis"""
+    
+    project = await db.get(Project, project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    upload_ids = list(dict.fromkeys(finalize.upload_ids))
+    if len(upload_ids) > MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many files. Maximum {MAX_FILES} files allowed per upload."
+        )
+    
+    sessions = list((await db.scalars(
+        select(UploadSession).where(
+            UploadSession.project_id == project_id,
+            UploadSession.id.in_(upload_ids)
+        )
+    )).all())
+    if len(sessions) != len(upload_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    incomplete = [session.filename for session in sessions if session.status != "complete"]
+    if incomplete:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Uploads not complete: {', '.join(incomplete)}"
+        )
+    sessions.sort(key=lambda session: upload_ids.index(session.id))
+    
+    # Each document takes over the blob reference of its upload
+    uploaded_docs = []
+    files_to_parse = []
+    content_hashes = []
+    for session in sessions:
+        uploaded_doc = UploadedDocument(
+            project_id=project_id,
+            filename=sanitize_filename(session.filename),
+            file_path=session.file_path,
+            file_type=Path(session.filename).suffix.lower().lstrip('.'),
+            file_size=session.file_size,
+            content_hash=session.content_hash
+        )
+        db.add(uploaded_doc)
+        await db.delete(session)
+        uploaded_docs.append(uploaded_doc)
+        files_to_parse.append((session.file_path, session.filename))
+        content_hashes.append(session.content_hash)
+    
+    try:
+        # Most files were parsed while the others were uploading
+        pending = [_parse_tasks[h] for h in set(content_hashes) if h in _parse_tasks]
+        if pending:
+            await asyncio.wait(pending)
+        parsed_documents = await parse_uploaded_files(files_to_parse, content_hashes)
+        await index_documents(db, uploaded_docs, parsed_documents)
         
-        logger.info(f"Document processing completed for project {project_id} in {processing_time}s")
+        await db.commit()
         
-        return {
-            "success": True,
-            "project_id": project_id,
-            "processing_result_id": processing_result.id,
-            "step1_data_id": step1_data.id if step1_data else None,
-            "files_uploaded": len(uploaded_docs),
-            "files": [{"filename": doc.filename, "id": doc.id} for doc in uploaded_docs],
-            "analysis_summary": {
-                "top_processes": analysis_result.get('top_processes', []),
-                "overall_confidence": analysis_result.get('confidence_scores', {}).get('overall', 0.0),
-                "key_findings": analysis_result.get('key_findings', []),
-                "missing_information": analysis_result.get('missing_information', [])
-            },
-            "digital_maturity": analysis_result.get('digital_maturity', {}),
-            "processes_scoring": analysis_result.get('processes_scoring', []),
-            "processing_time_seconds": processing_time
-        }
+        return await analyze_uploaded_documents(db, project_id, parsed_documents, uploaded_docs, token_budget)
         
     except HTTPException:
-        cleanup_uploaded_files(uploaded_file_paths)
-        db.rollback()
+        # Uploads not yet committed as documents can be finalised again
+        await db.rollback()
         raise
     except Exception as e:
-        cleanup_uploaded_files(uploaded_file_paths)
         logger.error(f"Document upload/processing failed: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Document processing failed: {str(e)}"
@@ -307,7 +866,9 @@ def get_processing_result(
 ):
     """Get document processing result"""
     
-    result = db.query(DocumentProcessingResult).filter(
+    result = db.query(DocumentProcessingResult).options(
+        undefer(DocumentProcessingResult.extracted_data)
+    ).filter(
         DocumentProcessingResult.id == result_id,
         DocumentProcessingResult.project_id == project_id
     ).first()
@@ -361,7 +922,9 @@ def get_latest_analysis(
     """Get latest document analysis result for project"""
     
     # Get latest processing result
-    processing_result = db.query(DocumentProcessingResult).filter(
+    processing_result = db.query(DocumentProcessingResult).options(
+        undefer(DocumentProcessingResult.extracted_data)
+    ).filter(
         DocumentProcessingResult.project_id == project_id
     ).order_by(DocumentProcessingResult.created_at.desc()).first()
     
@@ -392,13 +955,14 @@ def get_latest_analysis(
 @router.post("/reanalyze")
 async def reanalyze_all_documents(
     project_id: int,
-    db: Session = Depends(get_db),
-    _rate_limit: bool = Depends(ai_analysis_rate_limit)
+    db: AsyncSession = Depends(get_async_db),
+    _rate_limit: bool = Depends(ai_analysis_rate_limit),
+    token_budget: TokenBudget = Depends(ai_token_budget)
 ):
     """Re-analyze all uploaded documents for a project"""
     
     # Verify project exists
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -406,9 +970,9 @@ async def reanalyze_all_documents(
         )
     
     # Get all uploaded documents
-    documents = db.query(UploadedDocument).filter(
-        UploadedDocument.project_id == project_id
-    ).all()
+    documents = (await db.scalars(
+        select(UploadedDocument).where(UploadedDocument.project_id == project_id)
+    )).all()
     
     if not documents:
         raise HTTPException(
@@ -416,18 +980,48 @@ async def reanalyze_all_documents(
             detail="No documents found for this project"
         )
     
-    # Parse all documents
-    parsed_documents = []
-    for doc in documents:
+    # Load pre-parsed documents; only files missing from the parsed cache
+    # (older uploads, parser version change) are parsed again
+    parsed_documents = await asyncio.to_thread(
+        lambda: [load_parsed(doc.content_hash, doc.filename) for doc in documents]
+    )
+    files_to_parse = []
+    misses = []
+    for i, doc in enumerate(documents):
+        if parsed_documents[i] is not None:
+            logger.info(f"Loaded pre-parsed file: {doc.filename}")
+            continue
         try:
-            with open(doc.file_path, 'rb') as f:
-                content = f.read()
-            parsed_doc = parse_file(content, doc.filename)
-            parsed_documents.append(parsed_doc)
-            logger.info(f"Re-parsed file: {doc.filename}")
-        except Exception as e:
-            logger.error(f"Failed to re-parse {doc.filename}: {e}")
+            if not doc.content_hash:
+                doc.content_hash = await asyncio.to_thread(compute_file_hash, doc.file_path)
+        except OSError as e:
+            logger.error(f"Failed to read {doc.filename}: {e}")
+            continue
+        files_to_parse.append((doc.file_path, doc.filename))
+        misses.append(i)
+    
+    parse_results = await parser_pool.parse_many(files_to_parse)
+    for i, parsed_doc in zip(misses, parse_results):
+        doc = documents[i]
+        if isinstance(parsed_doc, Exception):
+            logger.error(f"Failed to re-parse {doc.filename}: {parsed_doc}")
             # Continue with other files
+            continue
+        parsed_documents[i] = parsed_doc
+        logger.info(f"Re-parsed file: {doc.filename}")
+        await asyncio.to_thread(store_parsed, doc.content_hash, parsed_doc)
+    
+    # Documents uploaded before the search index existed
+    unindexed = set(await db.run_sync(document_index.unindexed, documents))
+    indexable = [
+        (doc, parsed_doc) for doc, parsed_doc in zip(documents, parsed_documents)
+        if doc in unindexed and parsed_doc is not None
+    ]
+    if indexable:
+        await index_documents(db, [doc for doc, _ in indexable], [parsed_doc for _, parsed_doc in indexable])
+    await db.commit()
+    
+    parsed_documents = [parsed_doc for parsed_doc in parsed_documents if parsed_doc is not None]
     
     if not parsed_documents:
         raise HTTPException(
@@ -437,40 +1031,19 @@ async def reanalyze_all_documents(
     
     # Perform BFA analysis
     logger.info(f"Re-analyzing {len(parsed_documents)} documents for project {project_id}")
-    start_time = time.time()
     
     try:
-        claude_service = ClaudeService()
-        analysis_result = claude_service.extract_data_from_documents(parsed_documents)
-        
-        processing_time = int(time.time() - start_time)
+        analysis_result, processing_time = await asyncio.to_thread(
+            run_document_analysis, parsed_documents, token_budget
+        )
         
         # Save new processing result
-        processing_result = DocumentProcessingResult(
-            project_id=project_id,
-            extracted_data=analysis_result,
-            confidence_scores=analysis_result.get('confidence_scores', {}),
-            missing_fields=analysis_result.get('missing_information', []),
-            processing_summary={
-                'documents_processed': len(parsed_documents),
-                'processing_time_seconds': processing_time,
-                'key_findings': analysis_result.get('key_findings', []),
-                'overall_confidence': analysis_result.get('confidence_scores', {}).get('overall', 0.0),
-                'top_processes': analysis_result.get('top_processes', []),
-                'digital_maturity_score': analysis_result.get('digital_maturity', {}).get('overall_score', 0)
-            },
-            processing_time_seconds=processing_time
+        processing_result = await db.run_sync(
+            save_processing_result, project_id, analysis_result, len(parsed_documents), processing_time
         )
-        db.add(processing_result)
-        db.commit()
-        db.refresh(processing_result)
         
         # Update Step1Data
-        step1_data = create_step1_data_from_analysis(
-            db=db,
-            project_id=project_id,
-            analysis_result=analysis_result
-        )
+        step1_data = await db.run_sync(create_step1_data_from_analysis, project_id, analysis_result)
         
         logger.info(f"Re-analysis completed for project {project_id} in {processing_time}s")
         
@@ -490,9 +1063,12 @@ async def reanalyze_all_documents(
             "processing_time_seconds": processing_time
         }
         
+    except HTTPException:
+        # Token budget exceeded
+        raise
     except Exception as e:
         logger.error(f"Re-analysis failed: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Re-analysis failed: {str(e)}"
@@ -518,15 +1094,10 @@ def delete_document(
             detail="Document not found"
         )
     
-    # Delete file from filesystem
-    try:
-        if os.path.exists(document.file_path):
-            os.remove(document.file_path)
-    except Exception as e:
-        logger.error(f"Failed to delete file {document.file_path}: {e}")
-    
-    # Delete from database
+    # Delete from database; the file goes once no other upload shares it
+    released = blob_store.release(db, [document])
     db.delete(document)
     db.commit()
+    blob_store.purge(db, released)
     
     return {"message": "Document deleted successfully"}
@@ -4,16 +4,29 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import Response
 from sqlalchemy.orm import Session
 import logging
+from typing import Optional
 from ..database import get_db
 from ..models.project import Project
 from ..models.step1 import Step1Data
 from ..models.step2 import Step2Process
+from ..services.analysis_service import AnalysisService
 from ..utils.markdown_formatter import MarkdownFormatter
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/projects/{project_id}/download", tags=["downloads"])
 
 
+def load_report_data(db: Session, project_id: int) -> Optional[Project]:
+    """The project with the Step 1 and Step 2 data reports are made of."""
+    return AnalysisService.load_project_aggregate(
+        db, project_id,
+        project_columns=[Project.name, Project.client_name],
+        step1_columns=[Step1Data.analysis_results, Step1Data.organization_data],
+        step2_columns=[Step2Process.process_name, Step2Process.analysis_results],
+        step3_columns=None
+    )
+
+
 @router.get("/markdown")
 def download_markdown_report(
     project_id: int,
@@ -24,8 +37,8 @@ def download_markdown_report(
     Returns:
         Markdown file with complete audit report
     """
-    # Verify project exists
-    project = db.query(Project).filter(Project.id == project_id).first()
+    # Project with Step 1 and Step 2 data
+    project = load_report_data(db, project_id)
     
     if not project:
         raise HTTPException(
@@ -36,14 +49,13 @@ def download_markdown_report(
     logger.info(f"Generating Markdown report for project {project_id}")
     
     # Get Step 1 data
-    step1_record = db.query(Step1Data).filter(Step1Data.project_id == project_id).first()
+    step1_record = project.step1_data
     step1_data = step1_record.analysis_results if step1_record else None
     organization_data = step1_record.organization_data if step1_record else None
     
     # Get Step 2 data (all processes)
-    step2_processes = db.query(Step2Process).filter(Step2Process.project_id == project_id).all()
     step2_data = {}
-    for proc in step2_processes:
+    for proc in project.step2_processes:
         if proc.analysis_results:
             step2_data[proc.process_name] = proc.analysis_results
     
@@ -107,8 +119,8 @@ def preview_markdown_report(
     Returns:
         JSON with markdown content and metadata
     """
-    # Verify project exists
-    project = db.query(Project).filter(Project.id == project_id).first()
+    # Project with all data
+    project = load_report_data(db, project_id)
     
     if not project:
         raise HTTPException(
@@ -116,14 +128,12 @@ def preview_markdown_report(
             detail="Project not found"
         )
     
-    # Get all data
-    step1_record = db.query(Step1Data).filter(Step1Data.project_id == project_id).first()
+    step1_record = project.step1_data
     step1_data = step1_record.analysis_results if step1_record else None
     organization_data = step1_record.organization_data if step1_record else None
     
-    step2_processes = db.query(Step2Process).filter(Step2Process.project_id == project_id).all()
     step2_data = {}
-    for proc in step2_processes:
+    for proc in project.step2_processes:
         if proc.analysis_results:
             step2_data[proc.process_name] = proc.analysis_results
     
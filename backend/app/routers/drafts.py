@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import Dict, Any
-from datetime import datetime, timezone
+from typing import Dict, Any, Optional
 from ..database import get_db
 # User import removed (no auth)
 from ..models.project import Project
 from ..models.draft import ProjectDraft
+from ..services.draft_buffer import draft_buffer
+from ..services.draft_history import DraftHistory
 # get_current_user removed (no auth)
 
 router = APIRouter(prefix="/api/projects/{project_id}/drafts", tags=["drafts"])
@@ -18,42 +19,36 @@ def save_draft(
     draft_data: Dict[str, Any],
     db: Session = Depends(get_db)
 ):
-    """Save draft data for a project step (auto-save)."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Project not found"
-        )
-    
-    # Check if draft exists
-    draft = db.query(ProjectDraft).filter(
-        ProjectDraft.project_id == project_id,
-        ProjectDraft.step == step
-    ).first()
-    
-    if draft:
-        # Update existing draft
-        draft.draft_data = draft_data
-        draft.updated_at = datetime.now(timezone.utc)
-    else:
-        # Create new draft
-        draft = ProjectDraft(
-            project_id=project_id,
-            step=step,
-            draft_data=draft_data
-        )
-        db.add(draft)
+    """
+    Save draft data for a project step (auto-save).
+
+    Acknowledged once buffered; rapid saves are written to the database
+    together (see DraftBuffer).
+    """
+    saved = draft_buffer.save(db, project_id, step, data=draft_data)
     
-    db.commit()
-    db.refresh(draft)
+    return {
+        "success": True,
+        "message": "Draft saved successfully",
+        **saved
+    }
+
+
+@router.patch("/save")
+def patch_draft(
+    project_id: int,
+    step: str,
+    patch: Dict[str, Any],
+    base_version: Optional[int] = Query(None, description="Version the patch was made against; 409 if the draft has moved on"),
+    db: Session = Depends(get_db)
+):
+    """Save only the changed fields of a project step's draft, as a JSON merge patch (RFC 7386)."""
+    saved = draft_buffer.save(db, project_id, step, patch=patch, base_version=base_version)
     
     return {
         "success": True,
         "message": "Draft saved successfully",
-        "draft_id": draft.id,
-        "updated_at": draft.updated_at
+        **saved
     }
 
 
@@ -64,32 +59,89 @@ def load_draft(
     db: Session = Depends(get_db)
 ):
     """Load draft data for a project step."""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    draft = draft_buffer.get(db, project_id, step)
     
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Project not found"
-        )
+    if draft["data"] is None:
+        return {
+            "success": True,
+            "has_draft": False,
+            "draft_data": None
+        }
+    
+    return {
+        "success": True,
+        "has_draft": True,
+        "draft_data": draft["data"],
+        "version": draft["version"],
+        "updated_at": draft["updated_at"]
+    }
+
+
+@router.get("/versions")
+def list_draft_versions(
+    project_id: int,
+    step: str,
+    db: Session = Depends(get_db)
+):
+    """List the restorable versions of a project step's draft, newest first."""
+    # Autosaves not yet written become versions
+    draft_buffer.flush(project_id)
     
-    # Get draft
     draft = db.query(ProjectDraft).filter(
         ProjectDraft.project_id == project_id,
         ProjectDraft.step == step
     ).first()
     
     if not draft:
+        if not db.query(Project.id).filter(Project.id == project_id).first():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
         return {
             "success": True,
-            "has_draft": False,
-            "draft_data": None
+            "current_version": None,
+            "versions": []
         }
     
     return {
         "success": True,
-        "has_draft": True,
-        "draft_data": draft.draft_data,
-        "updated_at": draft.updated_at
+        "current_version": draft.version,
+        "versions": DraftHistory.list_versions(db, draft.id)
+    }
+
+
+@router.post("/restore")
+def restore_draft_version(
+    project_id: int,
+    step: str,
+    version: int = Query(..., ge=1, description="Version to restore, from /versions"),
+    db: Session = Depends(get_db)
+):
+    """Restore an earlier version of a project step's draft; it is saved as a new version."""
+    draft_buffer.flush(project_id)
+    
+    draft = db.query(ProjectDraft).filter(
+        ProjectDraft.project_id == project_id,
+        ProjectDraft.step == step
+    ).first()
+    draft_data = DraftHistory.get_version(db, draft.id, version) if draft else None
+    
+    if draft_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Draft version not found"
+        )
+    
+    saved = draft_buffer.save(db, project_id, step, data=draft_data)
+    draft_buffer.flush(project_id)
+    
+    return {
+        "success": True,
+        "message": "Draft restored successfully",
+        "restored_version": version,
+        "draft_data": draft_data,
+        **saved
     }
 
 
@@ -108,7 +160,8 @@ def clear_draft(
             detail="Project not found"
         )
     
-    # Delete draft
+    # Delete draft, including autosaves not yet written
+    draft_buffer.discard(project_id, step)
     draft = db.query(ProjectDraft).filter(
         ProjectDraft.project_id == project_id,
         ProjectDraft.step == step
@@ -143,14 +196,25 @@ def get_all_drafts(
         ProjectDraft.project_id == project_id
     ).all()
     
+    summaries = {
+        d.step: {
+            "step": d.step,
+            "has_data": bool(d.draft_data),
+            "version": d.version,
+            "updated_at": d.updated_at
+        }
+        for d in drafts
+    }
+    # Autosaves not yet written
+    for step, draft in draft_buffer.pending(project_id).items():
+        summaries[step] = {
+            "step": step,
+            "has_data": bool(draft["data"]),
+            "version": draft["version"],
+            "updated_at": draft["updated_at"]
+        }
+    
     return {
         "success": True,
-        "drafts": [
-            {
-                "step": d.step,
-                "has_data": bool(d.draft_data),
-                "updated_at": d.updated_at
-            }
-            for d in drafts
-        ]
+        "drafts": list(summaries.values())
     }
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..schemas.portfolio import PortfolioSummary
+from ..services.portfolio_service import PortfolioService
+
+router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
+
+
+@router.get("/", response_model=PortfolioSummary)
+def get_portfolio(db: Session = Depends(get_db)):
+    """Totals across all audits, from metrics kept up to date as step results are saved."""
+    return PortfolioService.get_summary(db)
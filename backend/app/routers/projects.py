@@ -1,42 +1,117 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Any, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc
+from sqlalchemy import DateTime, desc, asc, tuple_
 from ..database import get_db, get_db_context
-from ..models.project import Project
+from ..models.project import Project, ProjectStatus
 from ..schemas.project import Project as ProjectSchema, ProjectCreate, ProjectUpdate
 from ..middleware.security import validate_project_name, sanitize_string
 from ..middleware.rate_limit import rate_limit
+from ..services.blob_store import blob_store
+from ..services.draft_buffer import draft_buffer
+from ..services.portfolio_service import PortfolioService
+import base64
+import binascii
+import json
 import logging
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
+SORT_FIELDS = {
+    "id": Project.id,
+    "name": Project.name,
+    "client_name": Project.client_name,
+    "status": Project.status,
+    "created_at": Project.created_at,
+    "updated_at": Project.updated_at
+}
+# Columns of a project listing; rows are not loaded as ORM objects
+LIST_COLUMNS = (Project.id, Project.name, Project.client_name, Project.status, Project.created_at, Project.updated_at)
+
+
+def encode_cursor(sort_by: str, sort_order: str, row: Any) -> str:
+    """Opaque cursor pointing after the row in the given order."""
+    value = getattr(row, sort_by)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, ProjectStatus):
+        value = value.value
+    payload = json.dumps([sort_by, sort_order, value, row.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> Tuple[Any, int]:
+    """Sort value and id of the last row of the previous page."""
+    try:
+        cursor_sort_by, cursor_sort_order, value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if (cursor_sort_by, cursor_sort_order) != (sort_by, sort_order):
+            raise ValueError("cursor of a different sort order")
+        if isinstance(SORT_FIELDS[sort_by].type, DateTime):
+            value = datetime.fromisoformat(value)
+        return value, int(last_id)
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {e}"
+        )
+
 
 @router.get("/", response_model=List[ProjectSchema])
 def get_projects(
-    skip: int = Query(0, ge=0, description="Number of projects to skip"),
+    response: Response,
     limit: int = Query(100, ge=1, le=1000, description="Number of projects to return"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    project_status: Optional[ProjectStatus] = Query(None, alias="status", description="Only projects in this step"),
+    client_name: Optional[str] = Query(None, description="Only projects of this client"),
     sort_by: str = Query("updated_at", description="Field to sort by"),
-    sort_order: str = Query("desc", regex="^(asc|desc)$", description="Sort order"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Sort order"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Number of projects to skip; use cursor"),
     db: Session = Depends(get_db)
 ):
-    """Get all projects with pagination and sorting."""
+    """
+    Get projects, a page at a time, with filters and sorting.
+    
+    Pages are read by keyset: when more projects follow, the response has
+    an X-Next-Cursor header to pass as cursor for the next page. Unlike
+    skip, reading a page costs the same however deep into the list it is.
+    """
     try:
         # Validate sort field
-        allowed_sort_fields = ["id", "name", "client_name", "status", "created_at", "updated_at"]
-        if sort_by not in allowed_sort_fields:
+        if sort_by not in SORT_FIELDS:
             sort_by = "updated_at"
         
+        query = db.query(*LIST_COLUMNS)
+        if project_status is not None:
+            query = query.filter(Project.status == project_status)
+        if client_name is not None:
+            query = query.filter(Project.client_name == client_name)
+        
+        # The id breaks ties, so pages neither repeat nor skip projects
+        sort_key = (SORT_FIELDS[sort_by], Project.id) if sort_by != "id" else (Project.id,)
+        if cursor:
+            value, last_id = decode_cursor(cursor, sort_by, sort_order)
+            position = (value, last_id) if sort_by != "id" else (last_id,)
+            if sort_order == "desc":
+                query = query.filter(tuple_(*sort_key) < tuple_(*position))
+            else:
+                query = query.filter(tuple_(*sort_key) > tuple_(*position))
+        
         # Apply sorting
         order_func = desc if sort_order == "desc" else asc
-        query = db.query(Project).order_by(order_func(getattr(Project, sort_by)))
+        query = query.order_by(*(order_func(column) for column in sort_key))
         
-        # Apply pagination
-        projects = query.offset(skip).limit(limit).all()
+        # One row past the page tells whether another page follows
+        projects = query.offset(skip).limit(limit + 1).all()
+        if len(projects) > limit:
+            projects = projects[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor(sort_by, sort_order, projects[-1])
         
-        logger.info(f"Retrieved {len(projects)} projects (skip={skip}, limit={limit})")
+        logger.info(f"Retrieved {len(projects)} projects (limit={limit}, cursor={'yes' if cursor else 'no'})")
         return projects
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving projects: {e}")
         raise HTTPException(
@@ -82,6 +157,8 @@ def create_project(
         )
         
         db.add(new_project)
+        db.flush()
+        PortfolioService.refresh_project(db, new_project.id)
         db.commit()
         db.refresh(new_project)
         
@@ -158,7 +235,12 @@ def delete_project(
             detail="Project not found"
         )
     
+    # Uploaded files are removed unless other projects share them
+    released = blob_store.release(db, project.uploaded_documents + project.upload_sessions)
+    PortfolioService.remove_project(db, project_id)
+    draft_buffer.discard(project_id)
     db.delete(project)
     db.commit()
+    blob_store.purge(db, released)
     
     return {"message": "Project deleted successfully"}
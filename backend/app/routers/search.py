@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..schemas.search import SearchResults
+from ..services.search_index import search_index
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+
+@router.get("/", response_model=SearchResults)
+def search(
+    q: str = Query(..., min_length=2, max_length=200, description="Words to find, in any form"),
+    limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
+    offset: int = Query(0, ge=0, description="next_offset of the previous page"),
+    db: Session = Depends(get_db)
+):
+    """Findings and document passages of all audits matching every word of the query, most relevant first."""
+    results, has_more = search_index.search(db, q, limit=limit, offset=offset)
+    return {"query": q, "results": results, "next_offset": offset + limit if has_more else None}
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from typing import Dict, Any
 import logging
 import os
@@ -9,7 +9,9 @@ from ..models.project import Project
 from ..models.step1 import Step1Data
 from ..schemas.step1 import InitialAssessmentData, Step1AnalysisResult
 from ..services.claude_service import ClaudeService
-from ..middleware.rate_limit import ai_analysis_rate_limit
+from ..services.portfolio_service import PortfolioService
+from ..services.search_index import search_index
+from ..middleware.rate_limit import ai_analysis_rate_limit, ai_token_budget, TokenBudget
 from ..middleware.security import sanitize_dict
 from ..utils.output_validator import OutputQualityValidator
 
@@ -22,7 +24,8 @@ def analyze_step1(
     project_id: int,
     data: InitialAssessmentData,
     db: Session = Depends(get_db),
-    _rate_limit: bool = Depends(ai_analysis_rate_limit)
+    _rate_limit: bool = Depends(ai_analysis_rate_limit),
+    token_budget: TokenBudget = Depends(ai_token_budget)
 ):
     """Analyze Step 1 data using Claude API with extended thinking."""
     # Verify project exists
@@ -35,7 +38,7 @@ def analyze_step1(
         )
     
     # Check if Step1Data already exists from document processing
-    step1_data = db.query(Step1Data).filter(
+    step1_data = db.query(Step1Data).options(undefer(Step1Data.analysis_results)).filter(
         Step1Data.project_id == project_id
     ).first()
     
@@ -49,6 +52,7 @@ def analyze_step1(
     
     # Call Claude API with extended thinking
     claude_service = ClaudeService()
+    token_budget.reserve(ClaudeService.estimate_tokens("step1_analysis"))
     try:
         logger.info(f"Analyzing Step 1 for project {project_id} with extended thinking")
         analysis_results = claude_service.analyze_step1_comprehensive(clean_data)
@@ -78,6 +82,8 @@ def analyze_step1(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Analysis failed: {str(e)}"
         )
+    finally:
+        token_budget.settle(claude_service.tokens_used)
     
     # Save to database
     step1_data = db.query(Step1Data).filter(Step1Data.project_id == project_id).first()
@@ -96,6 +102,8 @@ def analyze_step1(
     # Update project status
     project.status = "step2"
     
+    PortfolioService.refresh_project(db, project_id)
+    search_index.index_results(db, project_id, "step1", analysis_results)
     db.commit()
     db.refresh(step1_data)
     
@@ -274,7 +282,9 @@ def get_step1_results(
             detail="Project not found"
         )
     
-    step1_data = db.query(Step1Data).filter(Step1Data.project_id == project_id).first()
+    step1_data = db.query(Step1Data).options(undefer(Step1Data.analysis_results)).filter(
+        Step1Data.project_id == project_id
+    ).first()
     
     if not step1_data or not step1_data.analysis_results:
         raise HTTPException(
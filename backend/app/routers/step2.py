@@ -1,13 +1,16 @@
 from typing import List, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 import logging
 from ..database import get_db
 from ..models.project import Project
 from ..models.step2 import Step2Process
 from ..schemas.step2 import Step2ProcessData, Step2AnalysisResult
 from ..services.claude_service import ClaudeService
-from ..middleware.rate_limit import ai_analysis_rate_limit
+from ..services.document_index import document_index, process_query
+from ..services.portfolio_service import PortfolioService
+from ..services.search_index import search_index
+from ..middleware.rate_limit import ai_analysis_rate_limit, ai_token_budget, TokenBudget
 from ..middleware.security import sanitize_dict, validate_input
 from ..utils.output_validator import OutputQualityValidator
 
@@ -40,6 +43,7 @@ def add_process(
     )
     
     db.add(new_process)
+    PortfolioService.refresh_project(db, project_id)
     db.commit()
     db.refresh(new_process)
     
@@ -104,7 +108,8 @@ def analyze_process(
     project_id: int,
     process_id: int,
     db: Session = Depends(get_db),
-    _rate_limit: bool = Depends(ai_analysis_rate_limit)
+    _rate_limit: bool = Depends(ai_analysis_rate_limit),
+    token_budget: TokenBudget = Depends(ai_token_budget)
 ):
     """Analyze a process using Claude API."""
     # Verify project exists
@@ -134,10 +139,15 @@ def analyze_process(
             detail="Process data not provided"
         )
     
+    # Client document passages about this process, instead of whole documents
+    document_index.ensure_indexed(db, project_id)
+    evidence = document_index.search(db, project_id, process_query(process.process_name, process.process_data))
+    
     # Call Claude API
     claude_service = ClaudeService()
+    token_budget.reserve(ClaudeService.estimate_tokens("step2_analysis"))
     try:
-        analysis_results = claude_service.analyze_step2(process.process_data)
+        analysis_results = claude_service.analyze_step2(process.process_data, evidence)
         
         # Validate output quality
         validator = OutputQualityValidator()
@@ -170,9 +180,13 @@ def analyze_process(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Analysis failed: {str(e)}"
         )
+    finally:
+        token_budget.settle(claude_service.tokens_used)
     
     # Save results
     process.analysis_results = analysis_results
+    PortfolioService.refresh_project(db, project_id)
+    search_index.index_results(db, project_id, "step2", analysis_results, process)
     db.commit()
     db.refresh(process)
     
@@ -198,7 +212,7 @@ def get_step2_results(
             detail="Project not found"
         )
     
-    processes = db.query(Step2Process).filter(
+    processes = db.query(Step2Process).options(undefer(Step2Process.analysis_results)).filter(
         Step2Process.project_id == project_id
     ).all()
     
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 import logging
 from ..database import get_db
 # User import removed (no auth)
@@ -8,8 +8,11 @@ from ..models.step2 import Step2Process
 from ..models.step3 import Step3Data
 from ..schemas.step3 import Step3DataInput, Step3AnalysisResult
 from ..services.claude_service import ClaudeService
+from ..services.document_index import document_index, process_query
+from ..services.portfolio_service import PortfolioService
+from ..services.search_index import search_index
 # get_current_user removed (no auth)
-from ..middleware.rate_limit import ai_analysis_rate_limit
+from ..middleware.rate_limit import ai_analysis_rate_limit, ai_token_budget, TokenBudget
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/projects/{project_id}/step3", tags=["step3"])
@@ -20,7 +23,8 @@ def analyze_step3(
     project_id: int,
     data: Step3DataInput,
     db: Session = Depends(get_db),
-    _rate_limit: bool = Depends(ai_analysis_rate_limit)
+    _rate_limit: bool = Depends(ai_analysis_rate_limit),
+    token_budget: TokenBudget = Depends(ai_token_budget)
 ):
     """Analyze Step 3 - research technologies and create budget scenarios."""
     project = db.query(Project).filter(Project.id == project_id).first()
@@ -32,7 +36,7 @@ def analyze_step3(
         )
     
     # Get all Step 2 processes
-    processes = db.query(Step2Process).filter(
+    processes = db.query(Step2Process).options(undefer(Step2Process.analysis_results)).filter(
         Step2Process.project_id == project_id
     ).all()
     
@@ -66,13 +70,26 @@ def analyze_step3(
         "tech_preferences": data.tech_preferences or {}
     }
     
+    # Client document passages about each process, instead of whole documents
+    document_index.ensure_indexed(db, project_id)
+    evidence = [
+        document_index.search(db, project_id, process_query(
+            process_data["process_name"], process_data["process_data"], process_data["analysis_results"]
+        ))
+        for process_data in step2_results["processes"]
+    ]
+    
     # Call Claude API for each process
     claude_service = ClaudeService()
     all_scenarios = []
     
+    # One Claude call per process - charge the budget for all of them
+    token_budget.reserve(
+        ClaudeService.estimate_tokens("step3_analysis", calls=len(step2_results["processes"]))
+    )
     try:
-        for process_data in step2_results["processes"]:
-            process_scenarios = claude_service.analyze_step3(process_data, preferences)
+        for process_data, process_evidence in zip(step2_results["processes"], evidence):
+            process_scenarios = claude_service.analyze_step3(process_data, preferences, process_evidence)
             all_scenarios.append({
                 "process_name": process_data["process_name"],
                 "scenarios": process_scenarios
@@ -82,6 +99,8 @@ def analyze_step3(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Analysis failed: {str(e)}"
         )
+    finally:
+        token_budget.settle(claude_service.tokens_used)
     
     # Aggregate results
     analysis_results = {
@@ -108,6 +127,8 @@ def analyze_step3(
     # Update project status
     project.status = "step3"
     
+    PortfolioService.refresh_project(db, project_id)
+    search_index.index_results(db, project_id, "step3", analysis_results)
     db.commit()
     db.refresh(step3_data)
     
@@ -128,7 +149,9 @@ def get_step3_results(
             detail="Project not found"
         )
     
-    step3_data = db.query(Step3Data).filter(Step3Data.project_id == project_id).first()
+    step3_data = db.query(Step3Data).options(undefer(Step3Data.analysis_results)).filter(
+        Step3Data.project_id == project_id
+    ).first()
     
     if not step3_data or not step3_data.analysis_results:
         raise HTTPException(
@@ -10,7 +10,7 @@ from ..models.step3 import Step3Data
 from ..models.step4 import Step4Output
 from ..schemas.step4 import Step4GenerateRequest, Step4Output as Step4OutputSchema
 from ..services.gamma_service import GammaService
-from ..services.analysis_service import AnalysisService
+from ..services.analysis_service import AnalysisService, SUMMARY_COLUMNS
 # get_current_user removed (no auth)
 
 router = APIRouter(prefix="/api/projects/{project_id}/step4", tags=["step4"])
@@ -23,7 +23,8 @@ def generate_presentation(
     db: Session = Depends(get_db)
 ):
     """Generate presentation using Gamma API."""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    # The project with all data from previous steps
+    project = AnalysisService.load_project_aggregate(db, project_id, **SUMMARY_COLUMNS)
     
     if not project:
         raise HTTPException(
@@ -31,9 +32,7 @@ def generate_presentation(
             detail="Project not found"
         )
     
-    # Get all data from previous steps
-    analysis_service = AnalysisService()
-    project_summary = analysis_service.get_project_summary(db, project_id)
+    project_summary = AnalysisService.summarize_project(project)
     
     if not project_summary.get("step1_results"):
         raise HTTPException(
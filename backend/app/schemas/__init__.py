@@ -4,6 +4,9 @@ from .step1 import Step1DataInput, Step1AnalysisResult
 from .step2 import Step2ProcessData, Step2AnalysisResult
 from .step3 import Step3DataInput, Step3AnalysisResult
 from .step4 import Step4GenerateRequest, Step4Output
+from .document import UploadSessionCreate, UploadFinalize
+from .portfolio import PortfolioSummary
+from .search import SearchHit, SearchResults
 
 __all__ = [
     "User", "UserCreate", "UserLogin", "Token",
@@ -11,5 +14,8 @@ __all__ = [
     "Step1DataInput", "Step1AnalysisResult",
     "Step2ProcessData", "Step2AnalysisResult",
     "Step3DataInput", "Step3AnalysisResult",
-    "Step4GenerateRequest", "Step4Output"
+    "Step4GenerateRequest", "Step4Output",
+    "UploadSessionCreate", "UploadFinalize",
+    "PortfolioSummary",
+    "SearchHit", "SearchResults"
 ]
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    file_size: int = Field(..., gt=0)
+
+
+class UploadFinalize(BaseModel):
+    upload_ids: List[str] = Field(..., min_length=1)
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class PortfolioSummary(BaseModel):
+    project_count: int
+    process_count: int
+    analyzed_process_count: int
+    total_current_cost: float  # PLN/rok
+    total_waste_cost: float  # PLN/rok
+    total_savings_potential: float  # PLN/rok
+    roi_potential: float  # % of current cost
+    average_maturity_score: Optional[float] = None  # 0-100, projects with Step 1 results
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class SearchHit(BaseModel):
+    id: int  # Finding or document passage id
+    project_id: int
+    project_name: str
+    client_name: Optional[str] = None
+    source: str  # step1, step2, step3 or document
+    field: Optional[str] = None  # key_findings, processes_scoring, bottlenecks, recommendations
+    title: Optional[str] = None  # Process name, or document filename and location
+    snippet: str  # Matched words marked **like this**
+    score: float  # Higher is more relevant
+
+
+class SearchResults(BaseModel):
+    query: str
+    results: List[SearchHit]
+    next_offset: Optional[int] = None  # Offset of the next page, None on the last one
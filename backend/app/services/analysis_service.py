@@ -1,5 +1,5 @@
-from typing import Dict, Any, List
-from sqlalchemy.orm import Session
+from typing import Dict, Any, List, Optional, Sequence
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
 from ..models import Project, Step1Data, Step2Process, Step3Data
 
 
@@ -7,30 +7,53 @@ class AnalysisService:
     """Service for aggregating and analyzing audit data."""
     
     @staticmethod
-    def get_project_summary(db: Session, project_id: int) -> Dict[str, Any]:
-        """Get complete project summary for presentation generation."""
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            return {}
+    def load_project_aggregate(
+        db: Session,
+        project_id: int,
+        project_columns: Sequence[Any] = (),
+        step1_columns: Optional[Sequence[Any]] = (),
+        step2_columns: Optional[Sequence[Any]] = (),
+        step3_columns: Optional[Sequence[Any]] = ()
+    ) -> Optional[Project]:
+        """
+        Load a project with its Step 1, Step 2 and Step 3 data.
         
-        # Get Step 1 results
-        step1_data = db.query(Step1Data).filter(Step1Data.project_id == project_id).first()
-        step1_results = step1_data.analysis_results if step1_data else {}
+        The project is joined with its Step 1 and Step 3 data in one query,
+        and its Step 2 processes follow in a second one: joined as well,
+        the Step 1 and Step 3 JSON would be fetched and decoded again for
+        every process.
         
-        # Get Step 2 results
-        step2_processes = db.query(Step2Process).filter(Step2Process.project_id == project_id).all()
+        Each *_columns argument lists the model attributes the caller needs
+        (e.g. [Step1Data.analysis_results]); an empty list loads all columns,
+        deferred ones included, None leaves that step's data to be loaded lazily, if at all.
+        
+        Returns:
+            Project with step1_data, step2_processes and step3_data
+            populated, or None if it does not exist
+        """
+        options = [load_only(*project_columns)] if project_columns else []
+        for loader, columns in (
+            (joinedload(Project.step1_data), step1_columns),
+            (selectinload(Project.step2_processes), step2_columns),
+            (joinedload(Project.step3_data), step3_columns)
+        ):
+            if columns is not None:
+                options.append(loader.load_only(*columns) if columns else loader.undefer("*"))
+        return db.query(Project).options(*options).filter(Project.id == project_id).one_or_none()
+    
+    @staticmethod
+    def summarize_project(project: Project) -> Dict[str, Any]:
+        """Summary of a project loaded with its step data."""
+        step1_results = project.step1_data.analysis_results if project.step1_data else {}
         step2_results = [
             {
                 "process_name": p.process_name,
                 "process_data": p.process_data,
                 "analysis_results": p.analysis_results
             }
-            for p in step2_processes
+            for p in project.step2_processes
         ]
-        
-        # Get Step 3 results
-        step3_data = db.query(Step3Data).filter(Step3Data.project_id == project_id).first()
-        step3_results = step3_data.analysis_results if step3_data else {}
+        step3_results = project.step3_data.analysis_results if project.step3_data else {}
         
         return {
             "project": {
@@ -44,6 +67,14 @@ class AnalysisService:
             "step3_results": step3_results
         }
     
+    @staticmethod
+    def get_project_summary(db: Session, project_id: int) -> Dict[str, Any]:
+        """Get complete project summary for presentation generation."""
+        project = AnalysisService.load_project_aggregate(db, project_id, **SUMMARY_COLUMNS)
+        if not project:
+            return {}
+        return AnalysisService.summarize_project(project)
+    
     @staticmethod
     def calculate_total_savings(step2_results: List[Dict[str, Any]], step3_results: Dict[str, Any]) -> Dict[str, float]:
         """Calculate total potential savings across all processes."""
@@ -71,3 +102,12 @@ class AnalysisService:
             "total_savings_potential": total_savings_potential,
             "roi_potential": (total_savings_potential / total_current_cost * 100) if total_current_cost > 0 else 0
         }
+
+
+# Columns summarize_project() reads
+SUMMARY_COLUMNS = {
+    "project_columns": [Project.name, Project.client_name, Project.status],
+    "step1_columns": [Step1Data.analysis_results],
+    "step2_columns": [Step2Process.process_name, Step2Process.process_data, Step2Process.analysis_results],
+    "step3_columns": [Step3Data.analysis_results]
+}
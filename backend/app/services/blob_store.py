@@ -0,0 +1,193 @@
+"""Content-addressed, reference-counted storage of uploaded files"""
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..models.document import DocumentBlob, UploadedDocument, UploadSession
+from ..utils.parsed_cache import discard_parsed
+
+logger = logging.getLogger(__name__)
+
+# (content_hash, file_path) of a file that may be unreferenced after commit;
+# content_hash is None for legacy per-project files
+Released = Tuple[Optional[str], str]
+
+
+class BlobStore:
+    """
+    Stores each distinct file content once, keyed by its SHA-256 hash.
+
+    UploadedDocument rows, and resumable uploads completed but not yet
+    finalised, point at the blob file; DocumentBlob counts them.
+    Identical files uploaded to several projects share one file and one
+    parsed cache entry, so they are stored and parsed once. Reference
+    counts change inside the caller's transaction, and files are only
+    removed after commit, once no row references them any more.
+
+    Adding a reference and removing a file both hold the blob's lock (the
+    database write lock on SQLite, an advisory lock on PostgreSQL) until
+    their transaction ends. An upload takes its reference before it looks
+    for the file, and purge() checks the count again right before deleting
+    it, so a file is never deleted under an upload that found it.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.incoming_dir = root / "incoming"
+
+    def incoming_path(self) -> Path:
+        """Fresh path to stream an upload to before its hash is known."""
+        self.incoming_dir.mkdir(parents=True, exist_ok=True)
+        return self.incoming_dir / uuid.uuid4().hex
+
+    def blob_path(self, content_hash: str) -> Path:
+        # Two-level fan-out keeps directories small
+        return self.root / content_hash[:2] / content_hash
+
+    def add(self, db: Session, incoming: Path, content_hash: str, file_size: int) -> str:
+        """
+        Add a reference to a blob and take ownership of the incoming file
+        with its content.
+
+        Returns:
+            Path of the blob file
+        """
+        file_path = self.add_reference(db, content_hash, file_size)
+        self.store_file(incoming, content_hash)
+        return file_path
+
+    def store_file(self, incoming: Path, content_hash: str):
+        """
+        Move an incoming file to its blob path, or drop it if the blob file
+        exists (file I/O only). Call once the session holds a reference.
+        """
+        path = self.blob_path(content_hash)
+        if path.exists():
+            incoming.unlink()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(incoming, path)
+
+    def add_reference(self, db: Session, content_hash: str, file_size: int) -> str:
+        """
+        Count a new reference to a blob within the session, locking it
+        until the transaction ends.
+
+        Returns:
+            Path of the blob file
+        """
+        file_path = str(self.blob_path(content_hash))
+        self._lock(db, content_hash)
+        if self._increment(db, content_hash):
+            return file_path
+        try:
+            with db.begin_nested():
+                db.add(DocumentBlob(
+                    content_hash=content_hash,
+                    file_path=file_path,
+                    file_size=file_size,
+                    ref_count=1
+                ))
+        except IntegrityError:
+            # Inserted concurrently by another upload of the same content
+            self._increment(db, content_hash)
+        return file_path
+
+    @staticmethod
+    def _lock(db: Session, content_hash: str):
+        # On SQLite the write that follows takes the database write lock
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:hash))"), {"hash": content_hash})
+
+    @staticmethod
+    def _increment(db: Session, content_hash: str) -> bool:
+        updated = db.query(DocumentBlob).filter(
+            DocumentBlob.content_hash == content_hash
+        ).update({DocumentBlob.ref_count: DocumentBlob.ref_count + 1}, synchronize_session=False)
+        return updated > 0
+
+    def release(
+        self,
+        db: Session,
+        documents: List[Union[UploadedDocument, UploadSession]]
+    ) -> List[Released]:
+        """
+        Drop the documents' references to their files within the session.
+
+        Upload sessions still receiving chunks release their incoming file.
+
+        Returns:
+            Files to pass to purge() after the transaction commits
+        """
+        released = []
+        for document in documents:
+            blob_path = db.query(DocumentBlob.file_path).filter(
+                DocumentBlob.content_hash == document.content_hash
+            ).scalar() if document.content_hash else None
+
+            if blob_path is None or blob_path != document.file_path:
+                # Uploaded before the blob store (or still incoming): the
+                # file is the document's own
+                released.append((None, document.file_path))
+                continue
+
+            # A plain UPDATE so concurrent uploads adding references are
+            # never overwritten with a stale count; purge() deletes the row
+            db.query(DocumentBlob).filter(DocumentBlob.content_hash == document.content_hash).update(
+                {DocumentBlob.ref_count: DocumentBlob.ref_count - 1}, synchronize_session=False
+            )
+            released.append((document.content_hash, blob_path))
+        return released
+
+    def purge(self, db: Session, released: List[Released]):
+        """Delete released files that no committed row references, one blob per transaction."""
+        for content_hash, file_path in released:
+            if content_hash is None:
+                self.remove_files([(content_hash, file_path)])
+                continue
+            try:
+                if self.claim_unreferenced(db, content_hash):
+                    self.remove_files([(content_hash, file_path)])
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to purge blob {content_hash}: {e}")
+
+    def claim_unreferenced(self, db: Session, content_hash: str) -> bool:
+        """
+        Lock a released blob and delete its row if nothing references it,
+        within the session.
+
+        Returns:
+            Whether to delete its file before the transaction ends
+        """
+        self._lock(db, content_hash)
+        db.query(DocumentBlob).filter(
+            DocumentBlob.content_hash == content_hash,
+            DocumentBlob.ref_count <= 0
+        ).delete(synchronize_session=False)
+        # No row also covers a blob whose upload was rolled back
+        return db.query(DocumentBlob.content_hash).filter(
+            DocumentBlob.content_hash == content_hash
+        ).first() is None
+
+    @staticmethod
+    def remove_files(unreferenced: List[Released]):
+        """Delete unreferenced files and their parser output (file I/O only)."""
+        for content_hash, file_path in unreferenced:
+            if content_hash is not None:
+                discard_parsed(content_hash)
+            try:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                    logger.info(f"Deleted unreferenced file: {file_path}")
+            except OSError as e:
+                logger.error(f"Failed to delete file {file_path}: {e}")
+
+
+# Global blob store instance
+blob_store = BlobStore(Path("./uploaded_documents/blobs"))
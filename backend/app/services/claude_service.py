@@ -16,11 +16,41 @@ logger = logging.getLogger(__name__)
 
 
 class ClaudeService:
+    # Upper-bound token cost per call (max_tokens + typical prompt), used to
+    # reserve token budget before the actual usage is known
+    TOKEN_ESTIMATES = {
+        "step1_analysis": 20000 + 4000,
+        "step2_analysis": 16000 + 6000,  # Prompt includes document passages
+        "step3_analysis": 20000 + 8000,
+        "document_analysis": 64000 + 30000,
+    }
+    # Sample rows sent alongside a table profile; the profile covers the rest
+    PROMPT_SAMPLE_ROWS = 20
+    
     def __init__(self):
         self.client = Anthropic(api_key=settings.claude_api_key) if settings.claude_api_key else None
         self.model = "claude-sonnet-4-20250514"
         self.default_max_tokens = 16000
         self.document_processing_max_tokens = 64000  # Adjusted for extended thinking
+        self.usage = {"input_tokens": 0, "output_tokens": 0}
+    
+    @classmethod
+    def estimate_tokens(cls, operation: str, calls: int = 1) -> int:
+        """Estimate token cost of an operation before calling the API."""
+        return cls.TOKEN_ESTIMATES[operation] * calls
+    
+    @property
+    def tokens_used(self) -> int:
+        """Total tokens consumed by calls made through this instance."""
+        return self.usage["input_tokens"] + self.usage["output_tokens"]
+    
+    def _record_usage(self, response):
+        """Accumulate token usage reported by the API."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        self.usage["input_tokens"] += usage.input_tokens or 0
+        self.usage["output_tokens"] += usage.output_tokens or 0
     
     def _clean_json_response(self, text: str) -> str:
         """Remove markdown code blocks from JSON response."""
@@ -125,6 +155,7 @@ Zwróć JSON w formacie:
                     }
                 ]
             )
+            self._record_usage(response)
             
             # Extract JSON from response (może być w thinking blocks)
             result_text = ""
@@ -251,6 +282,7 @@ Wykonaj kompleksową analizę i zwróć wynik w formacie JSON:
                     }
                 ]
             )
+            self._record_usage(response)
             
             # Extract text from response (skip thinking blocks)
             result_text = ""
@@ -405,6 +437,7 @@ Zwróć wynik w formacie JSON zgodnym z poniższym schematem:
                     }
                 ]
             )
+            self._record_usage(response)
             
             # Extract text from response (skip thinking blocks)
             result_text = ""
@@ -423,8 +456,12 @@ Zwróć wynik w formacie JSON zgodnym z poniższym schematem:
             logger.error(f"Step1 analysis failed: {e}")
             raise ValueError(f"Claude API error: {str(e)}")
     
-    def analyze_step2(self, process_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze process details for Step 2."""
+    def analyze_step2(
+        self,
+        process_data: Dict[str, Any],
+        evidence: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Analyze process details for Step 2, with relevant client document passages as evidence."""
         if not self.client:
             raise ValueError("Claude API key not configured")
         
@@ -496,7 +533,7 @@ Format odpowiedzi: JSON zgodny ze schematem."""
 
 DANE PROCESU:
 {json.dumps(process_data, indent=2, ensure_ascii=False)}
-
+{self._format_evidence(evidence)}
 WYKONAJ SZCZEGÓŁOWĄ ANALIZĘ (MINIMUM 1,050 SŁÓW):
 
 1. BPMN_DESCRIPTION (350-500 słów) - MUSI zawierać:
@@ -620,6 +657,7 @@ Zwróć wynik w formacie JSON zgodnym z poniższym schematem:
                     }
                 ]
             )
+            self._record_usage(response)
             
             # Extract text from response (skip thinking blocks)
             result_text = ""
@@ -632,6 +670,30 @@ Zwróć wynik w formacie JSON zgodnym z poniższym schematem:
         except Exception as e:
             raise ValueError(f"Claude API error: {str(e)}")
     
+    def _format_evidence(self, evidence: Optional[List[Dict[str, Any]]]) -> str:
+        """Document passages retrieved for a process, or nothing when there are none."""
+        if not evidence:
+            return ""
+        summary = "\nFRAGMENTY DOKUMENTÓW KLIENTA (najtrafniejsze dla tego procesu; wykorzystaj konkretne dane, nazwy i liczby):\n"
+        for passage in evidence:
+            source = passage['filename']
+            if passage.get('location'):
+                source += f" — {passage['location']}"
+            summary += f"\n[{source}]\n{passage['text']}\n"
+        return summary
+
+    def _format_table_summary(self, table: Dict[str, Any], sample: List[Dict[str, Any]], scope: str) -> str:
+        """Compact statistical summary of an Excel sheet or CSV file for the prompt."""
+        summary = f"Kolumny: {', '.join(table.get('columns', []))}\n"
+        summary += f"Profil kolumn (cały {scope}, {table.get('rows', 0)} wierszy; rozkłady, okresy, wartości odstające):\n"
+        summary += f"{json.dumps(table['column_profiles'], ensure_ascii=False, default=str)}\n"
+        if table.get('group_aggregates'):
+            summary += f"Agregaty wg kategorii (cały {scope}):\n"
+            summary += f"{json.dumps(table['group_aggregates'], ensure_ascii=False, default=str)}\n"
+        summary += "Przykładowe wiersze (równomiernie z całego zakresu):\n"
+        summary += f"{json.dumps(sample[:self.PROMPT_SAMPLE_ROWS], ensure_ascii=False)}\n"
+        return summary
+
     def extract_data_from_documents(self, parsed_documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze documents and perform Step 1 audit directly using extended thinking."""
         if not self.client:
@@ -691,8 +753,10 @@ ZASADY:
             if doc['type'] == 'excel':
                 for sheet_name, sheet_data in doc.get('sheets', {}).items():
                     doc_summary += f"\n--- Sheet: {sheet_name} ---\n"
-                    # Include dataframe if available, otherwise raw data
-                    if 'dataframe' in sheet_data:
+                    # Include profile if available, otherwise raw data
+                    if 'column_profiles' in sheet_data:
+                        doc_summary += self._format_table_summary(sheet_data, sheet_data.get('sample', []), "arkusz")
+                    elif 'dataframe' in sheet_data:
                         doc_summary += f"Kolumny: {', '.join(sheet_data.get('columns', []))}\n"
                         doc_summary += f"Dane (pierwsze 100 wierszy):\n{json.dumps(sheet_data['dataframe'][:100], ensure_ascii=False, indent=2)}\n"
                     elif 'data' in sheet_data:
@@ -702,16 +766,19 @@ ZASADY:
                 doc_summary += f"Liczba stron: {doc.get('pages', 0)}\n"
                 doc_summary += f"Treść:\n{doc.get('full_text', '')[:10000]}\n"  # First 10k chars
             
-            elif doc['type'] in ['text', 'markdown']:
-                if 'sections' in doc:
+            elif doc['type'] in ['text', 'markdown', 'docx']:
+                if doc.get('sections'):
                     for section in doc['sections']:
                         doc_summary += f"\n## {section['title']}\n{section['content']}\n"
                 else:
                     doc_summary += doc.get('content', '')[:10000]
             
             elif doc['type'] == 'csv':
-                doc_summary += f"Kolumny: {', '.join(doc.get('columns', []))}\n"
-                doc_summary += f"Dane (pierwsze 100 wierszy):\n{json.dumps(doc.get('data', [])[:100], ensure_ascii=False, indent=2)}\n"
+                if 'column_profiles' in doc:
+                    doc_summary += self._format_table_summary(doc, doc.get('data', []), "plik")
+                else:
+                    doc_summary += f"Kolumny: {', '.join(doc.get('columns', []))}\n"
+                    doc_summary += f"Dane (pierwsze 100 wierszy):\n{json.dumps(doc.get('data', [])[:100], ensure_ascii=False, indent=2)}\n"
             
             documents_content.append(doc_summary)
 
@@ -787,6 +854,7 @@ Wykonaj PEŁNĄ ANALIZĘ BFA i zwróć wynik w formacie JSON:
                     }
                 ]
             )
+            self._record_usage(response)
             
             # Extract text from response
             result_text = ""
@@ -804,7 +872,12 @@ Wykonaj PEŁNĄ ANALIZĘ BFA i zwróć wynik w formacie JSON:
             logger.error(f"Document BFA analysis failed: {e}")
             raise ValueError(f"Claude API error: {str(e)}")
     
-    def analyze_step3(self, step2_results: Dict[str, Any], preferences: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_step3(
+        self,
+        step2_results: Dict[str, Any],
+        preferences: Dict[str, Any],
+        evidence: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """Research technologies and create budget scenarios for Step 3."""
         if not self.client:
             raise ValueError("Claude API key not configured")
@@ -880,7 +953,7 @@ DANE PROCESU Z KROKU 2:
 
 PREFERENCJE KLIENTA:
 {json.dumps(preferences, indent=2, ensure_ascii=False)}
-
+{self._format_evidence(evidence)}
 WYKONAJ SZCZEGÓŁOWĄ ANALIZĘ (MINIMUM 1,100 SŁÓW):
 
 1. TECHNOLOGY RESEARCH:
@@ -1000,6 +1073,7 @@ Zwróć wynik w formacie JSON zgodnym z poniższym schematem:
                     }
                 ]
             )
+            self._record_usage(response)
             
             # Extract text from response (skip thinking blocks)
             result_text = ""
@@ -0,0 +1,281 @@
+"""Per-project BM25 index over passages of uploaded documents"""
+import heapq
+import logging
+import math
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models.document import UploadedDocument, DocumentChunk, ChunkTerm
+from ..utils.parsed_cache import load_parsed
+from ..utils.polish_text import term_frequencies, tokenize
+
+logger = logging.getLogger(__name__)
+
+# (location, text) of a passage
+Passage = Tuple[Optional[str], str]
+# Passage with its term frequencies and length, ready to store
+IndexedPassage = Tuple[Optional[str], str, Counter, int]
+
+# Target passage size; about a paragraph or a few table rows of context
+CHUNK_CHARS = 1500
+
+
+def _split(location: Optional[str], text: str) -> Iterator[Passage]:
+    """Split text into passages of whole lines up to CHUNK_CHARS."""
+    lines: List[str] = []
+    size = 0
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        # Lines longer than a passage (PDF paragraphs) are cut between words
+        while len(line) > CHUNK_CHARS:
+            cut = line.rfind(" ", 0, CHUNK_CHARS)
+            cut = cut if cut > 0 else CHUNK_CHARS
+            if lines:
+                yield location, "\n".join(lines)
+                lines, size = [], 0
+            yield location, line[:cut]
+            line = line[cut:].strip()
+        if size + len(line) > CHUNK_CHARS and lines:
+            yield location, "\n".join(lines)
+            lines, size = [], 0
+        lines.append(line)
+        size += len(line) + 1
+    if lines:
+        yield location, "\n".join(lines)
+
+
+def _table_passages(location: str, table: Dict[str, Any], rows: List[List[str]]) -> Iterator[Passage]:
+    """Column names and frequent values, then rows with their header."""
+    columns = [str(column) for column in table.get("columns", [])]
+    summary = [f"Kolumny: {', '.join(columns)}"]
+    for column, profile in (table.get("column_profiles") or {}).items():
+        top_values = profile.get("top_values") if isinstance(profile, dict) else None
+        if top_values:
+            summary.append(f"{column}: {', '.join(str(top['value']) for top in top_values)}")
+    yield from _split(location, "\n".join(summary))
+
+    header = " | ".join(columns)
+    lines = [" | ".join(str(cell) for cell in row) for row in rows]
+    for passage_location, text in _split(location, "\n".join(lines)):
+        yield passage_location, f"{header}\n{text}"
+
+
+def chunk_document(parsed: Dict[str, Any]) -> List[Passage]:
+    """Split parser output into passages, keeping where each one comes from."""
+    doc_type = parsed.get("type")
+    passages: List[Passage] = []
+
+    if doc_type == "excel":
+        for sheet_name, sheet in parsed.get("sheets", {}).items():
+            # The first row of the sheet's rows is its header
+            passages.extend(_table_passages(f"arkusz {sheet_name}", sheet, sheet.get("data", [])[1:]))
+    elif doc_type == "csv":
+        columns = parsed.get("columns", [])
+        rows = [[row.get(column, "") for column in columns] for row in parsed.get("data", [])]
+        passages.extend(_table_passages("wiersze", parsed, rows))
+    elif doc_type == "pdf":
+        for page in parsed.get("content", []):
+            passages.extend(_split(f"strona {page['page']}", page["text"]))
+    elif parsed.get("sections"):
+        # Content before the first heading is not part of any section
+        first_title = parsed["sections"][0]["title"]
+        preamble = parsed.get("content", "").split(first_title, 1)[0]
+        passages.extend(_split(None, preamble.rstrip("# \n")))
+        for section in parsed["sections"]:
+            # Headings directly followed by subheadings have no text of their own
+            if not section["content"].strip():
+                continue
+            passages.extend(_split(section["title"], f"{section['title']}\n{section['content']}"))
+    else:
+        passages.extend(_split(None, parsed.get("content", "")))
+
+    return passages
+
+
+def process_query(
+    process_name: str,
+    process_data: Optional[Dict[str, Any]],
+    analysis_results: Optional[Dict[str, Any]] = None
+) -> str:
+    """Search query for evidence about one process: its name, steps, systems and problems."""
+    data = process_data or {}
+    basic_info = data.get("basic_info") or {}
+    systems = data.get("systems") or {}
+    steps = (data.get("as_is") or {}).get("steps") or []
+
+    # The name is repeated to weigh it above the details
+    parts = [process_name, process_name, basic_info.get("name", ""), basic_info.get("department", "")]
+    parts += systems.get("systems_used") or []
+    parts += systems.get("integrations") or []
+    parts += systems.get("technical_bottlenecks") or []
+    for step in steps:
+        parts += [step.get("name", ""), step.get("system_used", "")]
+    for problem in (data.get("problems") or {}).get("problems") or []:
+        parts.append(problem.get("description", ""))
+
+    if analysis_results:
+        parts += [bottleneck.get("name", "") for bottleneck in analysis_results.get("bottlenecks") or []]
+        parts += (analysis_results.get("automation_potential") or {}).get("automatable_steps") or []
+
+    return " ".join(str(part) for part in parts if part)
+
+
+class DocumentIndex:
+    """
+    Inverted index over passages of each project's documents, ranked by BM25.
+
+    Passages and their term postings are stored in the application
+    database, so search needs no parsing and no in-memory state. Postings
+    go with their document (and project) through foreign key cascades.
+    """
+
+    # Standard BM25 parameters
+    K1 = 1.2
+    B = 0.75
+
+    @staticmethod
+    def build(parsed_documents: List[Dict[str, Any]]) -> List[List[IndexedPassage]]:
+        """Chunk and tokenise parsed documents (CPU only, safe to run in a thread)."""
+        built = []
+        for parsed in parsed_documents:
+            passages = []
+            for location, text in chunk_document(parsed):
+                terms = term_frequencies(text)
+                if terms:
+                    passages.append((location, text, terms, sum(terms.values())))
+            built.append(passages)
+        return built
+
+    def store(self, db: Session, documents: List[UploadedDocument], built: List[List[IndexedPassage]]):
+        """Add built passages of flushed documents to the index within the session."""
+        chunks = []
+        postings = []
+        for document, passages in zip(documents, built):
+            document_chunks = [
+                DocumentChunk(
+                    project_id=document.project_id,
+                    document_id=document.id,
+                    position=position,
+                    location=location,
+                    text=text,
+                    term_count=term_count
+                )
+                for position, (location, text, _, term_count) in enumerate(passages)
+            ]
+            chunks.extend(document_chunks)
+            postings.append((document, document_chunks, passages))
+        db.add_all(chunks)
+        db.flush()
+
+        rows = [
+            {"project_id": document.project_id, "term": term, "chunk_id": chunk.id, "frequency": frequency}
+            for document, document_chunks, passages in postings
+            for chunk, (_, _, terms, _) in zip(document_chunks, passages)
+            for term, frequency in terms.items()
+        ]
+        if rows:
+            # Core executemany; ORM bulk insert bookkeeping dominates at this volume
+            db.execute(ChunkTerm.__table__.insert(), rows)
+        logger.info(f"Indexed {len(chunks)} passages of {len(documents)} documents")
+
+    def index(self, db: Session, documents: List[UploadedDocument], parsed_documents: List[Dict[str, Any]]):
+        self.store(db, documents, self.build(parsed_documents))
+
+    @staticmethod
+    def unindexed(db: Session, documents: List[UploadedDocument]) -> List[UploadedDocument]:
+        """Documents without passages in the index (uploaded before it existed)."""
+        indexed = {
+            document_id for (document_id,) in db.query(DocumentChunk.document_id).filter(
+                DocumentChunk.document_id.in_([document.id for document in documents])
+            ).distinct()
+        }
+        return [document for document in documents if document.id not in indexed]
+
+    def ensure_indexed(self, db: Session, project_id: int):
+        """Index project documents missing from the index whose parser output is cached."""
+        documents = self.unindexed(db, db.query(UploadedDocument).filter(
+            UploadedDocument.project_id == project_id
+        ).all())
+        cached = [
+            (document, parsed) for document in documents
+            if (parsed := load_parsed(document.content_hash, document.filename)) is not None
+        ]
+        if not cached:
+            return
+        # Documents not in the parsed cache are indexed when reanalysed
+        self.index(db, [document for document, _ in cached], [parsed for _, parsed in cached])
+        db.commit()
+
+    def search(
+        self,
+        db: Session,
+        project_id: int,
+        query: str,
+        limit: int = 8,
+        max_chars: int = 8000
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the project's passages most relevant to the query, best first.
+
+        Returns:
+            List of dicts with filename, location, text and score, at most
+            max_chars of text in total
+        """
+        query_terms = Counter(tokenize(query))
+        if not query_terms:
+            return []
+
+        total, average_length = db.query(
+            func.count(DocumentChunk.id), func.avg(DocumentChunk.term_count)
+        ).filter(DocumentChunk.project_id == project_id).one()
+        if not total:
+            return []
+
+        postings = db.query(
+            ChunkTerm.term, ChunkTerm.chunk_id, ChunkTerm.frequency, DocumentChunk.term_count
+        ).join(DocumentChunk, DocumentChunk.id == ChunkTerm.chunk_id).filter(
+            ChunkTerm.project_id == project_id,
+            ChunkTerm.term.in_(list(query_terms))
+        ).all()
+
+        document_frequency = Counter(term for term, _, _, _ in postings)
+        scores = defaultdict(float)
+        for term, chunk_id, frequency, length in postings:
+            df = document_frequency[term]
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            saturation = frequency * (self.K1 + 1) / (
+                frequency + self.K1 * (1 - self.B + self.B * length / average_length)
+            )
+            scores[chunk_id] += query_terms[term] * idf * saturation
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        passages = {
+            chunk_id: (filename, location, text)
+            for chunk_id, filename, location, text in db.query(
+                DocumentChunk.id, UploadedDocument.filename, DocumentChunk.location, DocumentChunk.text
+            ).join(UploadedDocument, UploadedDocument.id == DocumentChunk.document_id).filter(
+                DocumentChunk.id.in_([chunk_id for chunk_id, _ in best])
+            )
+        }
+
+        results = []
+        remaining = max_chars
+        for chunk_id, score in best:
+            filename, location, text = passages[chunk_id]
+            if len(text) > remaining:
+                break
+            remaining -= len(text)
+            results.append({
+                "filename": filename,
+                "location": location,
+                "text": text,
+                "score": round(score, 3)
+            })
+        return results
+
+
+# Global document index instance
+document_index = DocumentIndex()
@@ -0,0 +1,235 @@
+"""Write-behind buffer for draft autosaves"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models.draft import ProjectDraft
+from ..models.project import Project
+from ..utils.helpers import merge_patch
+from .draft_history import DraftHistory
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+DraftKey = Tuple[int, str]  # (project_id, step)
+
+# Saved drafts not autosaved for this long are dropped from memory
+IDLE_SECONDS = 300
+
+
+class DraftBuffer:
+    """
+    Coalesces draft autosaves in memory and writes them to the database behind.
+
+    An autosave replaces the buffered draft of its (project, step) and is
+    acknowledged with the draft's new version at once; only the latest
+    version is written, every few seconds, when the user moves on to
+    another step's draft, and at shutdown. A burst of autosaves costs one
+    write, and the project is checked only when a draft is first buffered.
+
+    The buffer is per process, like the memory rate limit backend: with
+    several workers, a client's autosaves must reach the same one.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._entries: Dict[DraftKey, Dict[str, Any]] = {}
+        self._last_step: Dict[int, str] = {}  # Step each project's drafts were last autosaved for
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # One flush at a time, and none while a draft is cleared
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start writing buffered drafts in the background (call from the event loop)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._flush_periodically())
+
+    async def shutdown(self):
+        """Stop the background writes and write what is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await asyncio.to_thread(self.flush)
+
+    def _entry(self, db: Session, project_id: int, step: str) -> Dict[str, Any]:
+        """The buffered draft of a project step, loaded on first use; call with the lock released."""
+        with self._lock:
+            entry = self._entries.get((project_id, step))
+        if entry is not None:
+            return entry
+
+        draft = db.query(ProjectDraft).filter(
+            ProjectDraft.project_id == project_id,
+            ProjectDraft.step == step
+        ).first()
+        if draft is None and db.query(Project.id).filter(Project.id == project_id).first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+        loaded = {
+            "draft_id": draft.id if draft else None,
+            "data": draft.draft_data if draft else None,
+            "version": draft.version if draft else 0,
+            "updated_at": draft.updated_at if draft else None,
+            "dirty": False,
+            "touched": time.monotonic()
+        }
+        with self._lock:
+            return self._entries.setdefault((project_id, step), loaded)
+
+    def save(
+        self,
+        db: Session,
+        project_id: int,
+        step: str,
+        data: Optional[Dict[str, Any]] = None,
+        patch: Optional[Dict[str, Any]] = None,
+        base_version: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Buffer a new version of a project step's draft: the data given, or
+        the current draft with a JSON merge patch applied.
+
+        Raises:
+            HTTPException: 404 if the project does not exist, 409 if
+                base_version is given and the draft has moved on from it
+        """
+        entry = self._entry(db, project_id, step)
+        with self._lock:
+            entry = self._entries.setdefault((project_id, step), entry)  # In case it was just evicted
+            if base_version is not None and base_version != entry["version"]:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Draft is at version {entry['version']}, not {base_version}"
+                )
+            # A new document each time, so a flush in progress keeps the one it read
+            entry["data"] = merge_patch(entry["data"] or {}, patch) if patch is not None else data
+            entry["version"] += 1
+            entry["updated_at"] = datetime.now(timezone.utc)
+            entry["dirty"] = True
+            entry["touched"] = time.monotonic()
+            previous_step = self._last_step.get(project_id)
+            self._last_step[project_id] = step
+            saved = {key: entry[key] for key in ("draft_id", "version", "updated_at")}
+
+        if previous_step is not None and previous_step != step:
+            self.flush(project_id)
+        return saved
+
+    def get(self, db: Session, project_id: int, step: str) -> Dict[str, Any]:
+        """The latest version of a project step's draft, buffered or saved (data None if there is none)."""
+        entry = self._entry(db, project_id, step)
+        with self._lock:
+            return {key: entry[key] for key in ("draft_id", "data", "version", "updated_at")}
+
+    def pending(self, project_id: int) -> Dict[str, Dict[str, Any]]:
+        """Buffered drafts of a project not yet written, by step."""
+        with self._lock:
+            return {
+                step: {key: entry[key] for key in ("data", "version", "updated_at")}
+                for (draft_project_id, step), entry in self._entries.items()
+                if draft_project_id == project_id and entry["dirty"]
+            }
+
+    def discard(self, project_id: int, step: Optional[str] = None):
+        """
+        Drop a project step's draft (or all the project's drafts) from the
+        buffer, waiting for a flush in progress to finish, so it cannot
+        write them back after they are deleted.
+        """
+        with self._flush_lock, self._lock:
+            for key in [key for key in self._entries if key[0] == project_id and step in (None, key[1])]:
+                del self._entries[key]
+
+    def flush(self, project_id: Optional[int] = None) -> int:
+        """
+        Write buffered drafts (of one project, or all) that changed since
+        they were last written, in one transaction.
+
+        Returns:
+            Number of drafts written
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending = {
+                    key: (entry["data"], entry["version"], entry["updated_at"])
+                    for key, entry in self._entries.items()
+                    if entry["dirty"] and (project_id is None or key[0] == project_id)
+                }
+            if not pending:
+                self._evict_idle()
+                return 0
+
+            project_ids = {key[0] for key in pending}
+            db = SessionLocal()
+            try:
+                existing = {id for (id,) in db.query(Project.id).filter(Project.id.in_(project_ids))}
+                drafts = {
+                    (draft.project_id, draft.step): draft
+                    for draft in db.query(ProjectDraft).filter(ProjectDraft.project_id.in_(project_ids))
+                }
+                written = []
+                for (draft_project_id, step), (data, version, updated_at) in pending.items():
+                    if draft_project_id not in existing:
+                        continue  # Project deleted since; dropped below
+                    draft = drafts.get((draft_project_id, step))
+                    if draft is None:
+                        draft = ProjectDraft(project_id=draft_project_id, step=step)
+                        db.add(draft)
+                        drafts[(draft_project_id, step)] = draft
+                    written.append((draft, draft.draft_data))
+                    draft.draft_data = data
+                    draft.version = version
+                    draft.updated_at = updated_at
+                db.flush()
+                for draft, previous in written:
+                    DraftHistory.record(db, draft, previous)
+                draft_ids = {key: draft.id for key, draft in drafts.items()}
+                db.commit()
+            except Exception as e:
+                # Kept in the buffer and retried with the next flush
+                db.rollback()
+                logger.error(f"Failed to write {len(pending)} buffered drafts: {e}")
+                return 0
+            finally:
+                db.close()
+
+            with self._lock:
+                for key, (data, version, updated_at) in pending.items():
+                    entry = self._entries.get(key)
+                    if entry is None:
+                        continue
+                    if key[0] not in existing:
+                        del self._entries[key]
+                        continue
+                    entry["draft_id"] = draft_ids[key]
+                    if entry["version"] == version:  # Not autosaved again meanwhile
+                        entry["dirty"] = False
+            self._evict_idle()
+
+        logger.debug(f"Wrote {len(pending)} buffered drafts")
+        return len(pending)
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - IDLE_SECONDS
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if not entry["dirty"] and entry["touched"] < cutoff]:
+                del self._entries[key]
+            buffered_projects = {key[0] for key in self._entries}
+            for project_id in [project_id for project_id in self._last_step if project_id not in buffered_projects]:
+                del self._last_step[project_id]
+
+
+draft_buffer = DraftBuffer(settings.draft_flush_interval_seconds)
@@ -0,0 +1,105 @@
+"""Version history of drafts, stored as snapshots and diffs"""
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from ..models.draft import DraftVersion, ProjectDraft
+from ..utils.helpers import merge_diff, merge_patch
+
+# A full snapshot every this many versions; restoring applies fewer diffs than that
+SNAPSHOT_EVERY = 20
+# Versions are kept from the oldest of this many snapshots on, at most
+# SNAPSHOT_EVERY * KEEP_SNAPSHOTS per draft
+KEEP_SNAPSHOTS = 10
+
+
+class DraftHistory:
+    """
+    Restorable versions of each draft, in bounded space.
+
+    Each written version is stored as a JSON merge patch from the one
+    before, with a full snapshot every SNAPSHOT_EVERY versions, so a
+    version is rebuilt from the snapshot before it and at most
+    SNAPSHOT_EVERY - 1 small patches. Versions older than the last
+    KEEP_SNAPSHOTS snapshots are dropped.
+    """
+
+    @staticmethod
+    def record(db: Session, draft: ProjectDraft, previous: Optional[Dict[str, Any]]):
+        """
+        Add a draft's current version to its history, in the caller's
+        transaction; previous is the draft data it replaced, None for a
+        new draft.
+        """
+        recent = db.query(DraftVersion.version, DraftVersion.is_snapshot).filter(
+            DraftVersion.draft_id == draft.id
+        ).order_by(DraftVersion.version.desc()).limit(SNAPSHOT_EVERY - 1).all()
+
+        patch = merge_diff(previous, draft.draft_data) if previous is not None else None
+        is_snapshot = (
+            patch is None
+            or not any(row.is_snapshot for row in recent)  # SNAPSHOT_EVERY - 1 diffs since the last one
+            or recent[0].version >= draft.version  # History out of step with the draft, e.g. restarted
+            or merge_patch(previous, patch) != draft.draft_data  # Sets a value to null
+        )
+        if recent and recent[0].version >= draft.version:
+            db.query(DraftVersion).filter(
+                DraftVersion.draft_id == draft.id,
+                DraftVersion.version >= draft.version
+            ).delete(synchronize_session=False)
+
+        db.add(DraftVersion(
+            draft_id=draft.id,
+            version=draft.version,
+            is_snapshot=is_snapshot,
+            data=draft.draft_data if is_snapshot else patch,
+            created_at=draft.updated_at
+        ))
+        if is_snapshot:
+            DraftHistory._prune(db, draft.id)
+
+    @staticmethod
+    def _prune(db: Session, draft_id: int):
+        db.flush()
+        oldest_kept = db.query(DraftVersion.version).filter(
+            DraftVersion.draft_id == draft_id,
+            DraftVersion.is_snapshot.is_(True)
+        ).order_by(DraftVersion.version.desc()).offset(KEEP_SNAPSHOTS - 1).limit(1).scalar()
+        if oldest_kept is not None:
+            db.query(DraftVersion).filter(
+                DraftVersion.draft_id == draft_id,
+                DraftVersion.version < oldest_kept
+            ).delete(synchronize_session=False)
+
+    @staticmethod
+    def list_versions(db: Session, draft_id: int) -> List[Dict[str, Any]]:
+        """A draft's restorable versions, newest first, without their data."""
+        rows = db.query(DraftVersion.version, DraftVersion.is_snapshot, DraftVersion.created_at).filter(
+            DraftVersion.draft_id == draft_id
+        ).order_by(DraftVersion.version.desc())
+        return [
+            {"version": row.version, "is_snapshot": row.is_snapshot, "saved_at": row.created_at}
+            for row in rows
+        ]
+
+    @staticmethod
+    def get_version(db: Session, draft_id: int, version: int) -> Optional[Dict[str, Any]]:
+        """A draft's data at a version, or None if that version is not kept."""
+        base = db.query(DraftVersion.version).filter(
+            DraftVersion.draft_id == draft_id,
+            DraftVersion.version <= version,
+            DraftVersion.is_snapshot.is_(True)
+        ).order_by(DraftVersion.version.desc()).limit(1).scalar()
+        if base is None:
+            return None
+
+        rows = db.query(DraftVersion.version, DraftVersion.is_snapshot, DraftVersion.data).filter(
+            DraftVersion.draft_id == draft_id,
+            DraftVersion.version >= base,
+            DraftVersion.version <= version
+        ).order_by(DraftVersion.version).all()
+        if rows[-1].version != version:
+            return None
+
+        data = None
+        for row in rows:
+            data = row.data if row.is_snapshot else merge_patch(data, row.data)
+        return data
@@ -0,0 +1,177 @@
+"""Totals across all audits, maintained as step results are saved"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models import PortfolioMetrics, ProjectMetrics, Step1Data, Step2Process, Step3Data
+
+logger = logging.getLogger(__name__)
+
+PORTFOLIO_ID = 1
+# ProjectMetrics columns summed into the PortfolioMetrics columns of the same name
+SUMMED_COLUMNS = ["process_count", "analyzed_process_count", "current_cost", "waste_cost", "savings_potential"]
+
+
+def _number(data: Any, key: str) -> Optional[float]:
+    """A numeric field of Claude's output, or None if it is missing or not a number."""
+    value = data.get(key) if isinstance(data, dict) else None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _best_benefits(result: Any) -> float:
+    """Year 1 benefits of the best of a Step 3 result's scenarios."""
+    scenarios = result.get("scenarios") if isinstance(result, dict) else None
+    if not isinstance(scenarios, list):
+        return 0.0
+    return max((_number(s.get("benefits_year1"), "total") or 0.0 for s in scenarios if isinstance(s, dict)), default=0.0)
+
+
+def project_metrics(
+    step1_results: Optional[Dict[str, Any]],
+    step2_results: List[Optional[Dict[str, Any]]],
+    step3_results: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """ProjectMetrics values for a project's Step 1 results, Step 2 process results and Step 3 results."""
+    analyzed = [result for result in step2_results if isinstance(result, dict) and result]
+
+    # Step 3 results hold scenarios for each process; the best one of each counts
+    if isinstance(step3_results, dict) and isinstance(step3_results.get("process_scenarios"), list):
+        savings_potential = sum(
+            _best_benefits(process.get("scenarios"))
+            for process in step3_results["process_scenarios"] if isinstance(process, dict)
+        )
+    else:
+        savings_potential = _best_benefits(step3_results)
+
+    return {
+        "process_count": len(step2_results),
+        "analyzed_process_count": len(analyzed),
+        "current_cost": sum(_number(result.get("process_costs"), "total_cost") or 0.0 for result in analyzed),
+        "waste_cost": sum(_number(result.get("muda_analysis"), "total_waste_cost") or 0.0 for result in analyzed),
+        "savings_potential": savings_potential,
+        "maturity_score": _number((step1_results or {}).get("digital_maturity"), "overall_score")
+    }
+
+
+class PortfolioService:
+    """
+    Portfolio metrics for dashboards, read without loading any project's JSON.
+
+    Each project's headline numbers are kept in ProjectMetrics, recomputed
+    from that project's step results when they are saved. The change is
+    added to the single PortfolioMetrics row, so the totals are one row
+    read however many projects there are.
+    """
+
+    @staticmethod
+    def refresh_project(db: Session, project_id: int):
+        """
+        Recompute a project's metrics and add the change to the portfolio totals.
+
+        Call after changing the project's step results, before committing:
+        the metrics change in the caller's transaction.
+        """
+        db.flush()
+        step3_row = db.query(Step3Data.analysis_results).filter(Step3Data.project_id == project_id).first()
+        metrics = project_metrics(
+            db.query(Step1Data.analysis_results).filter(Step1Data.project_id == project_id).scalar(),
+            [results for (results,) in db.query(Step2Process.analysis_results).filter(
+                Step2Process.project_id == project_id
+            )],
+            step3_row[0] if step3_row else None
+        )
+
+        row = db.query(ProjectMetrics).filter(ProjectMetrics.project_id == project_id).with_for_update().first()
+        delta = {}
+        if row is None:
+            row = ProjectMetrics(project_id=project_id)
+            db.add(row)
+            delta["project_count"] = 1
+
+        for column in SUMMED_COLUMNS:
+            delta[column] = metrics[column] - (getattr(row, column) or 0)
+            setattr(row, column, metrics[column])
+        delta.update(PortfolioService._maturity_delta(row.maturity_score, metrics["maturity_score"]))
+        row.maturity_score = metrics["maturity_score"]
+
+        PortfolioService._apply(db, delta)
+
+    @staticmethod
+    def remove_project(db: Session, project_id: int):
+        """Take a project out of the portfolio totals; call before deleting it."""
+        row = db.query(ProjectMetrics).filter(ProjectMetrics.project_id == project_id).with_for_update().first()
+        if row is None:
+            return
+        delta = {column: -(getattr(row, column) or 0) for column in SUMMED_COLUMNS}
+        delta["project_count"] = -1
+        delta.update(PortfolioService._maturity_delta(row.maturity_score, None))
+        db.delete(row)
+        PortfolioService._apply(db, delta)
+
+    @staticmethod
+    def _maturity_delta(old: Optional[float], new: Optional[float]) -> Dict[str, float]:
+        return {
+            "maturity_score_total": (new or 0) - (old or 0),
+            "maturity_scored_projects": (new is not None) - (old is not None)
+        }
+
+    @staticmethod
+    def _apply(db: Session, delta: Dict[str, float]):
+        changes = {getattr(PortfolioMetrics, column): getattr(PortfolioMetrics, column) + value
+                   for column, value in delta.items() if value}
+        if not changes:
+            return
+        # A plain UPDATE, so changes to other projects in concurrent
+        # transactions add up instead of overwriting each other
+        changes[PortfolioMetrics.updated_at] = datetime.now(timezone.utc)
+        updated = db.query(PortfolioMetrics).filter(
+            PortfolioMetrics.id == PORTFOLIO_ID
+        ).update(changes, synchronize_session=False)
+        if not updated:
+            PortfolioService.rebuild(db)
+
+    @staticmethod
+    def rebuild(db: Session):
+        """Recompute the portfolio totals from all project metrics."""
+        db.flush()
+        totals = db.query(
+            func.count(ProjectMetrics.project_id),
+            *[func.coalesce(func.sum(getattr(ProjectMetrics, column)), 0) for column in SUMMED_COLUMNS],
+            func.coalesce(func.sum(ProjectMetrics.maturity_score), 0),
+            func.count(ProjectMetrics.maturity_score)
+        ).one()
+
+        portfolio = db.get(PortfolioMetrics, PORTFOLIO_ID)
+        if portfolio is None:
+            portfolio = PortfolioMetrics(id=PORTFOLIO_ID)
+            db.add(portfolio)
+        columns = ["project_count", *SUMMED_COLUMNS, "maturity_score_total", "maturity_scored_projects"]
+        for column, value in zip(columns, totals):
+            setattr(portfolio, column, value)
+        portfolio.updated_at = datetime.now(timezone.utc)
+        logger.info(f"Portfolio metrics rebuilt from {portfolio.project_count} projects")
+
+    @staticmethod
+    def get_summary(db: Session) -> Dict[str, Any]:
+        """Portfolio totals, from the one PortfolioMetrics row."""
+        portfolio = db.get(PortfolioMetrics, PORTFOLIO_ID) or PortfolioMetrics(
+            **{column: 0 for column in ["project_count", *SUMMED_COLUMNS, "maturity_scored_projects"]},
+            maturity_score_total=0
+        )
+        current_cost = portfolio.current_cost
+        return {
+            "project_count": portfolio.project_count,
+            "process_count": portfolio.process_count,
+            "analyzed_process_count": portfolio.analyzed_process_count,
+            "total_current_cost": round(current_cost, 2),
+            "total_waste_cost": round(portfolio.waste_cost, 2),
+            "total_savings_potential": round(portfolio.savings_potential, 2),
+            "roi_potential": round(portfolio.savings_potential / current_cost * 100, 2) if current_cost > 0 else 0,
+            "average_maturity_score": round(
+                portfolio.maturity_score_total / portfolio.maturity_scored_projects, 1
+            ) if portfolio.maturity_scored_projects else None,
+            "updated_at": portfolio.updated_at
+        }
@@ -0,0 +1,225 @@
+"""Full-text search across the findings and documents of all projects"""
+import logging
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from ..models.search import Finding
+from ..models.step2 import Step2Process
+from ..utils.polish_text import STOPWORDS, TERM_LENGTH, stem, strip_suffix
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+# (field, title, content) of a finding
+FindingText = Tuple[str, Optional[str], str]
+
+# Step 1 results fields indexed, one finding per list item
+STEP1_FIELDS = ["key_findings", "processes_scoring", "recommendations"]
+SNIPPET_WORDS = 24
+
+
+def _strings(value: Any) -> Iterator[str]:
+    """Text in a piece of Claude's output, however nested."""
+    if isinstance(value, str):
+        if value.strip():
+            yield value.strip()
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def _finding(field: str, title: Optional[str], value: Any) -> Optional[FindingText]:
+    content = "\n".join(_strings(value))
+    return (field, title, content) if content else None
+
+
+def findings_from(step: str, results: Any, process_name: Optional[str] = None) -> List[FindingText]:
+    """Findings of a step's analysis results (for Step 2, of one process)."""
+    if not isinstance(results, dict):
+        return []
+    findings = []
+    if step == "step1":
+        for field in STEP1_FIELDS:
+            value = results.get(field)
+            for item in value if isinstance(value, list) else [value]:
+                title = item.get("process_name") if isinstance(item, dict) else None
+                findings.append(_finding(field, title, item))
+    elif step == "step2":
+        for bottleneck in results.get("bottlenecks") or []:
+            findings.append(_finding("bottlenecks", process_name, bottleneck))
+    elif step == "step3":
+        # Scenarios are analysed per process; each has a recommended one
+        for process in results.get("process_scenarios") or []:
+            if isinstance(process, dict) and isinstance(process.get("scenarios"), dict):
+                comparison = process["scenarios"].get("comparison") or {}
+                findings.append(_finding(
+                    "recommendations", process.get("process_name"),
+                    [comparison.get("recommendation"), comparison.get("rationale")] if isinstance(comparison, dict) else None
+                ))
+    return [finding for finding in findings if finding]
+
+
+def match_terms(query: str) -> List[Tuple[str, str]]:
+    """
+    Prefixes to match for each word of a query: its search term (see
+    polish_text.stem), so inflected forms and words typed without Polish
+    letters match too, and the same unfolded for PostgreSQL, whose index
+    keeps diacritics.
+    """
+    terms = []
+    for word in _WORD.findall(query.lower()):
+        if len(word) <= 1 or word in STOPWORDS or word.isdigit():
+            continue
+        prefixes = (stem(word), strip_suffix(word)[:TERM_LENGTH])
+        if prefixes not in terms:
+            terms.append(prefixes)
+    return terms
+
+
+class SearchIndex:
+    """
+    Ranked full-text search over findings and document passages.
+
+    Findings are the analysis results consultants search for; passages
+    are the DocumentChunk rows of the per-project document index. Both
+    are indexed by the database (FTS5 tables on SQLite, tsvector columns
+    on PostgreSQL), so a query reads the index instead of every project's
+    results, and snippets are cut only for the page of results returned.
+    """
+
+    @staticmethod
+    def index_results(
+        db: Session,
+        project_id: int,
+        step: str,
+        results: Any,
+        process: Optional[Step2Process] = None
+    ):
+        """Replace the findings of a project's step results (for Step 2, of one process) in the session."""
+        existing = db.query(Finding).filter(Finding.project_id == project_id, Finding.step == step)
+        if process is not None:
+            existing = existing.filter(Finding.process_id == process.id)
+        existing.delete(synchronize_session=False)
+
+        db.add_all(
+            Finding(
+                project_id=project_id,
+                step=step,
+                process_id=process.id if process is not None else None,
+                field=field,
+                title=title,
+                content=content
+            )
+            for field, title, content in findings_from(step, results, process.process_name if process else None)
+        )
+
+    def search(self, db: Session, query: str, limit: int = 20, offset: int = 0) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Findings and document passages matching every word of the query, best first.
+
+        Returns:
+            The page of results, and whether more follow
+        """
+        terms = match_terms(query)
+        if not terms:
+            return [], False
+
+        postgresql = db.get_bind().dialect.name == "postgresql"
+        if postgresql:
+            match = " & ".join(f"({term}:* | {unfolded}:*)" for term, unfolded in terms)
+        else:
+            # The FTS5 index folds diacritics like stem() does
+            match = " AND ".join(f'"{term}"*' for term, _ in terms)
+
+        ranked = db.execute(text(POSTGRES_RANK if postgresql else SQLITE_RANK), {
+            "match": match, "limit": limit + 1, "offset": offset
+        }).all()
+        has_more = len(ranked) > limit
+        ranked = ranked[:limit]
+
+        hits = {}
+        for kind, statement in (("finding", FINDING_HITS), ("document", DOCUMENT_HITS)):
+            ids = [row.id for row in ranked if row.kind == kind]
+            if not ids:
+                continue
+            rows = db.execute(
+                text(statement[postgresql]).bindparams(bindparam("ids", expanding=True)),
+                {"match": match, "ids": ids, "words": SNIPPET_WORDS}
+            ).mappings()
+            hits.update(((kind, row["id"]), dict(row)) for row in rows)
+
+        results = []
+        for row in ranked:
+            hit = hits.get((row.kind, row.id))
+            if hit is not None:  # Deleted since ranking
+                results.append({**hit, "score": round(-row.score, 4)})
+        return results, has_more
+
+
+# Ranking: lower score is better (negated BM25 on SQLite, negated ts_rank on PostgreSQL)
+SQLITE_RANK = """
+    SELECT 'finding' AS kind, rowid AS id, bm25(findings_fts, 2.0, 1.0) AS score
+    FROM findings_fts WHERE findings_fts MATCH :match
+    UNION ALL
+    SELECT 'document', rowid, bm25(document_chunks_fts)
+    FROM document_chunks_fts WHERE document_chunks_fts MATCH :match
+    ORDER BY score, id LIMIT :limit OFFSET :offset
+"""
+POSTGRES_RANK = """
+    SELECT 'finding' AS kind, id, -ts_rank(search_vector, query) AS score
+    FROM findings, to_tsquery('simple', :match) AS query WHERE search_vector @@ query
+    UNION ALL
+    SELECT 'document', id, -ts_rank(search_vector, query)
+    FROM document_chunks, to_tsquery('simple', :match) AS query WHERE search_vector @@ query
+    ORDER BY score, id LIMIT :limit OFFSET :offset
+"""
+
+# Ranked results with their project and snippet, [SQLite, PostgreSQL]
+FINDING_HITS = [
+    """
+    SELECT f.id, f.project_id, p.name AS project_name, p.client_name, f.step AS source, f.field, f.title,
+           snippet(findings_fts, 1, '**', '**', '…', :words) AS snippet
+    FROM findings_fts
+    JOIN findings f ON f.id = findings_fts.rowid
+    JOIN projects p ON p.id = f.project_id
+    WHERE findings_fts MATCH :match AND findings_fts.rowid IN :ids
+    """,
+    """
+    SELECT f.id, f.project_id, p.name AS project_name, p.client_name, f.step AS source, f.field, f.title,
+           ts_headline('simple', f.content, to_tsquery('simple', :match),
+                       'StartSel=**, StopSel=**, MaxFragments=1, MaxWords=' || :words || ', MinWords=8') AS snippet
+    FROM findings f
+    JOIN projects p ON p.id = f.project_id
+    WHERE f.id IN :ids
+    """
+]
+DOCUMENT_HITS = [
+    """
+    SELECT c.id, c.project_id, p.name AS project_name, p.client_name, 'document' AS source, NULL AS field,
+           d.filename || COALESCE(' – ' || c.location, '') AS title,
+           snippet(document_chunks_fts, 0, '**', '**', '…', :words) AS snippet
+    FROM document_chunks_fts
+    JOIN document_chunks c ON c.id = document_chunks_fts.rowid
+    JOIN uploaded_documents d ON d.id = c.document_id
+    JOIN projects p ON p.id = c.project_id
+    WHERE document_chunks_fts MATCH :match AND document_chunks_fts.rowid IN :ids
+    """,
+    """
+    SELECT c.id, c.project_id, p.name AS project_name, p.client_name, 'document' AS source, NULL AS field,
+           d.filename || COALESCE(' – ' || c.location, '') AS title,
+           ts_headline('simple', c.text, to_tsquery('simple', :match),
+                       'StartSel=**, StopSel=**, MaxFragments=1, MaxWords=' || :words || ', MinWords=8') AS snippet
+    FROM document_chunks c
+    JOIN uploaded_documents d ON d.id = c.document_id
+    JOIN projects p ON p.id = c.project_id
+    WHERE c.id IN :ids
+    """
+]
+
+
+search_index = SearchIndex()
@@ -0,0 +1,422 @@
+"""Vectorised, chunk-mergeable profiling of tabular uploads"""
+import logging
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Formats tried when detecting date columns (Polish exports use day-first)
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%d.%m.%Y",
+    "%d.%m.%Y %H:%M",
+    "%d.%m.%Y %H:%M:%S",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%Y/%m/%d",
+]
+
+
+class ColumnProfile:
+    """
+    Profile of one string column, updated chunk by chunk.
+
+    Counts, nulls, numeric min/max/mean/std, date ranges and extreme values
+    are exact. Value frequencies are tracked for at most MAX_TRACKED_VALUES
+    distinct values, and quantiles come from an evenly spaced sample of
+    MAX_SAMPLED_NUMBERS values, so both stay bounded in memory.
+    """
+
+    MAX_TRACKED_VALUES = 1000
+    MAX_SAMPLED_NUMBERS = 20_000
+    TOP_VALUES = 5
+    EXTREME_VALUES = 3
+    # Share of non-null values that must parse for a numeric/date column
+    TYPE_THRESHOLD = 0.95
+    # Leading values per chunk used to detect date formats and text columns
+    TYPE_SAMPLE_SIZE = 200
+    # Periods reported for a date column before switching to years
+    MAX_PERIODS = 24
+
+    def __init__(self, name: str, decimal: str = ".", leading_nulls: int = 0):
+        self.name = name
+        self.decimal = decimal
+        self.count = 0
+        self.nulls = leading_nulls
+        self.num_count = 0
+        self.num_sum = 0.0
+        self.num_sumsq = 0.0
+        self.num_min = None
+        self.num_max = None
+        self.sequential = True
+        self.num_sample = SystematicSample(self.MAX_SAMPLED_NUMBERS)
+        self.highest = pd.Series(dtype=float)
+        self.lowest = pd.Series(dtype=float)
+        self.date_format: Optional[str] = None
+        self.date_checked = False
+        self.date_count = 0
+        self.date_min = None
+        self.date_max = None
+        self.month_counts = pd.Series(dtype="int64")
+        self.value_counts = pd.Series(dtype="int64")
+        self.values_truncated = False
+
+    def update(self, values: pd.Series) -> pd.Series:
+        """
+        Add a chunk of raw string values indexed by global row number.
+
+        Returns:
+            The chunk's values as floats (NaN where not numeric)
+        """
+        values = values.str.strip()
+        present = values[values != ""]
+        self.nulls += len(values) - len(present)
+        self.count += len(present)
+        if present.empty:
+            return pd.Series(np.nan, index=values.index)
+
+        # Coercing a text column costs more than parsing a numeric one; skip
+        # chunks whose leading values contain no number at all
+        if np.isnan(self._to_numeric(present.head(self.TYPE_SAMPLE_SIZE))).all():
+            numbers = pd.Series(np.nan, index=present.index)
+        else:
+            numbers = pd.Series(self._to_numeric(present), index=present.index)
+        valid_numbers = numbers.dropna()
+        if not valid_numbers.empty:
+            self._update_numbers(valid_numbers)
+
+        if not self.date_checked:
+            self.date_format = self._detect_date_format(present[numbers.isna()])
+            self.date_checked = True
+        if self.date_format:
+            dates = pd.to_datetime(present, format=self.date_format, errors="coerce").dropna()
+            if not dates.empty:
+                self._update_dates(dates)
+
+        self._update_value_counts(present)
+        return numbers.reindex(values.index)
+
+    def _to_numeric(self, values: pd.Series) -> np.ndarray:
+        if self.decimal == ",":
+            values = values.str.replace(" ", "", regex=False).str.replace(",", ".", regex=False)
+        return pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+
+    def _update_numbers(self, numbers: pd.Series):
+        array = numbers.to_numpy()
+        # Row numbers/IDs: integers increasing across the whole column
+        self.sequential = (
+            self.sequential
+            and (self.num_max is None or array[0] > self.num_max)
+            and bool(np.all(np.diff(array) > 0))
+            and bool(np.all(array == np.floor(array)))
+        )
+        self.num_count += array.size
+        self.num_sum += float(array.sum())
+        self.num_sumsq += float(np.square(array).sum())
+        chunk_min, chunk_max = float(array.min()), float(array.max())
+        self.num_min = chunk_min if self.num_min is None else min(self.num_min, chunk_min)
+        self.num_max = chunk_max if self.num_max is None else max(self.num_max, chunk_max)
+        self.num_sample.update(array, numbers.index.to_numpy())
+        # Extremes keep their row numbers so the report can point at them
+        self.highest = _merge_extremes(self.highest, numbers, self.EXTREME_VALUES, largest=True)
+        self.lowest = _merge_extremes(self.lowest, numbers, self.EXTREME_VALUES, largest=False)
+
+    def _update_dates(self, dates: pd.Series):
+        self.date_count += len(dates)
+        chunk_min, chunk_max = dates.min(), dates.max()
+        self.date_min = chunk_min if self.date_min is None else min(self.date_min, chunk_min)
+        self.date_max = chunk_max if self.date_max is None else max(self.date_max, chunk_max)
+        self.month_counts = _add_counts(self.month_counts, dates.dt.to_period("M").value_counts())
+
+    def _detect_date_format(self, values: pd.Series) -> Optional[str]:
+        sample = values.head(self.TYPE_SAMPLE_SIZE)
+        if sample.empty:
+            return None
+        for date_format in DATE_FORMATS:
+            parsed = pd.to_datetime(sample, format=date_format, errors="coerce")
+            if parsed.notna().mean() >= self.TYPE_THRESHOLD:
+                return date_format
+        return None
+
+    def _update_value_counts(self, values: pd.Series):
+        merged = _add_counts(self.value_counts, values.value_counts())
+        if len(merged) > self.MAX_TRACKED_VALUES:
+            # Keep the most frequent values only
+            self.values_truncated = True
+            merged = merged.nlargest(self.MAX_TRACKED_VALUES)
+        self.value_counts = merged
+
+    @property
+    def dtype(self) -> str:
+        if self.count == 0:
+            return "empty"
+        if self.num_count >= self.count * self.TYPE_THRESHOLD:
+            return "number"
+        if self.date_format and self.date_count >= self.count * self.TYPE_THRESHOLD:
+            return "datetime"
+        return "text"
+
+    @property
+    def is_measure(self) -> bool:
+        """Numeric column worth aggregating (not a row number or ID)."""
+        return self.dtype == "number" and not self.is_sequential
+
+    @property
+    def is_sequential(self) -> bool:
+        return self.sequential and self.num_count > 1
+
+    @property
+    def distinct(self) -> int:
+        return len(self.value_counts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        dtype = self.dtype
+        profile = {
+            "dtype": dtype,
+            "count": self.count,
+            "nulls": self.nulls,
+            "distinct": self.distinct,
+            "distinct_is_lower_bound": self.values_truncated
+        }
+        if dtype == "number" and self.is_sequential:
+            profile["sequential_id"] = True
+            profile["min"] = self.num_min
+            profile["max"] = self.num_max
+        elif dtype == "number":
+            profile.update(self._distribution())
+        elif dtype == "datetime":
+            profile.update(self._time_span())
+        elif dtype == "text":
+            top = self.value_counts.nlargest(self.TOP_VALUES)
+            profile["top_values"] = [
+                {"value": value, "count": int(count)}
+                for value, count in top.items()
+            ]
+        return profile
+
+    def _distribution(self) -> Dict[str, Any]:
+        mean = self.num_sum / self.num_count
+        variance = max(self.num_sumsq / self.num_count - mean * mean, 0.0)
+        p5, q1, median, q3, p95 = np.percentile(self.num_sample.values, [5, 25, 50, 75, 95])
+        summary = {
+            "min": self.num_min,
+            "max": self.num_max,
+            "sum": _round(self.num_sum),
+            "mean": _round(mean),
+            "std": _round(variance ** 0.5),
+            "quantiles": {
+                "p5": _round(p5),
+                "p25": _round(q1),
+                "p50": _round(median),
+                "p75": _round(q3),
+                "p95": _round(p95)
+            }
+        }
+
+        # Tukey fences; the outlier count is extrapolated from the sample
+        iqr = q3 - q1
+        if iqr > 0:
+            low, high = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+            sample = self.num_sample.values
+            share = float(np.mean((sample < low) | (sample > high)))
+            if share > 0 or self.num_max > high or self.num_min < low:
+                summary["outliers"] = {
+                    "fences": [_round(low), _round(high)],
+                    "estimated_count": max(1, int(round(share * self.num_count))),
+                    "highest": _extremes(self.highest[self.highest > high]),
+                    "lowest": _extremes(self.lowest[self.lowest < low])
+                }
+        return summary
+
+    def _time_span(self) -> Dict[str, Any]:
+        span = {
+            "min": self.date_min.isoformat(),
+            "max": self.date_max.isoformat(),
+            "span_days": (self.date_max - self.date_min).days
+        }
+        counts = self.month_counts.sort_index()
+        period = "month"
+        if len(counts) > self.MAX_PERIODS:
+            counts = counts.groupby(counts.index.year).sum()
+            period = "year"
+        span[f"rows_per_{period}"] = {str(key): int(count) for key, count in counts.items()}
+        return span
+
+
+class TableProfiler:
+    """
+    Profiles every column of a table fed in chunks of string columns, plus
+    group-by aggregates of numeric columns over low-cardinality text columns.
+    """
+
+    # Distinct values above which a text column is not treated as categorical
+    MAX_GROUPS = 20
+    # Limits on what group_aggregates reports, to keep prompts compact
+    REPORTED_GROUPS = 10
+    REPORTED_GROUP_COLUMNS = 3
+    REPORTED_MEASURES = 5
+
+    def __init__(self, columns: List[str], decimal: str = "."):
+        self.rows = 0
+        self.decimal = decimal
+        self.profiles = {column: ColumnProfile(column, decimal) for column in columns}
+        # Per categorical column: frame indexed by group, columns (measure, count|sum)
+        self.groups: Dict[str, pd.DataFrame] = {}
+        self.not_categorical = set()
+
+    def update(self, chunk: pd.DataFrame):
+        """Add a chunk of string columns; columns first seen here are backfilled as null."""
+        chunk = chunk.set_axis(pd.RangeIndex(self.rows, self.rows + len(chunk)))
+        for column in chunk.columns:
+            if column not in self.profiles:
+                self.profiles[column] = ColumnProfile(column, self.decimal, leading_nulls=self.rows)
+        self.rows += len(chunk)
+
+        numbers = {}
+        for column, profile in self.profiles.items():
+            if column in chunk.columns:
+                numbers[column] = profile.update(chunk[column].astype(str))
+            else:
+                profile.nulls += len(chunk)
+        self._update_groups(chunk, numbers)
+
+    def _update_groups(self, chunk: pd.DataFrame, numbers: Dict[str, pd.Series]):
+        # Every numeric column: a column that looks sequential so far may not
+        # be by the end, and group_aggregates reports only the measures
+        measures = [column for column in numbers if self.profiles[column].dtype == "number"]
+        if not measures:
+            return
+        values = pd.DataFrame({column: numbers[column] for column in measures})
+
+        for column in numbers:
+            if column in self.not_categorical:
+                continue
+            profile = self.profiles[column]
+            if profile.dtype == "number" or profile.distinct > self.MAX_GROUPS:
+                # Cardinality only grows, so the column is out for good
+                self.not_categorical.add(column)
+                self.groups.pop(column, None)
+                continue
+            keys = chunk[column].astype(str).str.strip()
+            present = keys != ""
+            aggregated = values[present].groupby(keys[present]).agg(["count", "sum"])
+            if column in self.groups:
+                aggregated = self.groups[column].add(aggregated, fill_value=0)
+            self.groups[column] = aggregated
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {column: profile.to_dict() for column, profile in self.profiles.items()}
+
+    def group_aggregates(self) -> Dict[str, Dict[str, Any]]:
+        """Sum and mean of numeric columns per group of each categorical column, largest groups first."""
+        measures = [
+            column for column, profile in self.profiles.items()
+            if profile.is_measure
+        ][:self.REPORTED_MEASURES]
+        result = {}
+        for column, aggregated in self.groups.items():
+            profile = self.profiles[column]
+            # Categorical: repeated values, not free text or identifiers
+            if profile.dtype != "text" or not 2 <= profile.distinct <= profile.count / 2:
+                continue
+            groups = {}
+            for group, rows in profile.value_counts.nlargest(self.REPORTED_GROUPS).items():
+                summary = {"rows": int(rows)}
+                for measure in measures:
+                    if (measure, "count") not in aggregated.columns or group not in aggregated.index:
+                        continue
+                    count = aggregated.at[group, (measure, "count")]
+                    total = aggregated.at[group, (measure, "sum")]
+                    if count:
+                        summary[measure] = {"sum": _round(total), "mean": _round(total / count)}
+                groups[group] = summary
+            result[column] = groups
+            if len(result) == self.REPORTED_GROUP_COLUMNS:
+                break
+        return result
+
+
+class SystematicSample:
+    """
+    Evenly spaced sample of numbers from a stream of unknown length.
+
+    Keeps values whose row position is a multiple of the stride; the stride
+    doubles whenever the sample would outgrow its size.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.stride = 1
+        self.values = np.empty(0)
+        self.positions = np.empty(0, dtype=np.int64)
+
+    def update(self, values: np.ndarray, positions: np.ndarray):
+        while True:
+            kept = self.positions % self.stride == 0
+            selected = positions % self.stride == 0
+            if np.count_nonzero(kept) + np.count_nonzero(selected) <= self.size:
+                break
+            self.stride *= 2
+        self.values = np.concatenate([self.values[kept], values[selected]])
+        self.positions = np.concatenate([self.positions[kept], positions[selected]])
+
+
+class StratifiedSample:
+    """
+    Evenly spaced row sample of a stream of unknown length.
+
+    Keeps every stride-th row; when the sample outgrows its size, every
+    other kept row is dropped and the stride doubles. The result holds one
+    row per equal-sized stratum of the file, so late rows are represented
+    as well as the first ones.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.stride = 1
+        self.rows: List[Dict[str, Any]] = []
+        self.indexes: List[int] = []
+
+    def update(self, chunk: pd.DataFrame, offset: int):
+        """Add a chunk whose first row has global index offset."""
+        positions = np.arange(offset, offset + len(chunk))
+        # Settle the stride before materialising any rows of the chunk
+        while True:
+            kept = sum(1 for index in self.indexes if index % self.stride == 0)
+            selected = np.flatnonzero(positions % self.stride == 0)
+            if kept + selected.size <= self.size:
+                break
+            self.stride *= 2
+
+        keep = [i for i, index in enumerate(self.indexes) if index % self.stride == 0]
+        self.indexes = [self.indexes[i] for i in keep]
+        self.rows = [self.rows[i] for i in keep]
+        if selected.size:
+            self.indexes.extend(int(positions[i]) for i in selected)
+            self.rows.extend(chunk.iloc[selected].to_dict("records"))
+
+
+def _add_counts(counts: pd.Series, chunk_counts: pd.Series) -> pd.Series:
+    if counts.empty:
+        return chunk_counts
+    return counts.add(chunk_counts, fill_value=0).astype("int64")
+
+
+def _merge_extremes(current: pd.Series, numbers: pd.Series, n: int, largest: bool) -> pd.Series:
+    chunk = numbers.nlargest(n) if largest else numbers.nsmallest(n)
+    merged = chunk if current.empty else pd.concat([current, chunk])
+    return merged.nlargest(n) if largest else merged.nsmallest(n)
+
+
+def _extremes(values: pd.Series) -> List[Dict[str, Any]]:
+    # Row numbers are 1-based data rows (header excluded)
+    return [{"row": int(row) + 1, "value": _round(value)} for row, value in values.items()]
+
+
+def _round(value: float) -> float:
+    return round(float(value), 4)
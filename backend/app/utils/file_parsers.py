@@ -2,19 +2,28 @@
 import io
 import csv
 import logging
+import mmap
+import os
+import re
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime, date, time as dt_time, timedelta
 from pathlib import Path
-from typing import Dict, Any, List
-import chardet
+from typing import Dict, Any, Iterator, List, Tuple, Union
+from xml.etree import ElementTree
+from .text_encoding import Content, detect_encoding, decode_text, iter_decoded, count_lines
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever parser output changes; invalidates cached parser output
+PARSER_VERSION = 5
+
 try:
     import openpyxl
-    import pandas as pd
     EXCEL_AVAILABLE = True
 except ImportError:
     EXCEL_AVAILABLE = False
-    logger.warning("Excel parsing not available. Install openpyxl and pandas.")
+    logger.warning("Excel parsing not available. Install openpyxl.")
 
 try:
     import PyPDF2
@@ -23,29 +32,77 @@ except ImportError:
     PDF_AVAILABLE = False
     logger.warning("PDF parsing not available. Install PyPDF2.")
 
+try:
+    import pandas as pd
+    from .data_profiler import TableProfiler, StratifiedSample
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+    logger.warning("Excel and CSV parsing not available. Install pandas.")
+
 
 class FileParser:
     """Base class for file parsers"""
     
     @staticmethod
-    def parse(file_content: bytes, filename: str) -> Dict[str, Any]:
+    def parse(file_content: Content, filename: str) -> Dict[str, Any]:
         """Parse file and return structured data"""
         raise NotImplementedError
 
 
+def _as_stream(file_content: Content):
+    """Binary stream over content; a memory map is read in place rather than copied."""
+    if isinstance(file_content, mmap.mmap):
+        return _MappedStream(file_content)
+    return io.BytesIO(file_content)
+
+
+class _MappedStream(io.RawIOBase):
+    """Seekable file object over a memory map (mmap itself lacks seekable() before Python 3.13)"""
+    
+    def __init__(self, mapped: mmap.mmap):
+        self._mapped = mapped
+        self._mapped.seek(0)
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        data = self._mapped.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._mapped.seek(offset, whence)
+        return self._mapped.tell()
+    
+    def tell(self) -> int:
+        return self._mapped.tell()
+
+
 class ExcelParser(FileParser):
     """Parser for Excel files (.xlsx, .xls)"""
     
+    # Rows kept per sheet; profiles still cover every row
+    MAX_ROWS = 1000
+    # Rows per profiling chunk
+    CHUNK_ROWS = 50_000
+    # Rows sampled evenly across the sheet for the prompt
+    SAMPLE_ROWS = 100
+    
     @staticmethod
-    def parse(file_content: bytes, filename: str) -> Dict[str, Any]:
-        """Parse Excel file and extract all sheets"""
-        if not EXCEL_AVAILABLE:
+    def parse(file_content: Content, filename: str) -> Dict[str, Any]:
+        """Parse Excel file and extract all sheets in a single streaming pass"""
+        if not EXCEL_AVAILABLE or not PANDAS_AVAILABLE:
             raise ValueError("Excel parsing not available. Install required dependencies.")
         
         try:
-            # Read Excel file from bytes
-            excel_file = io.BytesIO(file_content)
-            workbook = openpyxl.load_workbook(excel_file, data_only=True)
+            # Read-only mode streams rows from the XML instead of building
+            # the whole cell tree in memory
+            workbook = openpyxl.load_workbook(_as_stream(file_content), read_only=True, data_only=True)
             
             result = {
                 "filename": filename,
@@ -53,33 +110,11 @@ class ExcelParser(FileParser):
                 "sheets": {}
             }
             
-            for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
-                
-                # Extract all data from sheet
-                sheet_data = []
-                for row in sheet.iter_rows(values_only=True):
-                    # Skip empty rows
-                    if any(cell is not None for cell in row):
-                        sheet_data.append([str(cell) if cell is not None else "" for cell in row])
-                
-                result["sheets"][sheet_name] = {
-                    "rows": len(sheet_data),
-                    "data": sheet_data
-                }
-            
-            # Also try pandas for better data extraction
             try:
-                excel_file.seek(0)
-                df_dict = pd.read_excel(excel_file, sheet_name=None, engine='openpyxl')
-                
-                for sheet_name, df in df_dict.items():
-                    if sheet_name in result["sheets"]:
-                        # Add pandas-parsed data for better structure
-                        result["sheets"][sheet_name]["dataframe"] = df.to_dict('records')
-                        result["sheets"][sheet_name]["columns"] = df.columns.tolist()
-            except Exception as e:
-                logger.warning(f"Pandas parsing failed for {filename}: {e}")
+                for sheet in workbook.worksheets:
+                    result["sheets"][sheet.title] = ExcelParser._parse_sheet(sheet)
+            finally:
+                workbook.close()
             
             logger.info(f"Successfully parsed Excel file: {filename} ({len(result['sheets'])} sheets)")
             return result
@@ -87,66 +122,206 @@ class ExcelParser(FileParser):
         except Exception as e:
             logger.error(f"Error parsing Excel file {filename}: {e}")
             raise ValueError(f"Failed to parse Excel file: {str(e)}")
+    
+    @staticmethod
+    def _parse_sheet(sheet) -> Dict[str, Any]:
+        """
+        Build the string row view, typed records and profile of one sheet
+        from a single iteration over its rows.
+        
+        The first non-empty row is the header. Only the first MAX_ROWS rows
+        are kept, but row counts, column profiles, group aggregates and the
+        row sample cover the full sheet, which is profiled in chunks.
+        """
+        columns: List[str] = []
+        sheet_data = []
+        records = []
+        chunk = []
+        total_rows = 0
+        profiler = None
+        sample = StratifiedSample(ExcelParser.SAMPLE_ROWS)
+        
+        def flush():
+            # Ragged rows: pad to the (possibly grown) header
+            frame = pd.DataFrame(
+                [row + [""] * (len(columns) - len(row)) for row in chunk],
+                columns=columns
+            )
+            sample.update(frame, offset=profiler.rows)
+            profiler.update(frame)
+            chunk.clear()
+        
+        for row in sheet.iter_rows(values_only=True):
+            # Skip empty rows
+            if not any(cell is not None for cell in row):
+                continue
+            total_rows += 1
+            cells = [str(cell) if cell is not None else "" for cell in row]
+            
+            if total_rows <= ExcelParser.MAX_ROWS:
+                sheet_data.append(cells)
+            
+            if total_rows == 1:
+                columns = _unique_column_names(row)
+                profiler = TableProfiler(columns)
+                continue
+            
+            if len(row) > len(columns):
+                columns = _unique_column_names(columns + [None] * (len(row) - len(columns)))
+            
+            chunk.append(cells)
+            if len(chunk) == ExcelParser.CHUNK_ROWS:
+                flush()
+            
+            if total_rows <= ExcelParser.MAX_ROWS:
+                records.append({
+                    column: _json_safe(row[i]) if i < len(row) else None
+                    for i, column in enumerate(columns)
+                })
+        
+        if chunk:
+            flush()
+        
+        return {
+            "rows": total_rows,
+            "data": sheet_data,
+            "dataframe": records,
+            "columns": columns,
+            "sample": sample.rows,
+            "column_profiles": profiler.to_dict() if profiler else {},
+            "group_aggregates": profiler.group_aggregates() if profiler else {},
+            "truncated": total_rows > ExcelParser.MAX_ROWS
+        }
+
+
+def _unique_column_names(header) -> List[str]:
+    """Name header cells like pandas does: Unnamed: i for blanks, .n suffix for duplicates."""
+    columns = []
+    seen = {}
+    for i, cell in enumerate(header):
+        name = str(cell) if cell is not None and str(cell).strip() else f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+def _json_safe(value: Any) -> Any:
+    """Convert cell values that json.dumps cannot handle."""
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return value
 
 
 class PDFParser(FileParser):
     """Parser for PDF files"""
     
+    # Text budget per document; extraction stops once it is met (the
+    # prompt only uses this much of each PDF)
+    MAX_CHARS = 10000
+    
     @staticmethod
-    def parse(file_content: bytes, filename: str) -> Dict[str, Any]:
-        """Parse PDF and extract text"""
+    def parse(file_content: Content, filename: str, max_chars: int = None) -> Dict[str, Any]:
+        """Parse PDF and extract text page by page until the budget is met"""
         if not PDF_AVAILABLE:
             raise ValueError("PDF parsing not available. Install PyPDF2.")
         
         try:
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            collector = PDFTextCollector(
+                filename,
+                PDFParser.count_pages(file_content),
+                max_chars or PDFParser.MAX_CHARS
+            )
+            for page_num, text in PDFParser.iter_pages(file_content):
+                if collector.add(page_num, text):
+                    break
             
-            result = {
-                "filename": filename,
-                "type": "pdf",
-                "pages": len(pdf_reader.pages),
-                "content": []
-            }
-            
-            for page_num, page in enumerate(pdf_reader.pages):
-                text = page.extract_text()
-                if text.strip():
-                    result["content"].append({
-                        "page": page_num + 1,
-                        "text": text
-                    })
-            
-            # Concatenate all text
-            result["full_text"] = "\n\n".join([p["text"] for p in result["content"]])
-            
-            logger.info(f"Successfully parsed PDF file: {filename} ({result['pages']} pages)")
+            result = collector.result()
+            logger.info(f"Successfully parsed PDF file: {filename} ({result['pages_extracted']}/{result['pages']} pages)")
             return result
             
         except Exception as e:
             logger.error(f"Error parsing PDF file {filename}: {e}")
             raise ValueError(f"Failed to parse PDF file: {str(e)}")
+    
+    @staticmethod
+    def count_pages(file_content: Content) -> int:
+        """Get number of pages without extracting any text"""
+        return len(PyPDF2.PdfReader(_as_stream(file_content)).pages)
+    
+    @staticmethod
+    def iter_pages(file_content: Content, start: int = 0, end: int = None) -> Iterator[Tuple[int, str]]:
+        """Lazily yield (page_number, text) for pages [start, end), numbered from 1"""
+        pdf_reader = PyPDF2.PdfReader(_as_stream(file_content))
+        end = len(pdf_reader.pages) if end is None else min(end, len(pdf_reader.pages))
+        for index in range(start, end):
+            yield index + 1, pdf_reader.pages[index].extract_text() or ""
+    
+    @staticmethod
+    def extract_pages(file_content: Content, start: int, end: int) -> List[Tuple[int, str]]:
+        """Extract a page range; unit of work for page-parallel extraction"""
+        if not PDF_AVAILABLE:
+            raise ValueError("PDF parsing not available. Install PyPDF2.")
+        try:
+            return list(PDFParser.iter_pages(file_content, start, end))
+        except Exception as e:
+            raise ValueError(f"Failed to parse PDF file: {str(e)}")
+
+
+class PDFTextCollector:
+    """Accumulates extracted PDF pages into the parser result up to a character budget."""
+    
+    def __init__(self, filename: str, total_pages: int, max_chars: int):
+        self.filename = filename
+        self.total_pages = total_pages
+        self.max_chars = max_chars
+        self.content = []
+        self.chars = 0
+        self.pages_seen = 0
+    
+    def add(self, page_num: int, text: str) -> bool:
+        """Add a page; returns True once the budget is met and extraction can stop."""
+        self.pages_seen += 1
+        if text.strip():
+            self.content.append({
+                "page": page_num,
+                "text": text
+            })
+            self.chars += len(text)
+        return self.chars >= self.max_chars
+    
+    def result(self) -> Dict[str, Any]:
+        return {
+            "filename": self.filename,
+            "type": "pdf",
+            "pages": self.total_pages,
+            "pages_extracted": self.pages_seen,
+            "truncated": self.pages_seen < self.total_pages,
+            "content": self.content,
+            "full_text": "\n\n".join(p["text"] for p in self.content)
+        }
 
 
 class TextParser(FileParser):
     """Parser for text files (.txt, .md)"""
     
     @staticmethod
-    def parse(file_content: bytes, filename: str) -> Dict[str, Any]:
+    def parse(file_content: Content, filename: str) -> Dict[str, Any]:
         """Parse text file"""
         try:
-            # Detect encoding
-            detected = chardet.detect(file_content)
-            encoding = detected['encoding'] or 'utf-8'
-            
-            # Decode content
-            text = file_content.decode(encoding)
+            encoding = detect_encoding(file_content)
+            text = decode_text(file_content, encoding)
             
             result = {
                 "filename": filename,
                 "type": "text",
                 "encoding": encoding,
-                "lines": len(text.split('\n')),
+                "lines": count_lines(file_content, encoding),
                 "content": text
             }
             
@@ -169,7 +344,9 @@ class TextParser(FileParser):
         current_section = None
         current_content = []
         
-        for line in text.split('\n'):
+        # Iterate lines lazily instead of building a list of them
+        for line in io.StringIO(text, newline='\n'):
+            line = line.rstrip('\n')
             if line.startswith('#'):
                 # Save previous section
                 if current_section:
@@ -194,45 +371,316 @@ class TextParser(FileParser):
         return sections
 
 
+class DocxParser(FileParser):
+    """Parser for Word documents (.docx)"""
+    
+    # Decompressed document XML read at a time
+    CHUNK_BYTES = 1024 * 1024
+    
+    _HEADING_STYLE = re.compile(r"^(?:heading|nagłówek)\s*(\d)$", re.IGNORECASE)
+    
+    @staticmethod
+    def parse(file_content: Content, filename: str) -> Dict[str, Any]:
+        """
+        Parse DOCX file by streaming its document XML through _DocxReader.
+        
+        Only one chunk of XML (plus the elements still open) is held at a
+        time. Headings start sections shaped like
+        TextParser._extract_markdown_sections output; table rows become
+        lines of cells separated by " | ".
+        """
+        try:
+            with zipfile.ZipFile(_as_stream(file_content)) as archive:
+                reader = _DocxReader(DocxParser._heading_styles(archive))
+                with archive.open("word/document.xml") as xml:
+                    while chunk := xml.read(DocxParser.CHUNK_BYTES):
+                        reader.feed(chunk)
+            
+            result = reader.result()
+            result["filename"] = filename
+            logger.info(f"Successfully parsed DOCX file: {filename} ({result['paragraphs']} paragraphs)")
+            return result
+            
+        except KeyError:
+            raise ValueError("Failed to parse DOCX file: word/document.xml missing")
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"Failed to parse DOCX file: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error parsing DOCX file {filename}: {e}")
+            raise ValueError(f"Failed to parse DOCX file: {str(e)}")
+    
+    @staticmethod
+    def _heading_styles(archive: zipfile.ZipFile) -> Dict[str, int]:
+        """Map paragraph style ids to heading levels (style ids are localised, names are not)."""
+        levels = {}
+        try:
+            styles = archive.open("word/styles.xml")
+        except KeyError:
+            return levels
+        with styles:
+            for _, element in ElementTree.iterparse(styles):
+                namespace, _, tag = element.tag.rpartition("}")
+                if tag != "style":
+                    continue
+                w = namespace + "}"
+                style_id = element.get(w + "styleId")
+                name = element.find(w + "name")
+                name = name.get(w + "val", "") if name is not None else ""
+                outline = element.find(f"{w}pPr/{w}outlineLvl")
+                outline = outline.get(w + "val", "") if outline is not None else ""
+                match = DocxParser._HEADING_STYLE.match(name)
+                if match:
+                    levels[style_id] = int(match.group(1))
+                elif name.lower() == "title":
+                    levels[style_id] = 1
+                elif outline.isdigit() and int(outline) < 9:
+                    levels[style_id] = int(outline) + 1
+                element.clear()
+        return levels
+
+
+# WordprocessingML namespaces: transitional (what Word writes) and strict
+_W_NAMESPACES = [
+    "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "http://purl.oclc.org/ooxml/wordprocessingml/main",
+]
+# Local name of each element _DocxReader handles, by qualified tag
+_DOCX_TAGS = {
+    f"{{{namespace}}}{name}": name
+    for namespace in _W_NAMESPACES
+    for name in ("p", "tc", "tr", "tbl", "t", "tab", "br", "cr", "pStyle", "outlineLvl", "r", "pPr")
+}
+_DOCX_TAGS["{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"] = "Fallback"
+
+
+class _DocxReader:
+    """
+    Incremental reader of WordprocessingML document XML.
+    
+    The XML is fed to an XMLPullParser as it is decompressed, and each
+    element is dropped from the tree once its end has been handled, so
+    memory holds the open elements only. Paragraphs nested in text boxes
+    join the paragraph around them; alternative content for older
+    readers, which duplicates the preferred choice, is skipped.
+    """
+    
+    def __init__(self, headings: Dict[str, int]):
+        self.headings = headings
+        self.lines: List[str] = []
+        self.sections: List[Dict[str, str]] = []
+        self.section_title = None
+        self.section_start = 0
+        # Open paragraphs (text boxes nest them) as [texts, heading level];
+        # open table cells (tables nest in cells)
+        self.paragraphs: List[list] = []
+        self.cells: List[List[str]] = []
+        self.row: List[str] = []
+        self.table_depth = 0
+        self.paragraph_count = 0
+        self.table_count = 0
+        self.skipping = 0
+        self._parser = ElementTree.XMLPullParser(events=("start", "end"))
+        # Local names of the open elements, "" for those not handled
+        self._open: List[str] = []
+        self._body = None
+    
+    def feed(self, data: bytes):
+        self._parser.feed(data)
+        self._read_events()
+    
+    def _read_events(self):
+        tags = _DOCX_TAGS
+        for event, element in self._parser.read_events():
+            name = tags.get(element.tag, "")
+            if event == "start":
+                if len(self._open) == 1:
+                    self._body = element
+                self._open.append(name)
+                if name:
+                    self._start(name)
+                continue
+            self._open.pop()
+            if name:
+                self._end(name, element)
+            if len(self._open) == 2:
+                # Done with a block of the body: drop it from the tree
+                self._body.remove(element)
+    
+    def _start(self, name: str):
+        if name == "Fallback":
+            self.skipping += 1
+        elif self.skipping:
+            return
+        elif name == "p":
+            self.paragraphs.append([[], 0])
+        elif name == "tc":
+            self.cells.append([])
+        elif name == "tbl":
+            self.table_depth += 1
+            if self.table_depth == 1:
+                self.table_count += 1
+    
+    def _end(self, name: str, element: ElementTree.Element):
+        if name == "Fallback":
+            self.skipping -= 1
+            return
+        if self.skipping:
+            return
+        paragraph = self.paragraphs[-1] if self.paragraphs else None
+        if name == "t":
+            if paragraph is not None and element.text:
+                paragraph[0].append(element.text)
+        elif name in ("tab", "br", "cr"):
+            # Tab stops in paragraph properties are not runs
+            if paragraph is not None and self._open[-1] == "r":
+                paragraph[0].append("\t" if name == "tab" else "\n")
+        elif name in ("pStyle", "outlineLvl"):
+            if paragraph is not None and self._open[-1] == "pPr":
+                value = next((v for k, v in element.attrib.items() if k.endswith("}val")), "")
+                if name == "pStyle":
+                    paragraph[1] = self.headings.get(value, 0)
+                elif value.isdigit() and int(value) < 9:
+                    paragraph[1] = int(value) + 1
+        elif name == "p":
+            texts, level = self.paragraphs.pop()
+            self._add_paragraph("".join(texts), level)
+        elif name == "tc":
+            self._add_cell(" ".join(self.cells.pop()))
+        elif name == "tr":
+            if self.table_depth == 1:
+                if any(self.row):
+                    self.lines.append(" | ".join(self.row))
+                self.row = []
+        elif name == "tbl":
+            self.table_depth -= 1
+    
+    def _add_paragraph(self, text: str, level: int):
+        text = text.strip()
+        if not text:
+            return
+        if self.cells:
+            self.cells[-1].append(text)
+        elif self.paragraphs:
+            # Text box content, read as part of the enclosing paragraph
+            self.paragraphs[-1][0].append(f" {text} ")
+        elif level:
+            self.paragraph_count += 1
+            self._close_section()
+            self.section_title = text
+            self.lines.append(f"{'#' * level} {text}")
+            self.section_start = len(self.lines)
+        else:
+            self.paragraph_count += 1
+            self.lines.append(text)
+    
+    def _add_cell(self, text: str):
+        # Cell paragraphs and line breaks join into one line of the row
+        text = " ".join(text.split())
+        if self.cells:
+            # Nested table: its text joins the enclosing cell
+            if text:
+                self.cells[-1].append(text)
+        else:
+            self.row.append(text)
+    
+    def _close_section(self):
+        if self.section_title:
+            self.sections.append({
+                "title": self.section_title,
+                "content": "\n".join(self.lines[self.section_start:]).strip()
+            })
+    
+    def result(self) -> Dict[str, Any]:
+        self._parser.close()
+        self._read_events()
+        self._close_section()
+        self.section_title = None
+        return {
+            "type": "docx",
+            "paragraphs": self.paragraph_count,
+            "tables": self.table_count,
+            "content": "\n".join(self.lines),
+            "sections": self.sections
+        }
+
+
 class CSVParser(FileParser):
     """Parser for CSV files"""
     
+    # Rows per chunk read; bounds memory regardless of file size
+    CHUNK_ROWS = 50_000
+    # Rows kept for the prompt, evenly spaced across the whole file
+    SAMPLE_ROWS = 100
+    
     @staticmethod
-    def parse(file_content: bytes, filename: str) -> Dict[str, Any]:
-        """Parse CSV file"""
+    def parse(file_content: Content, filename: str) -> Dict[str, Any]:
+        """Parse CSV file in chunks, profiling every column on the way"""
+        if not PANDAS_AVAILABLE:
+            raise ValueError("CSV parsing not available. Install required dependencies.")
+        
         try:
-            # Detect encoding
-            detected = chardet.detect(file_content)
-            encoding = detected['encoding'] or 'utf-8'
+            encoding = detect_encoding(file_content)
             
-            # Decode content
-            text = file_content.decode(encoding)
+            # Sniff the dialect from the start of the file only
+            head = next(iter_decoded(file_content[:4096], encoding), "")
+            try:
+                dialect = csv.Sniffer().sniff(head[:1024], delimiters=',;\t|')
+                delimiter, quotechar = dialect.delimiter, dialect.quotechar
+            except csv.Error:
+                delimiter, quotechar = ',', '"'
+            # Semicolon-separated exports (Polish Excel locale) use decimal commas
+            decimal = ',' if delimiter == ';' else '.'
             
-            # Try different delimiters
-            dialect = csv.Sniffer().sniff(text[:1024])
+            # Everything is read as text; types are inferred by the profiler
+            reader = pd.read_csv(
+                _as_stream(file_content),
+                sep=delimiter,
+                quotechar=quotechar,
+                encoding=encoding,
+                encoding_errors='replace',
+                dtype=str,
+                keep_default_na=False,
+                skipinitialspace=True,
+                chunksize=CSVParser.CHUNK_ROWS
+            )
             
-            # Parse CSV
-            csv_reader = csv.DictReader(io.StringIO(text), dialect=dialect)
-            rows = list(csv_reader)
+            profiler = None
+            sample = StratifiedSample(CSVParser.SAMPLE_ROWS)
+            columns: List[str] = []
+            with reader:
+                for chunk in reader:
+                    if profiler is None:
+                        columns = [str(column) for column in chunk.columns]
+                        profiler = TableProfiler(columns, decimal=decimal)
+                    chunk.columns = columns
+                    sample.update(chunk, offset=profiler.rows)
+                    profiler.update(chunk)
             
+            total_rows = profiler.rows if profiler else 0
             result = {
                 "filename": filename,
                 "type": "csv",
                 "encoding": encoding,
-                "rows": len(rows),
-                "columns": csv_reader.fieldnames,
-                "data": rows
+                "delimiter": delimiter,
+                "rows": total_rows,
+                "columns": columns,
+                "data": sample.rows,
+                "sampled": len(sample.rows) < total_rows,
+                "column_profiles": profiler.to_dict() if profiler else {},
+                "group_aggregates": profiler.group_aggregates() if profiler else {}
             }
             
             logger.info(f"Successfully parsed CSV file: {filename} ({result['rows']} rows)")
             return result
             
+        except pd.errors.EmptyDataError:
+            raise ValueError("Failed to parse CSV file: file is empty")
         except Exception as e:
             logger.error(f"Error parsing CSV file {filename}: {e}")
             raise ValueError(f"Failed to parse CSV file: {str(e)}")
 
 
-def parse_file(file_content: bytes, filename: str) -> Dict[str, Any]:
+def parse_file(file_content: Content, filename: str) -> Dict[str, Any]:
     """Parse file based on extension"""
     ext = Path(filename).suffix.lower()
     
@@ -242,6 +690,7 @@ def parse_file(file_content: bytes, filename: str) -> Dict[str, Any]:
         '.pdf': PDFParser,
         '.txt': TextParser,
         '.md': TextParser,
+        '.docx': DocxParser,
         '.csv': CSVParser,
     }
     
@@ -250,3 +699,21 @@ def parse_file(file_content: bytes, filename: str) -> Dict[str, Any]:
         raise ValueError(f"Unsupported file type: {ext}")
     
     return parser.parse(file_content, filename)
+
+
+@contextmanager
+def open_mapped(file_path: Union[str, Path]) -> Iterator[Content]:
+    """Memory-map a file read-only; pages are loaded on access instead of read up front."""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            yield content
+
+
+def parse_path(file_path: Union[str, Path], filename: str) -> Dict[str, Any]:
+    """Parse a file on disk without reading it into memory first"""
+    with open_mapped(file_path) as content:
+        return parse_file(content, filename)
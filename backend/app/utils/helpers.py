@@ -16,3 +16,30 @@ def safe_json_dumps(data: Any, default: str = "{}") -> str:
         return json.dumps(data)
     except (TypeError, ValueError):
         return default
+
+
+def merge_patch(target: Any, patch: Any) -> Any:
+    """Apply a JSON merge patch (RFC 7386) to a document, returning a new one."""
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+def merge_diff(source: Any, target: Any) -> Any:
+    """
+    JSON merge patch turning source into target; check the result with
+    merge_patch, as a merge patch cannot set a value to null.
+    """
+    if not isinstance(source, dict) or not isinstance(target, dict):
+        return target
+    patch = {key: None for key in source if key not in target}
+    for key, value in target.items():
+        if key not in source or source[key] != value:
+            patch[key] = merge_diff(source.get(key), value)
+    return patch
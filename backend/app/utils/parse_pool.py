@@ -0,0 +1,325 @@
+"""Process pool for CPU-bound document parsing off the event loop"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, List, Optional, Set, Tuple, Union
+from ..config import get_settings
+from .file_parsers import parse_path, open_mapped, PDFParser, PDFTextCollector, PDF_AVAILABLE
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class ParseTimeoutError(ValueError):
+    """Raised when parsing a single file exceeds the time limit"""
+
+
+def _warm_up():
+    """Pre-import parsing libraries, keeping imports out of the first files' time limit."""
+    for module in ("openpyxl", "PyPDF2", "pandas", "chardet"):
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+
+
+def _limit_memory(memory_limit_mb: int, file_size: int):
+    """
+    Cap the worker's address space for one task. The mapped file counts
+    towards it, so the limit grows with the file and large uploads are
+    not refused for their size alone.
+    """
+    import resource
+    limit = (memory_limit_mb * 1024 * 1024) + file_size
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _worker_main(connection, memory_limit_mb: int):
+    """Worker process loop: run each (func, args) received and send back its outcome."""
+    _warm_up()
+    connection.send(("ready", None))
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        func, args = task
+        if memory_limit_mb:
+            try:
+                # Every task's first argument is the path of the stored file
+                _limit_memory(memory_limit_mb, os.path.getsize(args[0]))
+            except (ImportError, ValueError, OSError) as e:
+                # resource is POSIX only (e.g. not available in the Windows desktop build)
+                logging.getLogger(__name__).warning(f"Parser memory limit not applied: {e}")
+                memory_limit_mb = 0
+        try:
+            outcome = ("result", func(*args))
+        except Exception as e:
+            outcome = ("error", e)
+        try:
+            connection.send(outcome)
+        except Exception as e:
+            # The result or exception could not be pickled
+            connection.send(("error", ValueError(f"{type(e).__name__}: {e}")))
+
+
+def _count_pdf_pages(file_path: str) -> int:
+    with open_mapped(file_path) as content:
+        return PDFParser.count_pages(content)
+
+
+def _extract_pdf_pages(file_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    with open_mapped(file_path) as content:
+        return PDFParser.extract_pages(content, start, end)
+
+
+class _Worker:
+    """One parser process and the pipe it takes tasks from."""
+
+    def __init__(self, context, memory_limit_mb: int):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_connection, memory_limit_mb),
+            daemon=True
+        )
+        self.process.start()
+        child_connection.close()
+        self.tasks = 0
+
+    def wait_ready(self):
+        self.connection.recv()
+
+    def run(self, func, args: tuple, timeout: float) -> Optional[Tuple[str, Any]]:
+        """Send a task and wait for its outcome; None if it times out. Blocks, call in a thread."""
+        self.tasks += 1
+        try:
+            self.connection.send((func, args))
+            if not self.connection.poll(timeout):
+                return None
+            return self.connection.recv()
+        except (EOFError, OSError):
+            return ("error", ValueError("Parser worker exited while parsing, the file may be malformed"))
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.connection.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class ParserPool:
+    """
+    Warm pool of worker processes running utils.file_parsers.
+
+    Workers get the path of the stored upload and memory-map it, so file
+    content is never held or pickled by the server process. Each file is
+    parsed with an address-space limit, so a pathological document fails
+    with MemoryError instead of taking the server down; the mapped file
+    is added to the limit, so large uploads are not refused for their
+    size. Each worker is a process of its own: a file exceeding the time
+    limit gets only its worker killed and replaced, and the parses running
+    in other workers carry on.
+
+    PDFs are split into page ranges extracted in parallel across workers,
+    and extraction stops once the text budget is met.
+    """
+
+    # Pages per PDF extraction task
+    PDF_PAGES_PER_TASK = 8
+    # Workers are replaced after this many tasks, returning memory parsers leave fragmented
+    MAX_TASKS_PER_WORKER = 50
+
+    def __init__(self, workers: int, timeout_seconds: float, memory_limit_mb: int):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit_mb = memory_limit_mb
+        # spawn: forking a process with running threads is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: List[_Worker] = []
+        self._busy: Set[_Worker] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _spawn(self, count: int = 1) -> List[_Worker]:
+        """Start worker processes and block until they are warm."""
+        workers = [_Worker(self._context, self.memory_limit_mb) for _ in range(count)]
+        for worker in workers:
+            worker.wait_ready()
+        return workers
+
+    def start(self):
+        """
+        Start worker processes and block until they are warm (no-op if
+        already running or disabled).
+        """
+        missing = self.workers - len(self._idle) - len(self._busy)
+        if missing <= 0:
+            return
+        self._idle.extend(self._spawn(missing))
+        logger.info(f"Started document parser pool with {self.workers} workers")
+
+    def shutdown(self):
+        """Stop worker processes; parses still running fail."""
+        if not self._idle and not self._busy:
+            return
+        for worker in self._idle:
+            worker.stop()
+        for worker in list(self._busy):
+            worker.kill()
+        self._idle.clear()
+        self._busy.clear()
+        self._slots = None  # Tasks of the stopped workers release nothing
+        logger.info("Document parser pool stopped")
+
+    async def parse(self, file_path: str, filename: str) -> Dict[str, Any]:
+        """Parse one stored file in worker processes within the time limit."""
+        if self.workers <= 0:
+            return await asyncio.to_thread(parse_path, file_path, filename)
+
+        if self.workers > 1 and Path(filename).suffix.lower() == '.pdf' and PDF_AVAILABLE:
+            return await self._parse_pdf(file_path, filename)
+
+        return await self._run(parse_path, (file_path, filename), filename)
+
+    async def _parse_pdf(self, file_path: str, filename: str) -> Dict[str, Any]:
+        """Collect pages from the page-parallel engine until the text budget is met."""
+        total_pages = await self._run(_count_pdf_pages, (file_path,), filename)
+        collector = PDFTextCollector(filename, total_pages, PDFParser.MAX_CHARS)
+
+        pages = self.iter_pdf_pages(file_path, filename, total_pages)
+        try:
+            async for page_num, text in pages:
+                if collector.add(page_num, text):
+                    break
+        finally:
+            # Cancels page ranges not yet extracted
+            await pages.aclose()
+
+        result = collector.result()
+        logger.info(f"Successfully parsed PDF file: {filename} ({result['pages_extracted']}/{total_pages} pages)")
+        return result
+
+    async def iter_pdf_pages(
+        self,
+        file_path: str,
+        filename: str,
+        total_pages: int
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Yield (page_number, text) in page order while extracting page ranges
+        in parallel across workers.
+
+        At most one range per worker is in flight, so a consumer that stops
+        early leaves the rest of the document unparsed.
+        """
+        ranges = iter([
+            (start, min(start + self.PDF_PAGES_PER_TASK, total_pages))
+            for start in range(0, total_pages, self.PDF_PAGES_PER_TASK)
+        ])
+        in_flight = deque()
+
+        def submit_next():
+            page_range = next(ranges, None)
+            if page_range is not None:
+                in_flight.append(asyncio.ensure_future(
+                    self._run(_extract_pdf_pages, (file_path, *page_range), filename)
+                ))
+
+        for _ in range(self.workers):
+            submit_next()
+
+        try:
+            while in_flight:
+                pages = await in_flight.popleft()
+                submit_next()
+                for page in pages:
+                    yield page
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def _run(self, func, args: tuple, filename: str) -> Any:
+        """Run one task in a worker process within the time limit."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+
+        # Only submit when a worker is free, so the timeout measures parse
+        # time rather than time spent queued behind other files. The slot
+        # is held until the worker is free again, even if the caller stops
+        # waiting, so there are never more workers than configured.
+        await self._slots.acquire()
+        try:
+            worker = self._idle.pop() if self._idle else None
+            if worker is not None and not worker.process.is_alive():
+                worker.kill()  # Died while idle, e.g. killed by the OS
+                worker = None
+            if worker is None:
+                worker = (await asyncio.to_thread(self._spawn))[0]
+        except BaseException:
+            self._slots.release()
+            raise
+        self._busy.add(worker)
+
+        running = asyncio.ensure_future(asyncio.to_thread(worker.run, func, args, self.timeout_seconds))
+        running.add_done_callback(lambda _: self._release(worker, running))
+        outcome = await asyncio.shield(running)
+
+        if outcome is None:
+            logger.error(f"Parsing {filename} exceeded {self.timeout_seconds}s, replacing its parser worker")
+            raise ParseTimeoutError(f"Parsing timed out after {self.timeout_seconds}s")
+        kind, value = outcome
+        if kind == "error":
+            raise value
+        return value
+
+    def _release(self, worker: _Worker, running: asyncio.Future):
+        """Return a worker after its task, or kill it if it timed out or failed."""
+        if worker not in self._busy:
+            return  # Killed by shutdown
+        self._busy.discard(worker)
+        if running.cancelled() or running.exception() is not None or running.result() is None \
+                or not worker.process.is_alive():
+            worker.kill()
+        elif worker.tasks >= self.MAX_TASKS_PER_WORKER:
+            worker.stop()
+        else:
+            self._idle.append(worker)
+        self._slots.release()
+
+    async def parse_many(
+        self,
+        files: List[Tuple[str, str]]
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Parse stored files, given as (file_path, filename), in parallel.
+
+        Returns:
+            Parsed document or the exception raised, in input order
+        """
+        return await asyncio.gather(
+            *(self.parse(file_path, filename) for file_path, filename in files),
+            return_exceptions=True
+        )
+
+
+# Global parser pool instance
+parser_pool = ParserPool(
+    workers=settings.parser_pool_workers,
+    timeout_seconds=settings.parser_timeout_seconds,
+    memory_limit_mb=settings.parser_memory_limit_mb
+)
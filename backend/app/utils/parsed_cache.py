@@ -0,0 +1,89 @@
+"""On-disk cache of parser output keyed by file content hash"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional
+from .file_parsers import PARSER_VERSION
+
+logger = logging.getLogger(__name__)
+
+PARSED_CACHE_DIR = Path("./uploaded_documents/.parsed")
+
+
+# Bytes read at a time when hashing stored files
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def compute_file_hash(file_path: str) -> str:
+    """SHA-256 hex digest of a stored file, read in chunks."""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _cache_path(content_hash: str) -> Path:
+    # Parser version in the name: entries written by an older parser are
+    # never read, which invalidates the cache when the output format changes
+    return PARSED_CACHE_DIR / f"{content_hash}.v{PARSER_VERSION}.json.gz"
+
+
+def load_parsed(content_hash: Optional[str], filename: str) -> Optional[Dict[str, Any]]:
+    """Load cached parser output, or None on a miss."""
+    if not content_hash:
+        return None
+    path = _cache_path(content_hash)
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            parsed = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Discarding unreadable parsed cache entry {path.name}: {e}")
+        _remove(path)
+        return None
+
+    # The same content may be uploaded under different names
+    parsed["filename"] = filename
+    return parsed
+
+
+def store_parsed(content_hash: str, parsed: Dict[str, Any]):
+    """Persist parser output; failures are logged, never raised."""
+    path = _cache_path(content_hash)
+    tmp_path = None
+    try:
+        PARSED_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=PARSED_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as f:
+            f.write(json.dumps(parsed, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8'))
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Failed to cache parsed document {content_hash[:12]}: {e}")
+        if tmp_path:
+            _remove(Path(tmp_path))
+        return
+
+    # Drop entries written by other parser versions
+    for stale in PARSED_CACHE_DIR.glob(f"{content_hash}.v*.json.gz"):
+        if stale != path:
+            _remove(stale)
+
+
+def discard_parsed(content_hash: str):
+    """Delete cached parser output of content no longer stored."""
+    for path in PARSED_CACHE_DIR.glob(f"{content_hash}.v*.json.gz"):
+        _remove(path)
+
+
+def _remove(path: Path):
+    try:
+        path.unlink()
+    except OSError:
+        pass
@@ -0,0 +1,65 @@
+"""Polish-aware tokenisation for full-text search over documents"""
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List
+
+_WORD = re.compile(r"\w+")
+
+# Length terms are cut to after suffix stripping; groups inflected and
+# derived forms (faktura/fakturze, księgowy/księgowości) into one term
+TERM_LENGTH = 6
+MIN_STEM_LENGTH = 3
+
+STOPWORDS = frozenset("""
+a aby ale albo ani aż bardzo bez bo być był była było były będzie będą
+co czy czyli dla do gdy gdzie go i ich ile im inne iż ja jak jako je jego
+jej jest jeszcze jeśli już ją każdy kiedy kto która które którego której
+który których którym lub ma mają może można mu na nad nam nas nie niż
+nich nim o od oraz po pod podczas przed przez przy również się są ta tak
+takie także tam te tego tej ten też to tu tych tylko tym u w we wszystkie
+więc z za ze że żeby
+the and or of to in for on with is are be by as at
+""".split())
+
+# Inflectional and derivational endings, longest first
+_SUFFIXES = sorted("""
+owaniami owaniach owaniem owaniu owania owanie ościami ościach ością ości
+ość ami ach ych ich ymi imi owi owie ów om ie ia iu ię ią ej ego emu
+ymi ym im a e i o u y ą ę
+""".split(), key=len, reverse=True)
+
+# Letters without a decomposition in Unicode
+_FOLD = str.maketrans({"ł": "l", "Ł": "l"})
+
+
+def strip_suffix(word: str) -> str:
+    """A lowercase word without its inflectional or derivational ending."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Reduce a lowercase word to its search term: strip an ending, drop diacritics, truncate."""
+    word = strip_suffix(word)
+    # Queries are often typed without Polish letters
+    folded = unicodedata.normalize("NFKD", word.translate(_FOLD))
+    word = "".join(char for char in folded if not unicodedata.combining(char))
+    return word[:TERM_LENGTH]
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into search terms, skipping stopwords and bare numbers."""
+    return [
+        stem(word)
+        for word in _WORD.findall(text.lower())
+        if len(word) > 1 and word not in STOPWORDS and not word.isdigit()
+    ]
+
+
+def term_frequencies(text: str) -> Dict[str, int]:
+    return Counter(tokenize(text))
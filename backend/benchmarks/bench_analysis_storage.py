@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Benchmark storing analysis results compressed and loading them on access.
+
+Seeds projects whose analysis results are stored as plain JSON, as they
+were before, and measures the database size and query latency of
+reading process rows with and without their analysis results. It then
+runs the migration compressing them, and VACUUM, and measures again.
+
+Run from the backend directory:
+    python benchmarks/bench_analysis_storage.py [projects]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+from sqlalchemy.orm import sessionmaker, undefer  # noqa: E402
+
+from app.database import create_db_engine, migrate_db  # noqa: E402
+from app.models import Project, Step1Data, Step2Process  # noqa: E402
+
+PROCESSES = 8
+REPEATS = 200
+WORDS = (
+    "proces automatyzacja koszt analiza dokument faktura zatwierdzenie system klient "
+    "pracownik czas etap raport dane weryfikacja marnotrawstwo oczekiwanie integracja "
+    "wdrożenie korzyść ryzyko harmonogram zespół dział księgowość sprzedaż zamówienie"
+).split()
+
+
+def sentence(rng: random.Random, words: int = 18) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def step2_analysis(rng: random.Random) -> dict:
+    """Sized and shaped like a Step 2 analysis from Claude."""
+    return {
+        "process_costs": {"total_cost": rng.randrange(10_000, 500_000), "breakdown": {
+            "labor": rng.randrange(10_000, 300_000), "systems": rng.randrange(1000, 50_000)}},
+        "muda_analysis": {
+            "total_waste_cost": rng.randrange(5000, 200_000),
+            "items": [{"type": rng.choice(WORDS), "description": sentence(rng, 40),
+                       "cost_per_year": rng.randrange(1000, 50_000)} for _ in range(7)]
+        },
+        "bottlenecks": [{"name": sentence(rng, 4), "impact": sentence(rng, 30)} for _ in range(6)],
+        "automation_potential": {"automatable_steps": [sentence(rng, 6) for _ in range(10)],
+                                 "summary": " ".join(sentence(rng) for _ in range(12))},
+        "recommendations": [" ".join(sentence(rng) for _ in range(4)) for _ in range(8)]
+    }
+
+
+def seed(engine, projects: int):
+    """Insert projects with plain JSON analysis results, as stored before."""
+    rng = random.Random(0)
+    now = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(Project.__table__.insert(), [
+            {"name": f"Projekt {i}", "client_name": "Klient", "status": "step3", "created_at": now, "updated_at": now}
+            for i in range(projects)
+        ])
+        connection.execute(text(
+            "INSERT INTO step1_data (project_id, organization_data, analysis_results, created_at, updated_at) "
+            "VALUES (:project_id, '{}', :analysis, :now, :now)"
+        ), [
+            {"project_id": i + 1, "now": now, "analysis": json.dumps(
+                {"summary": " ".join(sentence(rng) for _ in range(60)),
+                 "processes_scoring": [step2_analysis(rng)["bottlenecks"] for _ in range(5)]})}
+            for i in range(projects)
+        ])
+        connection.execute(text(
+            "INSERT INTO step2_processes (project_id, process_name, process_data, analysis_results, "
+            "created_at, updated_at) VALUES (:project_id, :name, '{}', :analysis, :now, :now)"
+        ), [
+            {"project_id": i + 1, "name": f"Proces {j}", "now": now, "analysis": json.dumps(step2_analysis(rng))}
+            for i in range(projects) for j in range(PROCESSES)
+        ])
+
+
+def vacuum(engine):
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM"))
+
+
+def list_processes(db, project_id, *options):
+    return db.query(Step2Process).options(*options).filter(Step2Process.project_id == project_id).all()
+
+
+def load_step1(db, project_id, *options):
+    return db.query(Step1Data).options(*options).filter(Step1Data.project_id == project_id).first()
+
+
+QUERIES = [
+    ("processes, all columns", list_processes, [undefer(Step2Process.analysis_results)]),
+    ("processes, deferred", list_processes, []),
+    ("step 1 data, all columns", load_step1, [undefer(Step1Data.analysis_results)]),
+    ("step 1 data, deferred", load_step1, []),
+]
+
+
+def measure(Session, projects: int, label: str, engine):
+    rng = random.Random(1)
+    size = os.path.getsize(make_url(str(engine.url)).database)
+    print(f"\n{label}: {size / 1024 / 1024:.1f} MB")
+    for name, query, options in QUERIES:
+        project_ids = [rng.randrange(1, projects + 1) for _ in range(REPEATS)]
+        start = time.perf_counter()
+        for project_id in project_ids:
+            db = Session()
+            result = query(db, project_id, *options)
+            for row in result if isinstance(result, list) else [result]:
+                if options:
+                    row.analysis_results  # decoded as the endpoints would
+            db.close()
+        print(f"  {name:<26} {(time.perf_counter() - start) / REPEATS * 1000:6.2f} ms")
+    return size
+
+
+if __name__ == "__main__":
+    projects = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with tempfile.TemporaryDirectory(dir=".") as directory:
+        engine = create_db_engine(f"sqlite:///{directory}/bench.db")
+        migrate_db(engine, "0005")  # The schema before compression
+        seed(engine, projects)
+        vacuum(engine)
+        Session = sessionmaker(bind=engine)
+
+        print(f"{projects:,} projects, {PROCESSES} processes each")
+        plain_size = measure(Session, projects, "plain JSON", engine)
+        with engine.connect() as connection:
+            plain = {id: json.loads(analysis) for id, analysis in connection.execute(
+                text("SELECT id, analysis_results FROM step2_processes LIMIT 100"))}
+        migrate_db(engine, "0006")
+        vacuum(engine)
+        assert measure(Session, projects, "compressed", engine) < plain_size
+
+        # The migration keeps every value as it was
+        db = Session()
+        assert {process.id: process.analysis_results for process in db.query(Step2Process).filter(
+            Step2Process.id.in_(plain))} == plain
+        db.close()
+        engine.dispose()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Benchmark CSVParser time and peak memory on large synthetic exports.
+
+Compares the chunked, profiling parser with the previous approach
+(csv.DictReader materialising every row).
+
+Run from the backend directory:
+    python benchmarks/bench_csv_parser.py [rows ...]
+"""
+
+import csv
+import io
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import chardet  # noqa: E402
+
+from app.utils.file_parsers import CSVParser  # noqa: E402
+
+DEFAULT_ROWS = [50_000, 200_000]
+
+
+def make_csv(rows: int) -> bytes:
+    """Semicolon-separated ERP export with decimal commas, as saved by Polish Excel."""
+    rng = random.Random(42)
+    departments = ["Księgowość", "Sprzedaż", "Logistyka", "HR", "Zakupy"]
+    start = date(2023, 1, 1)
+    lines = ["ID;Data;Dział;Czas (min);Koszt PLN;Uwagi"]
+    for i in range(rows):
+        day = start + timedelta(days=i % 730)
+        lines.append(
+            f"{i + 1};{day:%d.%m.%Y};{rng.choice(departments)};{rng.randint(5, 240)};"
+            f"{rng.uniform(10, 5000):.2f}".replace(".", ",")
+            + (";Ręczne przepisywanie" if i % 7 == 0 else ";")
+        )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def legacy_parse(file_content: bytes, filename: str):
+    """Previous implementation: every row kept as a dict."""
+    encoding = chardet.detect(file_content)["encoding"] or "utf-8"
+    text = file_content.decode(encoding)
+    dialect = csv.Sniffer().sniff(text[:1024])
+    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+    rows = list(reader)
+    return {"filename": filename, "type": "csv", "rows": len(rows), "columns": reader.fieldnames, "data": rows}
+
+
+def measure(func, content: bytes):
+    """Time without tracing (tracemalloc slows allocation-heavy code), then trace peak memory."""
+    start = time.perf_counter()
+    result = func(content, "bench.csv")
+    elapsed = time.perf_counter() - start
+    del result
+
+    tracemalloc.start()
+    result = func(content, "bench.csv")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == "__main__":
+    row_counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_ROWS
+    for rows in row_counts:
+        content = make_csv(rows)
+        print(f"\n{rows:,} rows ({len(content) / 1024 / 1024:.1f} MB csv)")
+        chunked, elapsed, peak = measure(CSVParser.parse, content)
+        legacy, legacy_elapsed, legacy_peak = measure(legacy_parse, content)
+        for name, result, seconds, memory in (("chunked", chunked, elapsed, peak), ("legacy", legacy, legacy_elapsed, legacy_peak)):
+            print(f"  {name:<10} {seconds:7.2f}s  peak {memory / 1024 / 1024:8.1f} MB  "
+                  f"rows={result['rows']:,} kept={len(result['data']):,}")
+
+        # The sample is made of whole rows, and the profile covers every row
+        assert (chunked["rows"], chunked["columns"]) == (legacy["rows"], legacy["columns"])
+        legacy_rows = {row["ID"]: row for row in legacy["data"]}
+        assert all(legacy_rows[row["ID"]] == row for row in chunked["data"])
+        total = sum(float(row["Koszt PLN"].replace(",", ".")) for row in legacy["data"])
+        assert abs(chunked["column_profiles"]["Koszt PLN"]["sum"] - total) < 0.01
+        del chunked, legacy
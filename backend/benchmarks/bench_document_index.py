@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark the per-project document index on a synthetic client document set.
+
+Measures indexing time, index size and query time, and compares the
+passages retrieved for one process with sending the whole documents to
+the prompt.
+
+Run from the backend directory:
+    python benchmarks/bench_document_index.py [documents ...]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.models import Project, UploadedDocument, DocumentChunk, ChunkTerm  # noqa: E402
+from app.services.document_index import document_index, process_query  # noqa: E402
+
+DEFAULT_DOCUMENTS = [20, 100]
+SECTIONS_PER_DOCUMENT = 30
+QUERIES = 50
+
+AREAS = [
+    ("Obsługa faktur zakupowych", "faktury kosztowe trafiają do księgowości mailem i są ręcznie wprowadzane do SAP"),
+    ("Rekrutacja pracowników", "kandydaci są oceniani w arkuszach Excel, a umowy przygotowuje dział HR"),
+    ("Obsługa reklamacji", "reklamacje klientów rejestrowane są w CRM i rozpatrywane przez dział jakości"),
+    ("Planowanie produkcji", "harmonogram produkcji układany jest tygodniowo na podstawie zamówień z ERP"),
+    ("Zarządzanie magazynem", "stany magazynowe uzgadniane są ręcznie z systemem WMS raz w miesiącu"),
+    ("Rozliczanie delegacji", "pracownicy składają papierowe wnioski, które zatwierdza kierownik działu"),
+]
+FILLER = ("Proces realizowany jest zgodnie z procedurą wewnętrzną, a odpowiedzialność za kolejne etapy "
+          "spoczywa na wskazanych pracownikach. Czas realizacji wynosi średnio {n} godzin tygodniowo.")
+
+# Step 2 data of the process whose evidence is retrieved
+PROCESS = {
+    "basic_info": {"name": "Obsługa faktur zakupowych", "department": "Księgowość"},
+    "systems": {"systems_used": ["SAP", "Excel"], "integrations": ["bank"], "technical_bottlenecks": []},
+    "as_is": {"steps": [{"name": "Rejestracja faktury", "system_used": "SAP"},
+                        {"name": "Akceptacja kierownika", "system_used": "e-mail"}]},
+    "problems": {"problems": [{"description": "Ręczne przepisywanie danych z faktur"}]},
+}
+
+
+def make_document(index: int, rng: random.Random) -> dict:
+    """Markdown document parsed into sections, as TextParser returns it."""
+    sections = []
+    for s in range(SECTIONS_PER_DOCUMENT):
+        area, description = rng.choice(AREAS)
+        paragraphs = [f"W obszarze {area.lower()} {description}."]
+        paragraphs += [FILLER.format(n=rng.randint(2, 40)) for _ in range(rng.randint(2, 6))]
+        sections.append({"title": f"{s + 1}. {area}", "content": "\n".join(paragraphs)})
+    content = "\n".join(f"## {section['title']}\n{section['content']}" for section in sections)
+    return {"type": "markdown", "content": content, "sections": sections, "filename": f"dokument_{index}.md"}
+
+
+def setup(documents: int):
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def _fk(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    project = Project(name="Benchmark", client_name="Klient", status="step1")
+    db.add(project)
+    db.flush()
+
+    rng = random.Random(documents)
+    parsed = [make_document(i, rng) for i in range(documents)]
+    uploaded = [
+        UploadedDocument(project_id=project.id, filename=doc["filename"], file_path="-", file_type="md",
+                         file_size=len(doc["content"]))
+        for doc in parsed
+    ]
+    db.add_all(uploaded)
+    db.flush()
+    return db, project.id, parsed, uploaded
+
+
+if __name__ == "__main__":
+    document_counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_DOCUMENTS
+    for documents in document_counts:
+        db, project_id, parsed, uploaded = setup(documents)
+        full_chars = sum(len(doc["content"]) for doc in parsed)
+        print(f"\n{documents} documents ({full_chars / 1024:.0f} KB of text)")
+
+        start = time.perf_counter()
+        built = document_index.build(parsed)
+        build_time = time.perf_counter() - start
+        start = time.perf_counter()
+        document_index.store(db, uploaded, built)
+        db.commit()
+        store_time = time.perf_counter() - start
+        assert db.query(DocumentChunk).count() >= documents * SECTIONS_PER_DOCUMENT
+        print(f"  index     build {build_time:.2f}s  store {store_time:.2f}s  "
+              f"{db.query(DocumentChunk).count():,} passages  {db.query(ChunkTerm).count():,} postings")
+
+        query = process_query("Obsługa faktur", PROCESS)
+        start = time.perf_counter()
+        for _ in range(QUERIES):
+            evidence = document_index.search(db, project_id, query)
+        query_time = (time.perf_counter() - start) / QUERIES
+        evidence_chars = sum(len(passage["text"]) for passage in evidence)
+        relevant = sum("faktur" in passage["text"] for passage in evidence)
+        assert evidence and relevant == len(evidence)
+        print(f"  query     {query_time * 1000:.1f} ms  {len(evidence)} passages, {relevant} about invoices")
+        print(f"  prompt    {evidence_chars:,} chars of evidence vs {full_chars:,} chars of full documents "
+              f"({full_chars / max(evidence_chars, 1):.0f}x smaller)")
+        db.close()
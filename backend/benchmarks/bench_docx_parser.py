@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Benchmark DocxParser on a long synthetic procedure manual.
+
+Compares the streaming DOCX parser with TextParser on the same manual
+saved as Markdown, and with building the whole XML tree (what a DOM-based
+reader does).
+
+Run from the backend directory:
+    python benchmarks/bench_docx_parser.py [sections ...]
+"""
+
+import io
+import sys
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils.file_parsers import DocxParser, TextParser  # noqa: E402
+
+DEFAULT_SECTIONS = [500, 2000]
+PARAGRAPHS_PER_SECTION = 6
+TABLE_ROWS = 8
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+# Style ids as saved by a Polish Word; names are always English
+STYLES = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="{W_NS}">
+<w:style w:type="paragraph" w:styleId="Normalny"><w:name w:val="Normal"/></w:style>
+<w:style w:type="paragraph" w:styleId="Nagwek1"><w:name w:val="heading 1"/>
+<w:pPr><w:outlineLvl w:val="0"/></w:pPr></w:style>
+<w:style w:type="paragraph" w:styleId="Nagwek2"><w:name w:val="heading 2"/>
+<w:pPr><w:outlineLvl w:val="1"/></w:pPr></w:style>
+</w:styles>"""
+
+
+def paragraph(text: str, style: str = "") -> str:
+    props = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    # Word splits text into several runs (spell check, formatting)
+    half = len(text) // 2
+    return (f'<w:p>{props}<w:r><w:rPr><w:lang w:val="pl-PL"/></w:rPr><w:t xml:space="preserve">{text[:half]}</w:t></w:r>'
+            f'<w:r><w:t>{text[half:]}</w:t></w:r></w:p>')
+
+
+def make_manual(sections: int):
+    """Return the manual as DOCX bytes and as equivalent Markdown bytes."""
+    body = []
+    markdown = []
+    for s in range(sections):
+        level = 1 if s % 5 == 0 else 2
+        title = f"Procedura {s + 1}: obsługa zamówień i faktur"
+        body.append(paragraph(title, f"Nagwek{level}"))
+        markdown.append(f"{'#' * level} {title}")
+        for p in range(PARAGRAPHS_PER_SECTION):
+            text = (f"Krok {p + 1}. Pracownik działu księgowości weryfikuje zgodność faktury z zamówieniem "
+                    f"i przekazuje dokument do akceptacji kierownika w systemie ERP.")
+            body.append(paragraph(text))
+            markdown.append(text)
+        if s % 4 == 0:
+            rows = []
+            for r in range(TABLE_ROWS):
+                cells = [f"Etap {r + 1}", "Księgowość", f"{(r + 1) * 15} min"]
+                rows.append("<w:tr>" + "".join(f"<w:tc>{paragraph(cell)}</w:tc>" for cell in cells) + "</w:tr>")
+                markdown.append(" | ".join(cells))
+            body.append("<w:tbl>" + "".join(rows) + "</w:tbl>")
+
+    document = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                f'<w:document xmlns:w="{W_NS}"><w:body>{"".join(body)}</w:body></w:document>')
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", document)
+        archive.writestr("word/styles.xml", STYLES)
+    return out.getvalue(), "\n".join(markdown).encode("utf-8")
+
+
+def dom_parse(content: bytes, filename: str):
+    """Whole document tree in memory, then walked."""
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+    texts = ["".join(t.text or "" for t in p.iter(f"{{{W_NS}}}t")) for p in root.iter(f"{{{W_NS}}}p")]
+    return {"content": "\n".join(texts)}
+
+
+def measure(func, content: bytes, filename: str):
+    """Time without tracing (tracemalloc slows allocation-heavy code), then trace peak memory."""
+    start = time.perf_counter()
+    result = func(content, filename)
+    elapsed = time.perf_counter() - start
+    del result
+
+    tracemalloc.start()
+    result = func(content, filename)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == "__main__":
+    section_counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SECTIONS
+    for sections in section_counts:
+        docx, markdown = make_manual(sections)
+        with zipfile.ZipFile(io.BytesIO(docx)) as archive:
+            xml_size = archive.getinfo("word/document.xml").file_size
+        print(f"\n{sections:,} sections ({len(docx) / 1024:.0f} KB docx with {xml_size / 1024 / 1024:.1f} MB XML, "
+              f"{len(markdown) / 1024 / 1024:.1f} MB markdown)")
+        titles = {}
+        for name, func, content, filename in (
+            ("docx stream", DocxParser.parse, docx, "manual.docx"),
+            ("docx dom", dom_parse, docx, "manual.docx"),
+            ("markdown", TextParser.parse, markdown, "manual.md"),
+        ):
+            result, elapsed, peak = measure(func, content, filename)
+            found = f"sections={len(result['sections']):,}" if "sections" in result else ""
+            print(f"  {name:<12} {elapsed:7.2f}s  peak {peak / 1024 / 1024:8.1f} MB  {found}")
+            titles[name] = [section["title"] for section in result.get("sections", [])]
+            del result
+        # Headings are found from their styles as from the Markdown
+        assert len(titles["docx stream"]) == sections
+        assert titles["docx stream"] == titles["markdown"]
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Benchmark draft autosave: writing every save vs the write-behind buffer.
+
+Sends bursts of autosaves of a questionnaire-sized draft, as the Step 1
+form does while the user types, and compares a read, overwrite and
+commit per save with buffering them and writing the latest once, and
+sending the whole draft with sending a merge patch of the changed field.
+
+Run from the backend directory:
+    python benchmarks/bench_draft_autosave.py [saves]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DIRECTORY = tempfile.TemporaryDirectory(dir=".")
+os.environ["DATABASE_URL"] = f"sqlite:///{DIRECTORY.name}/bench.db"
+
+from app.database import SessionLocal, engine, migrate_db  # noqa: E402
+from app.models import Project, ProjectDraft  # noqa: E402
+from app.services.draft_buffer import draft_buffer  # noqa: E402
+
+FIELDS = 120
+
+
+def draft(i: int) -> dict:
+    return {f"question_{k}": f"Odpowiedź na pytanie {k} " * 5 for k in range(FIELDS)} | {"notes": f"Notatka {i}"}
+
+
+def save_each(db, project_id: int, i: int):
+    """A save as the drafts endpoint did it before the buffer."""
+    db.query(Project).filter(Project.id == project_id).first()
+    row = db.query(ProjectDraft).filter(ProjectDraft.project_id == project_id, ProjectDraft.step == "step1").first()
+    if row:
+        row.draft_data = draft(i)
+    else:
+        db.add(ProjectDraft(project_id=project_id, step="step1", draft_data=draft(i)))
+    db.commit()
+
+
+def timed(saves: int, fn) -> float:
+    db = SessionLocal()
+    start = time.perf_counter()
+    for i in range(saves):
+        fn(db, i)
+    draft_buffer.flush()
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed / saves
+
+
+if __name__ == "__main__":
+    saves = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    migrate_db(engine)
+    db = SessionLocal()
+    project_ids = []
+    for name in ("Projekt A", "Projekt B", "Projekt C"):
+        project = Project(name=name, client_name="Klient SA")
+        db.add(project)
+        db.commit()
+        project_ids.append(project.id)
+    db.close()
+
+    print(f"{saves} autosaves of a {FIELDS}-field draft, then a flush")
+    print(f"  write each save       {timed(saves, lambda db, i: save_each(db, project_ids[0], i)) * 1000:9.3f} ms/save")
+    print(f"  buffered, full draft  "
+          f"{timed(saves, lambda db, i: draft_buffer.save(db, project_ids[1], 'step1', data=draft(i))) * 1000:9.3f} ms/save")
+    print(f"  buffered, merge patch "
+          f"{timed(saves, lambda db, i: draft_buffer.save(db, project_ids[2], 'step1', patch={'notes': f'Notatka {i}'})) * 1000:9.3f} ms/save")
+
+    # Each way, the last save is what was written
+    db = SessionLocal()
+    written = {row.project_id: row for row in db.query(ProjectDraft)}
+    assert all(written[project_id].draft_data["notes"] == f"Notatka {saves - 1}" for project_id in project_ids)
+    assert written[project_ids[1]].version == written[project_ids[2]].version == saves
+    db.close()
+    engine.dispose()
+    DIRECTORY.cleanup()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Benchmark draft history: storage per draft and restore time.
+
+Writes a questionnaire-sized draft through the autosave buffer, changing
+one answer per version, and compares the history's size with what a
+full snapshot of every version would take, then times restoring the
+newest and oldest kept versions.
+
+Run from the backend directory:
+    python benchmarks/bench_draft_history.py [versions]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DIRECTORY = tempfile.TemporaryDirectory(dir=".")
+os.environ["DATABASE_URL"] = f"sqlite:///{DIRECTORY.name}/bench.db"
+
+from sqlalchemy import func  # noqa: E402
+
+from app.database import SessionLocal, engine, migrate_db  # noqa: E402
+from app.models import DraftVersion, Project, ProjectDraft  # noqa: E402
+from app.models.types import encode_json  # noqa: E402
+from app.services.draft_buffer import draft_buffer  # noqa: E402
+from app.services.draft_history import KEEP_SNAPSHOTS, SNAPSHOT_EVERY, DraftHistory  # noqa: E402
+
+FIELDS = 120
+REPEATS = 50
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS
+
+
+if __name__ == "__main__":
+    versions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    migrate_db(engine)
+    db = SessionLocal()
+    project = Project(name="Projekt A", client_name="Klient SA")
+    db.add(project)
+    db.commit()
+
+    rng = random.Random(0)
+    data = {f"question_{k}": f"Odpowiedź na pytanie {k} " * 5 for k in range(FIELDS)}
+    snapshot_bytes = 0
+    saved = {}
+    for i in range(versions):
+        data = dict(data, **{f"question_{rng.randrange(FIELDS)}": f"Nowa odpowiedź {i} " * 5})
+        saved[draft_buffer.save(db, project.id, "step1", data=data)["version"]] = data
+        draft_buffer.flush()
+        snapshot_bytes += len(encode_json(data))
+
+    draft = db.query(ProjectDraft).filter(ProjectDraft.project_id == project.id).one()
+    kept = DraftHistory.list_versions(db, draft.id)
+    history_bytes = db.query(func.sum(func.length(DraftVersion.data))).scalar()
+    print(f"{versions:,} versions of a {FIELDS}-field draft")
+    print(f"  snapshot per version  {snapshot_bytes / 1024:9.1f} KB, all versions")
+    print(f"  snapshots + diffs     {history_bytes / 1024:9.1f} KB, {len(kept)} versions kept")
+    assert len(kept) <= SNAPSHOT_EVERY * KEEP_SNAPSHOTS and history_bytes < snapshot_bytes
+    for name, version in (("newest", kept[0]["version"]), ("oldest kept", kept[-1]["version"])):
+        assert DraftHistory.get_version(db, draft.id, version) == saved[version]
+        elapsed = timed(lambda: DraftHistory.get_version(db, draft.id, version))
+        print(f"  restore {name:<13} {elapsed * 1000:9.2f} ms")
+    db.close()
+    engine.dispose()
+    DIRECTORY.cleanup()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Benchmark event loop stalls of database writes in async endpoints.
+
+Concurrent coroutines, like requests in async endpoints, write rows
+while another process holds the SQLite write lock now and then (an
+autosave or index build). A heartbeat task measures how late the event
+loop runs it. Compares sync sessions used on the event loop, as the
+upload endpoints did before, with async sessions.
+
+Run from the backend directory:
+    python benchmarks/bench_event_loop.py [coroutines] [seconds]
+"""
+
+import asyncio
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base, create_async_db_engine, create_db_engine  # noqa: E402
+from app.models import Project  # noqa: E402
+
+HEARTBEAT = 0.01  # seconds between heartbeats
+LOCK_HOLD = 0.2  # seconds the other writer holds the lock
+LOCK_EVERY = 0.5  # seconds between its transactions
+
+
+def hold_write_lock(path: str, stop: threading.Event):
+    """Another writer: an index build or autosave in a different worker process."""
+    connection = sqlite3.connect(path, isolation_level=None)
+    while not stop.wait(LOCK_EVERY):
+        connection.execute("BEGIN IMMEDIATE")
+        time.sleep(LOCK_HOLD)
+        connection.execute("COMMIT")
+    connection.close()
+
+
+async def heartbeat(lags: list, deadline: float):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT)
+        lags.append(time.perf_counter() - start - HEARTBEAT)
+
+
+async def sync_writer(Session, deadline: float, done: list):
+    while time.perf_counter() < deadline:
+        db = Session()
+        db.add(Project(name="Projekt", client_name="Klient", status="step1"))
+        db.commit()
+        db.close()
+        done.append(1)
+        await asyncio.sleep(0)  # e.g. awaiting the next chunk of the request
+
+
+async def async_writer(Session, deadline: float, done: list):
+    while time.perf_counter() < deadline:
+        async with Session() as db:
+            db.add(Project(name="Projekt", client_name="Klient", status="step1"))
+            await db.commit()
+        done.append(1)
+        await asyncio.sleep(0)
+
+
+async def run(name, writer, Session, coroutines: int, seconds: float):
+    deadline = time.perf_counter() + seconds
+    lags, done = [], []
+    await asyncio.gather(
+        heartbeat(lags, deadline),
+        *(writer(Session, deadline, done) for _ in range(coroutines))
+    )
+    lags.sort()
+    print(name)
+    print(f"  writes     {len(done) / seconds:7.0f}/s")
+    print(f"  loop lag   median {statistics.median(lags) * 1000:6.1f} ms  "
+          f"p99 {lags[int(len(lags) * 0.99)] * 1000:6.1f} ms  max {lags[-1] * 1000:6.1f} ms  "
+          f"({len(lags)} of {seconds / HEARTBEAT:.0f} heartbeats)")
+    assert done
+    return lags[-1]
+
+
+async def main(directory: str, coroutines: int, seconds: float):
+    path = f"{directory}/bench.db"
+    engine = create_db_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    async_engine = create_async_db_engine(f"sqlite:///{path}")
+
+    stop = threading.Event()
+    holder = threading.Thread(target=hold_write_lock, args=(path, stop))
+    holder.start()
+    try:
+        await run("sync session on the event loop", sync_writer,
+                  sessionmaker(bind=engine), coroutines, seconds)
+        print()
+        max_lag = await run("async session", async_writer,
+                            async_sessionmaker(async_engine), coroutines, seconds)
+        # Waiting for the lock must not hold up the loop
+        assert max_lag < LOCK_HOLD, f"loop stalled {max_lag * 1000:.0f} ms with async sessions"
+    finally:
+        stop.set()
+        holder.join()
+        engine.dispose()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    coroutines = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    print(f"{coroutines} writing coroutines, write lock held {LOCK_HOLD * 1000:.0f} ms "
+          f"every {LOCK_EVERY * 1000:.0f} ms by another connection, {seconds:.0f}s per configuration\n")
+    # On the working directory's disk: /tmp may be in memory, hiding fsync cost
+    with tempfile.TemporaryDirectory(dir=".") as directory:
+        asyncio.run(main(directory, coroutines, seconds))
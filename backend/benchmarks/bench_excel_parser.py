@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark ExcelParser time and peak memory on large synthetic workbooks.
+
+Compares the single-pass streaming parser with the previous approach
+(full openpyxl load + a second pandas.read_excel pass).
+
+Run from the backend directory:
+    python benchmarks/bench_excel_parser.py [rows ...]
+"""
+
+import io
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import openpyxl  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from app.utils.file_parsers import ExcelParser  # noqa: E402
+
+DEFAULT_ROWS = [10_000, 50_000]
+
+
+def make_workbook(rows: int) -> bytes:
+    """Process log style sheet: ids, dates, categories, costs, free text."""
+    rng = random.Random(42)
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Rejestr")
+    sheet.append(["ID", "Data", "Dział", "Proces", "Czas (min)", "Koszt PLN", "Błąd", "Uwagi"])
+    departments = ["Księgowość", "Sprzedaż", "Logistyka", "HR", "Zakupy"]
+    processes = ["Fakturowanie", "Uzgadnianie faktur", "Zamówienia", "Onboarding", "Raportowanie"]
+    start = date(2023, 1, 1)
+    for i in range(rows):
+        sheet.append([
+            i + 1,
+            start + timedelta(days=i % 730),
+            rng.choice(departments),
+            rng.choice(processes),
+            rng.randint(5, 240),
+            round(rng.uniform(10, 5000), 2),
+            rng.random() < 0.05,
+            "Ręczne przepisywanie danych z systemu" if i % 7 == 0 else None,
+        ])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def legacy_parse(file_content: bytes, filename: str):
+    """Previous implementation: two parses, two in-memory copies."""
+    excel_file = io.BytesIO(file_content)
+    workbook = openpyxl.load_workbook(excel_file, data_only=True)
+    result = {"filename": filename, "type": "excel", "sheets": {}}
+    for sheet_name in workbook.sheetnames:
+        sheet = workbook[sheet_name]
+        sheet_data = []
+        for row in sheet.iter_rows(values_only=True):
+            if any(cell is not None for cell in row):
+                sheet_data.append([str(cell) if cell is not None else "" for cell in row])
+        result["sheets"][sheet_name] = {"rows": len(sheet_data), "data": sheet_data}
+    excel_file.seek(0)
+    df_dict = pd.read_excel(excel_file, sheet_name=None, engine='openpyxl')
+    for sheet_name, df in df_dict.items():
+        result["sheets"][sheet_name]["dataframe"] = df.to_dict('records')
+        result["sheets"][sheet_name]["columns"] = df.columns.tolist()
+    return result
+
+
+def trimmed(rows):
+    """Rows without trailing empty cells, which a write-only workbook does not store."""
+    trimmed_rows = []
+    for row in rows:
+        row = list(row)
+        while row and row[-1] == "":
+            row.pop()
+        trimmed_rows.append(row)
+    return trimmed_rows
+
+
+def measure(func, content: bytes):
+    """Time without tracing (tracemalloc slows allocation-heavy code), then trace peak memory."""
+    start = time.perf_counter()
+    result = func(content, "bench.xlsx")
+    elapsed = time.perf_counter() - start
+    del result
+
+    tracemalloc.start()
+    result = func(content, "bench.xlsx")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == "__main__":
+    row_counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_ROWS
+    for rows in row_counts:
+        content = make_workbook(rows)
+        print(f"\n{rows:,} rows ({len(content) / 1024 / 1024:.1f} MB xlsx)")
+        parsed = {}
+        for name, func in (("streaming", ExcelParser.parse), ("legacy", legacy_parse)):
+            result, elapsed, peak = measure(func, content)
+            sheet = result["sheets"]["Rejestr"]
+            print(f"  {name:<10} {elapsed:7.2f}s  peak {peak / 1024 / 1024:8.1f} MB  "
+                  f"rows={sheet['rows']:,} kept={len(sheet['data']):,}")
+            parsed[name] = (sheet["rows"], sheet["columns"], trimmed(sheet["data"]))
+            del result
+        (row_count, columns, data), legacy = parsed["streaming"], parsed["legacy"]
+        # The rows kept are the first ones the legacy parser read
+        assert (row_count, columns, data) == (legacy[0], legacy[1], legacy[2][:len(data)])
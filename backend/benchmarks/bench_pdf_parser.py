@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Benchmark PDF text extraction on a long synthetic report.
+
+Compares extracting every page (previous behaviour) with the budgeted
+sequential parser and the page-parallel engine in the parser pool.
+
+Run from the backend directory:
+    python benchmarks/bench_pdf_parser.py [pages] [max_chars]
+"""
+
+import asyncio
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import PyPDF2  # noqa: E402
+
+from app.utils.file_parsers import PDFParser  # noqa: E402
+from app.utils.parse_pool import ParserPool  # noqa: E402
+
+LINES_PER_PAGE = 45
+
+
+def make_pdf(pages: int) -> bytes:
+    """Build a text-only PDF with Helvetica pages by hand (no extra dependencies)."""
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")  # placeholder, filled in below
+    page_ids = []
+    for page in range(pages):
+        lines = [
+            f"Strona {page + 1}, akapit {line + 1}: proces uzgadniania faktur wymaga recznej weryfikacji."
+            for line in range(LINES_PER_PAGE)
+        ]
+        text = "BT /F1 9 Tf 40 800 Td 12 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+        stream = text.encode("latin-1")
+        content_id = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font_id, content_id)
+        ))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref))
+    return out.getvalue()
+
+
+def extract_all(content: bytes):
+    """Previous behaviour: every page extracted and concatenated."""
+    reader = PyPDF2.PdfReader(io.BytesIO(content))
+    texts = [page.extract_text() for page in reader.pages]
+    return "\n\n".join(texts)
+
+
+async def pool_parse(content: bytes, workers: int):
+    pool = ParserPool(workers=workers, timeout_seconds=300, memory_limit_mb=0)
+    await asyncio.to_thread(pool.start)
+    # The pool parses stored uploads by path
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = str(Path(tmp_dir) / "report.pdf")
+        Path(file_path).write_bytes(content)
+        try:
+            start = time.perf_counter()
+            result = await pool.parse(file_path, "report.pdf")
+            return result, time.perf_counter() - start
+        finally:
+            pool.shutdown()
+
+
+if __name__ == "__main__":
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    if len(sys.argv) > 2:
+        PDFParser.MAX_CHARS = int(sys.argv[2])
+    content = make_pdf(pages)
+    print(f"{pages} pages ({len(content) / 1024:.0f} KB)")
+
+    start = time.perf_counter()
+    full_text = extract_all(content)
+    print(f"  all pages          {time.perf_counter() - start:6.2f}s  {len(full_text):,} chars")
+
+    start = time.perf_counter()
+    sequential = result = PDFParser.parse(content, "report.pdf")
+    assert full_text.startswith(result["full_text"])
+    print(f"  budgeted           {time.perf_counter() - start:6.2f}s  {len(result['full_text']):,} chars, "
+          f"{result['pages_extracted']}/{result['pages']} pages")
+
+    result, elapsed = asyncio.run(pool_parse(content, workers=4))
+    assert (result["full_text"], result["pages_extracted"]) == (sequential["full_text"], sequential["pages_extracted"])
+    print(f"  page-parallel (4)  {elapsed:6.2f}s  {len(result['full_text']):,} chars, "
+          f"{result['pages_extracted']}/{result['pages']} pages")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Benchmark portfolio totals: scanning every project's results vs the metrics table.
+
+Seeds projects with Step 1-3 analysis results, then compares computing
+the totals from all results, as a dashboard had to, with reading the
+portfolio metrics row, and measures what keeping the metrics current
+adds to saving a project's results.
+
+Run from the backend directory:
+    python benchmarks/bench_portfolio.py [projects]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import create_db_engine, migrate_db  # noqa: E402
+from app.models import Project, Step1Data, Step2Process, Step3Data  # noqa: E402
+from app.services.portfolio_service import PortfolioService, project_metrics  # noqa: E402
+
+PROCESSES = 5
+REPEATS = 20
+
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(["proces", "koszt", "faktura", "system", "klient", "analiza"]) for _ in range(words))
+
+
+def seed(Session, projects: int):
+    rng = random.Random(0)
+    db = Session()
+    for i in range(projects):
+        project = Project(name=f"Projekt {i}", client_name="Klient SA", status="step3")
+        db.add(project)
+        db.flush()
+        db.add(Step1Data(project_id=project.id, organization_data={}, analysis_results={
+            "digital_maturity": {"overall_score": rng.randrange(100), "interpretation": text(rng, 300)},
+            "recommendations": text(rng, 1500)
+        }))
+        db.add_all(Step2Process(project_id=project.id, process_name=f"Proces {j}", process_data={}, analysis_results={
+            "process_costs": {"total_cost": rng.randrange(10_000, 500_000)},
+            "muda_analysis": {"total_waste_cost": rng.randrange(1000, 100_000)},
+            "bpmn_description": text(rng, 800)
+        }) for j in range(PROCESSES))
+        db.add(Step3Data(project_id=project.id, analysis_results={"process_scenarios": [
+            {"process_name": f"Proces {j}", "scenarios": {"scenarios": [
+                {"benefits_year1": {"total": rng.randrange(10_000, 300_000)}, "description": text(rng, 300)}
+                for _ in range(3)
+            ]}} for j in range(PROCESSES)
+        ]}))
+        if i % 100 == 99:
+            db.commit()
+    db.commit()
+    db.close()
+
+
+def scan_totals(db) -> dict:
+    """Totals from every project's results, as computed before the metrics table."""
+    step1 = dict(db.query(Step1Data.project_id, Step1Data.analysis_results))
+    step3 = dict(db.query(Step3Data.project_id, Step3Data.analysis_results))
+    step2 = {}
+    for project_id, results in db.query(Step2Process.project_id, Step2Process.analysis_results):
+        step2.setdefault(project_id, []).append(results)
+    totals = {}
+    for (project_id,) in db.query(Project.id):
+        metrics = project_metrics(step1.get(project_id), step2.get(project_id, []), step3.get(project_id))
+        for column in ("current_cost", "waste_cost", "savings_potential"):
+            totals[column] = totals.get(column, 0) + metrics[column]
+    return totals
+
+
+def timed(Session, fn, repeats: int = REPEATS) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        db = Session()
+        fn(db)
+        db.close()
+    return (time.perf_counter() - start) / repeats
+
+
+if __name__ == "__main__":
+    projects = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with tempfile.TemporaryDirectory(dir=".") as directory:
+        engine = create_db_engine(f"sqlite:///{directory}/bench.db")
+        migrate_db(engine, "0007")
+        Session = sessionmaker(bind=engine)
+        seed(Session, projects)
+        migrate_db(engine)  # Backfills the portfolio metrics
+
+        # The backfilled metrics hold the totals the scan computes
+        db = Session()
+        scanned, summary = scan_totals(db), PortfolioService.get_summary(db)
+        assert summary["project_count"] == projects
+        for column in ("current_cost", "waste_cost", "savings_potential"):
+            assert abs(summary[f"total_{column}"] - scanned[column]) < 0.01, column
+        db.close()
+
+        print(f"{projects:,} projects, {PROCESSES} processes each")
+        print(f"  scan all results      {timed(Session, scan_totals, 3) * 1000:9.2f} ms")
+        print(f"  portfolio metrics     {timed(Session, PortfolioService.get_summary) * 1000:9.2f} ms")
+
+        def save_step1(db, refresh: bool):
+            step1_data = db.query(Step1Data).filter(Step1Data.project_id == 1).first()
+            step1_data.analysis_results = {"digital_maturity": {"overall_score": random.randrange(100)}}
+            if refresh:
+                PortfolioService.refresh_project(db, 1)
+            db.commit()
+
+        print(f"  save Step 1 results   {timed(Session, lambda db: save_step1(db, False)) * 1000:9.2f} ms")
+        print(f"    with metrics        {timed(Session, lambda db: save_step1(db, True)) * 1000:9.2f} ms")
+
+        # Kept current by deltas, they match totals rebuilt from scratch
+        db = Session()
+        refreshed = PortfolioService.get_summary(db)
+        PortfolioService.rebuild(db)
+        db.commit()
+        rebuilt = PortfolioService.get_summary(db)
+        assert {key: refreshed[key] for key in rebuilt if key != "updated_at"} == {
+            key: rebuilt[key] for key in rebuilt if key != "updated_at"}
+        db.close()
+        engine.dispose()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Benchmark loading a project with its step data for reports and presentations.
+
+Compares the previous per-table queries (Project, Step1Data,
+Step2Process and Step3Data) with the aggregate loader, loading all
+columns and only the columns the Markdown report reads, and with joining
+the processes too. Analysis results are sized like Claude's output.
+
+Run from the backend directory:
+    python benchmarks/bench_project_aggregate.py [processes ...]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.orm import joinedload, sessionmaker  # noqa: E402
+
+from app.database import Base, create_db_engine  # noqa: E402
+from app.models import Project, Step1Data, Step2Process, Step3Data  # noqa: E402
+from app.routers.downloads import load_report_data  # noqa: E402
+from app.services.analysis_service import AnalysisService  # noqa: E402
+
+DEFAULT_PROCESSES = [1, 5, 20, 50]
+LOADS = 50
+ROUNDS = 5  # the fastest round counts
+
+
+def analysis(rng: random.Random, fields: int) -> dict:
+    return {f"field_{i}": f"wynik {rng.random():.6f} " * 8 for i in range(fields)}
+
+
+def seed(Session, processes: int) -> int:
+    rng = random.Random(processes)
+    db = Session()
+    project = Project(name="Projekt", client_name="Klient", status="step4")
+    db.add(project)
+    db.flush()
+    db.add(Step1Data(project_id=project.id, organization_data=analysis(rng, 20), analysis_results=analysis(rng, 150)))
+    db.add_all(
+        Step2Process(project_id=project.id, process_name=f"Proces {i}", process_data=analysis(rng, 60),
+                     analysis_results=analysis(rng, 100))
+        for i in range(processes)
+    )
+    db.add(Step3Data(project_id=project.id, analysis_results=analysis(rng, 200)))
+    db.commit()
+    project_id = project.id
+    db.close()
+    return project_id
+
+
+def per_table(db, project_id):
+    """The queries the endpoints issued before."""
+    project = db.query(Project).filter(Project.id == project_id).first()
+    step1_data = db.query(Step1Data).filter(Step1Data.project_id == project_id).first()
+    step2_processes = db.query(Step2Process).filter(Step2Process.project_id == project_id).all()
+    step3_data = db.query(Step3Data).filter(Step3Data.project_id == project_id).first()
+    return project, step1_data, step2_processes, step3_data
+
+
+def all_joined(db, project_id):
+    """Everything in one query; repeats the Step 1 and Step 3 row for every process."""
+    return db.query(Project).options(
+        joinedload(Project.step1_data), joinedload(Project.step2_processes), joinedload(Project.step3_data)
+    ).filter(Project.id == project_id).one_or_none()
+
+
+LOADERS = [
+    ("per-table queries", per_table),
+    ("all joined", all_joined),
+    ("aggregate, all columns", AnalysisService.load_project_aggregate),
+    ("aggregate, report columns", load_report_data),
+]
+
+
+if __name__ == "__main__":
+    process_counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_PROCESSES
+    with tempfile.TemporaryDirectory(dir=".") as directory:
+        for processes in process_counts:
+            engine = create_db_engine(f"sqlite:///{directory}/bench_{processes}.db")
+            Base.metadata.create_all(engine)
+            Session = sessionmaker(bind=engine)
+            project_id = seed(Session, processes)
+
+            # The aggregate holds what the per-table queries return
+            db = Session()
+            project, step1_data, step2_processes, step3_data = per_table(db, project_id)
+            aggregate = AnalysisService.load_project_aggregate(db, project_id)
+            assert aggregate.step1_data.analysis_results == step1_data.analysis_results
+            assert aggregate.step3_data.analysis_results == step3_data.analysis_results
+            assert ([(process.process_name, process.analysis_results) for process in aggregate.step2_processes]
+                    == [(process.process_name, process.analysis_results) for process in step2_processes])
+            db.close()
+
+            statements = []
+            event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+            timings = {name: [] for name, _ in LOADERS}
+            queries = {}
+            # Rounds interleave the loaders, so they share any machine noise
+            for _ in range(ROUNDS):
+                for name, loader in LOADERS:
+                    statements.clear()
+                    start = time.perf_counter()
+                    for _ in range(LOADS):
+                        db = Session()
+                        loader(db, project_id)
+                        db.close()
+                    timings[name].append((time.perf_counter() - start) / LOADS)
+                    queries[name] = len(statements) / LOADS
+            assert queries["aggregate, all columns"] <= 2 and queries["aggregate, report columns"] <= 2
+            print(f"\n{processes} Step 2 processes")
+            for name, _ in LOADERS:
+                print(f"  {name:<26} {min(timings[name]) * 1000:6.2f} ms  {queries[name]:.0f} queries")
+            engine.dispose()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Benchmark the project listing at depth on a large projects table.
+
+Compares the previous listing (ORM objects, skip/limit) with keyset
+pages of a column projection, unfiltered and by status, and prints the
+query plans of the keyset queries.
+
+Run from the backend directory:
+    python benchmarks/bench_project_listing.py [projects]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import Response  # noqa: E402
+from sqlalchemy import desc, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base, create_db_engine  # noqa: E402
+from app.models import Project  # noqa: E402
+from app.routers.projects import get_projects  # noqa: E402
+
+PAGE = 50
+REPEATS = 20
+STATUSES = ["step1", "step2", "step3", "step4", "completed"]
+
+
+def seed(engine, projects: int):
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    rows = [
+        {
+            "name": f"Projekt {i}",
+            "client_name": f"Klient {rng.randrange(2000)}",
+            "status": rng.choice(STATUSES),
+            "created_at": start + timedelta(minutes=i),
+            "updated_at": start + timedelta(minutes=i + rng.randrange(10000))
+        }
+        for i in range(projects)
+    ]
+    with engine.begin() as connection:
+        connection.execute(Project.__table__.insert(), rows)
+
+
+def offset_page(db, skip: int, project_status=None):
+    """The listing as implemented before."""
+    query = db.query(Project)
+    if project_status:
+        query = query.filter(Project.status == project_status)
+    return query.order_by(desc(Project.updated_at)).offset(skip).limit(PAGE).all()
+
+
+def page_ids(db, skip: int, project_status=None):
+    """Ids the page at skip must hold, ties on updated_at broken by id as the keyset does."""
+    query = db.query(Project.id)
+    if project_status:
+        query = query.filter(Project.status == project_status)
+    return [id for (id,) in query.order_by(desc(Project.updated_at), desc(Project.id)).offset(skip).limit(PAGE)]
+
+
+def keyset_page(db, cursor=None, project_status=None):
+    response = Response()
+    rows = get_projects(response=response, limit=PAGE, cursor=cursor, project_status=project_status,
+                        client_name=None, sort_by="updated_at", sort_order="desc", skip=0, db=db)
+    return rows, response.headers.get("X-Next-Cursor")
+
+
+def cursor_at(db, depth: int, project_status=None):
+    """Cursor of the page starting at depth, as a client paging there would hold."""
+    if depth == 0:
+        return None
+    response = Response()
+    get_projects(response=response, limit=depth, cursor=None, project_status=project_status,
+                 client_name=None, sort_by="updated_at", sort_order="desc", skip=0, db=db)
+    return response.headers["X-Next-Cursor"]
+
+
+def timed(fn) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS
+
+
+if __name__ == "__main__":
+    projects = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory(dir=".") as directory:
+        engine = create_db_engine(f"sqlite:///{directory}/bench.db")
+        Base.metadata.create_all(engine)
+        seed(engine, projects)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+
+        for project_status in (None, "step2"):
+            print(f"\n{projects:,} projects, pages of {PAGE}" + (f", status={project_status}" if project_status else ""))
+            total = projects if project_status is None else db.query(Project).filter(
+                Project.status == project_status).count()
+            for depth in (0, total // 10, total // 2, total - PAGE):
+                cursor = cursor_at(db, depth, project_status)
+                assert [row.id for row in keyset_page(db, cursor, project_status)[0]] == page_ids(db, depth, project_status)
+                offset_time = timed(lambda: offset_page(db, depth, project_status))
+                keyset_time = timed(lambda: keyset_page(db, cursor, project_status))
+                print(f"  depth {depth:>7,}   skip {offset_time * 1000:7.2f} ms   cursor {keyset_time * 1000:6.2f} ms")
+
+        statements = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cur, statement, parameters, *args: statements.append((statement, parameters)))
+        print("\nquery plans")
+        for project_status in (None, "step2"):
+            statements.clear()
+            keyset_page(db, cursor_at(db, 1000, project_status), project_status)
+            statement, parameters = statements[-1]
+            plan = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            print(f"  status={project_status}: " + "; ".join(row[-1] for row in plan))
+            assert not any(row[-1].startswith("SCAN") or "TEMP B-TREE" in row[-1] for row in plan)
+        db.close()
+        engine.dispose()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Benchmark finding search: scanning every project's results vs the full-text index.
+
+Seeds projects with Step 1 and Step 2 analysis results and document
+passages, then compares finding the results that mention a word by
+loading and scanning all of them with searching the full-text index,
+and measures what indexing the findings adds to saving results.
+
+Run from the backend directory:
+    python benchmarks/bench_search.py [projects]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import create_db_engine, migrate_db  # noqa: E402
+from app.models import DocumentChunk, Project, Step1Data, Step2Process, UploadedDocument  # noqa: E402
+from app.services.search_index import findings_from, search_index  # noqa: E402
+
+PROCESSES = 5
+REPEATS = 20
+# Each of the domain words is one in 200 of the text; the rest is a filler vocabulary
+WORDS = ["proces", "koszt", "faktura", "system", "klient", "analiza", "magazyn", "zamówienie", "błąd", "raport"]
+FILLER = ["".join(random.Random(n).choices("abcdefghijklmnoprstuwyząęółśżź", k=7)) for n in range(5000)]
+QUERIES = ["faktura", "błąd magazynu", "zamówień klienta"]
+
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) if rng.random() < 0.05 else rng.choice(FILLER) for _ in range(words))
+
+
+def step1_results(rng: random.Random) -> dict:
+    return {
+        "key_findings": [text(rng, 25) for _ in range(5)],
+        "processes_scoring": [{"process_name": f"Proces {j}", "justification": text(rng, 30)} for j in range(PROCESSES)],
+        "recommendations": [text(rng, 40) for _ in range(3)],
+        "digital_maturity": {"interpretation": text(rng, 300)}
+    }
+
+
+def seed(Session, projects: int):
+    rng = random.Random(0)
+    db = Session()
+    for i in range(projects):
+        project = Project(name=f"Projekt {i}", client_name="Klient SA", status="step3")
+        db.add(project)
+        db.flush()
+        results = step1_results(rng)
+        db.add(Step1Data(project_id=project.id, organization_data={}, analysis_results=results))
+        search_index.index_results(db, project.id, "step1", results)
+        for j in range(PROCESSES):
+            results = {"bottlenecks": [{"description": text(rng, 20)} for _ in range(3)], "bpmn_description": text(rng, 800)}
+            process = Step2Process(project_id=project.id, process_name=f"Proces {j}", process_data={},
+                                   analysis_results=results)
+            db.add(process)
+            db.flush()
+            search_index.index_results(db, project.id, "step2", results, process)
+        document = UploadedDocument(project_id=project.id, filename="raport.pdf", file_path="raport.pdf",
+                                    file_type="pdf", file_size=1)
+        db.add(document)
+        db.flush()
+        db.add_all(DocumentChunk(project_id=project.id, document_id=document.id, position=k,
+                                 text=text(rng, 150), term_count=150) for k in range(10))
+        if i % 100 == 99:
+            db.commit()
+    db.commit()
+    db.close()
+
+
+def scan(db, query: str) -> int:
+    """Findings mentioning the query's first word, from every project's results, as without the index."""
+    word = query.split()[0][:5]
+    matches = 0
+    for (results,) in db.query(Step1Data.analysis_results):
+        matches += sum(word in content.lower() for _, _, content in findings_from("step1", results))
+    for results, name in db.query(Step2Process.analysis_results, Step2Process.process_name):
+        matches += sum(word in content.lower() for _, _, content in findings_from("step2", results, name))
+    matches += db.query(DocumentChunk).filter(DocumentChunk.text.ilike(f"%{word}%")).count()
+    return matches
+
+
+def timed(Session, fn, repeats: int = REPEATS) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        db = Session()
+        fn(db)
+        db.close()
+    return (time.perf_counter() - start) / repeats
+
+
+if __name__ == "__main__":
+    projects = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with tempfile.TemporaryDirectory(dir=".") as directory:
+        engine = create_db_engine(f"sqlite:///{directory}/bench.db")
+        migrate_db(engine)
+        Session = sessionmaker(bind=engine)
+        seed(Session, projects)
+
+        print(f"{projects:,} projects, {PROCESSES} processes and 10 document passages each")
+        for query in QUERIES:
+            print(f"  {query!r}")
+            db = Session()
+            results, _ = search_index.search(db, query)
+            db.close()
+            # Every hit marks its matching words, best first
+            assert results and all("**" in result["snippet"] for result in results)
+            assert [result["score"] for result in results] == sorted((result["score"] for result in results), reverse=True)
+            print(f"    scan all results    {timed(Session, lambda db: scan(db, query), 3) * 1000:9.2f} ms")
+            print(f"    full-text, page 1   {timed(Session, lambda db: search_index.search(db, query)) * 1000:9.2f} ms")
+            print(f"    full-text, page 10  "
+                  f"{timed(Session, lambda db: search_index.search(db, query, offset=180)) * 1000:9.2f} ms")
+
+        def save_step1(db, index: bool):
+            results = step1_results(random.Random())
+            db.query(Step1Data).filter(Step1Data.project_id == 1).first().analysis_results = results
+            if index:
+                search_index.index_results(db, 1, "step1", results)
+            db.commit()
+
+        print(f"  save Step 1 results   {timed(Session, lambda db: save_step1(db, False)) * 1000:9.2f} ms")
+        print(f"    with findings       {timed(Session, lambda db: save_step1(db, True)) * 1000:9.2f} ms")
+        engine.dispose()
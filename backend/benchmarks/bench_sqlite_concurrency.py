@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Benchmark concurrent reads and draft autosaves against a SQLite file.
+
+Reader threads load a project and its draft, writer threads autosave
+drafts, each operation in its own session like a request. Compares the
+previous engine (one connection shared through StaticPool, rollback
+journal) with pooled connections, in rollback journal and in WAL mode.
+
+Run from the backend directory:
+    python benchmarks/bench_sqlite_concurrency.py [readers] [writers] [seconds]
+"""
+
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.database import Base, create_db_engine, settings  # noqa: E402
+from app.models import Project, ProjectDraft  # noqa: E402
+from app.routers.projects import get_project  # noqa: E402
+
+PROJECTS = 50
+STEPS = ["step1", "step2", "step3"]
+DRAFT_FIELDS = 200  # ~10 KB of JSON per autosave
+HANG_TIMEOUT = 30  # seconds past the run before a configuration counts as deadlocked
+
+
+def static_pool_engine(url: str):
+    """The engine as configured before: every thread shares one connection."""
+    engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def _fk(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    return engine
+
+
+def pooled_engine(journal_mode: str, synchronous: str):
+    def factory(url: str):
+        settings.sqlite_journal_mode = journal_mode
+        settings.sqlite_synchronous = synchronous
+        return create_db_engine(url)
+    return factory
+
+
+CONFIGS = [
+    ("StaticPool, rollback journal", static_pool_engine),
+    ("pool, rollback journal", pooled_engine("DELETE", "FULL")),
+    ("pool, WAL", pooled_engine("WAL", "NORMAL")),
+]
+
+
+def draft_data(rng: random.Random) -> dict:
+    return {f"field_{i}": f"wartość {rng.random():.6f} " * 3 for i in range(DRAFT_FIELDS)}
+
+
+def seed(Session):
+    rng = random.Random(0)
+    db = Session()
+    projects = [Project(name=f"Projekt {i}", client_name="Klient", status="step2") for i in range(PROJECTS)]
+    db.add_all(projects)
+    db.flush()
+    db.add_all(
+        ProjectDraft(project_id=project.id, step=step, draft_data=draft_data(rng))
+        for project in projects for step in STEPS
+    )
+    db.commit()
+    ids = [project.id for project in projects]
+    db.close()
+    return ids
+
+
+def find_draft(db, project_id: int, step: str) -> ProjectDraft:
+    return db.query(ProjectDraft).filter(ProjectDraft.project_id == project_id, ProjectDraft.step == step).first()
+
+
+def save_draft(db, project_id: int, step: str, data: dict):
+    """The write behind an autosave (the API buffers autosaves, so it would hardly touch the database)."""
+    draft = find_draft(db, project_id, step)
+    draft.draft_data = data
+    draft.version += 1
+    db.commit()
+
+
+def worker(Session, project_ids, write: bool, deadline: float, latencies: list, errors: list, seed_value: int):
+    rng = random.Random(seed_value)
+    # Prepared up front so the workload is the database, not building JSON
+    payloads = [draft_data(rng) for _ in range(10)] if write else []
+    while time.perf_counter() < deadline:
+        project_id = rng.choice(project_ids)
+        step = rng.choice(STEPS)
+        db = Session()
+        start = time.perf_counter()
+        try:
+            if write:
+                save_draft(db, project_id, step, rng.choice(payloads))
+            else:
+                get_project(project_id, db)
+                find_draft(db, project_id, step).draft_data
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(type(e).__name__)
+        try:
+            db.close()
+        except Exception as e:
+            # A connection shared between threads can fail even to roll back
+            errors.append(type(e).__name__)
+
+
+def run(name, make_engine, directory: str, readers: int, writers: int, seconds: float):
+    engine = make_engine(f"sqlite:///{directory}/bench.db")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    project_ids = seed(Session)
+
+    deadline = time.perf_counter() + seconds
+    read_latencies, write_latencies, errors = [], [], []
+    threads = [
+        threading.Thread(target=worker, args=(Session, project_ids, False, deadline, read_latencies, errors, i))
+        for i in range(readers)
+    ] + [
+        threading.Thread(target=worker, args=(Session, project_ids, True, deadline, write_latencies, errors, -i))
+        for i in range(1, writers + 1)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    print(name)
+    for kind, latencies in (("reads", read_latencies), ("writes", write_latencies)):
+        if not latencies:
+            print(f"  {kind:<7} none completed")
+            continue
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95)]
+        print(f"  {kind:<7} {len(latencies) / seconds:7.0f}/s  median {statistics.median(latencies) * 1000:6.1f} ms  "
+              f"p95 {p95 * 1000:6.1f} ms  max {latencies[-1] * 1000:7.1f} ms")
+    if errors:
+        counts = {error: errors.count(error) for error in set(errors)}
+        print(f"  errors  {len(errors)} ({', '.join(f'{error} x{count}' for error, count in counts.items())})")
+    if make_engine is not static_pool_engine:
+        # Only a shared connection is expected to fail
+        assert not errors and read_latencies and write_latencies, f"{name} failed"
+
+
+if __name__ == "__main__":
+    readers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+    if len(sys.argv) > 5:
+        name, make_engine = CONFIGS[int(sys.argv[4])]
+        run(name, make_engine, sys.argv[5], readers, writers, seconds)
+        sys.exit()
+
+    print(f"{readers} reader and {writers} autosave threads, {seconds:.0f}s per configuration")
+    # Each configuration in its own process: a connection shared between
+    # threads can deadlock or crash the interpreter
+    failed = []
+    for index, (name, make_engine) in enumerate(CONFIGS):
+        print()
+        # On the working directory's disk: /tmp may be in memory, hiding fsync cost
+        with tempfile.TemporaryDirectory(dir=".") as directory:
+            try:
+                child = subprocess.run(
+                    [sys.executable, __file__, str(readers), str(writers), str(seconds), str(index), directory],
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=seconds + HANG_TIMEOUT
+                )
+            except subprocess.TimeoutExpired:
+                print(f"{name}\n  deadlocked (killed {HANG_TIMEOUT}s after the run)")
+                failed.append(make_engine)
+                continue
+        print(child.stdout, end="")
+        if child.returncode != 0:
+            print(f"{name}\n  crashed (exit code {child.returncode})")
+            failed.append(make_engine)
+    assert all(make_engine is static_pool_engine for make_engine in failed), "pooled connections failed"
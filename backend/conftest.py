@@ -0,0 +1,92 @@
+"""Shared fixtures: a scratch database and an API client using it."""
+
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.database import create_async_db_engine, create_db_engine, get_async_db, get_db, migrate_db
+from app.main import app
+from app.middleware import rate_limit
+from app.routers import drafts
+from app.services import draft_buffer as draft_buffer_module
+from app.services.claude_service import ClaudeService
+from app.utils.parse_pool import parser_pool
+
+# Step 1 analysis results as returned by Claude for uploaded documents
+ANALYSIS = {
+    "key_findings": ["Faktury są przepisywane ręcznie do systemu księgowego"],
+    "processes_scoring": [{"process_name": "Obieg faktur", "automation_potential": 80}],
+    "recommendations": [{"process_name": "Obieg faktur", "recommendation": "Wdrożyć OCR faktur"}],
+    "digital_maturity": {"overall_score": 42},
+    "confidence_scores": {"overall": 0.8},
+}
+
+
+@asynccontextmanager
+async def no_lifespan(app):
+    yield
+
+
+@pytest.fixture
+def Session(tmp_path, monkeypatch):
+    """Sessions of a migrated database in the test's directory, also the working directory for uploads."""
+    monkeypatch.chdir(tmp_path)
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    migrate_db(engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(Session, monkeypatch):
+    """
+    Client of the API over the Session database, with fresh rate limits
+    and documents parsed in threads instead of worker processes.
+    """
+    database_url = str(Session.kw["bind"].url)
+    async_engine = create_async_db_engine(database_url)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        with Session() as db:
+            yield db
+
+    async def override_get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    monkeypatch.setitem(app.dependency_overrides, get_async_db, override_get_async_db)
+    monkeypatch.setattr(rate_limit, "rate_limiter", rate_limit.RateLimiter())
+    monkeypatch.setattr(parser_pool, "workers", 0)
+    # No startup: the app's own database and background tasks stay untouched,
+    # but requests share one event loop as they do in the server
+    monkeypatch.setattr(app.router, "lifespan_context", no_lifespan)
+    with TestClient(app, base_url="http://localhost") as client:
+        yield client
+        client.portal.call(async_engine.dispose)
+
+
+@pytest.fixture
+def analyzed(monkeypatch):
+    """Documents sent for the BFA analysis, which returns ANALYSIS instead of calling Claude."""
+    calls = []
+
+    def extract_data_from_documents(self, parsed_documents):
+        calls.append(parsed_documents)
+        return ANALYSIS
+
+    monkeypatch.setattr(ClaudeService, "extract_data_from_documents", extract_data_from_documents)
+    return calls
+
+
+@pytest.fixture
+def draft_buffer(Session, monkeypatch):
+    """A draft buffer of its own, used by the API and writing to the Session database; flushed only when called."""
+    buffer = draft_buffer_module.DraftBuffer(interval_seconds=60)
+    monkeypatch.setattr(draft_buffer_module, "SessionLocal", Session)
+    monkeypatch.setattr(drafts, "draft_buffer", buffer)
+    return buffer
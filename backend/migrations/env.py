@@ -0,0 +1,73 @@
+"""Alembic environment: migrates the app database against the app models."""
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.database import Base, create_db_engine, settings
+import app.models  # noqa: F401  Registers every table on Base.metadata
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Leave out what autogenerate would wrongly report as schema changes."""
+    # step1_data has two identical unique constraints on project_id (unique=True
+    # and uq_step1_project_id); SQLite reflects only one of them
+    if type_ == "unique_constraint" and name == "uq_step1_project_id" and compare_to is None:
+        return False
+    # Full-text indexes are created by migration 0009 outside the models:
+    # FTS5 tables and their shadow tables, or tsvector columns and GIN indexes
+    if reflected and type_ == "table" and "_fts" in name:
+        return False
+    if reflected and (type_, name) in {("column", "search_vector"), ("index", "idx_findings_search"),
+                                        ("index", "idx_document_chunks_search")}:
+        return False
+    return True
+
+
+def run_migrations_offline():
+    """Emit the migration SQL for the configured database without connecting."""
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    # init_db() passes its own connection; the CLI connects here
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_migrations(connection)
+        return
+
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name)
+    engine = create_db_engine(settings.database_url)
+    try:
+        with engine.begin() as connection:
+            _run_migrations(connection)
+    finally:
+        engine.dispose()
+
+
+def _run_migrations(connection):
+    # Batch mode lets ALTER TABLE changes run on SQLite, which rebuilds the table
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        render_as_batch=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
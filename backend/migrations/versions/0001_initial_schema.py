@@ -0,0 +1,231 @@
+"""Initial schema
+
+The tables as init_db() created them with create_all() before
+migrations; init_db() stamps such databases with this revision.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 02:55:23.137967
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('projects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('client_name', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.Enum('step1', 'step2', 'step3', 'step4', 'completed', name='projectstatus'), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint('length(client_name) >= 3', name='check_client_name_length'),
+    sa.CheckConstraint('length(name) >= 3', name='check_name_length'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.create_index('idx_project_name_client', ['name', 'client_name'], unique=False)
+        batch_op.create_index('idx_project_status_updated', ['status', 'updated_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_projects_client_name'), ['client_name'], unique=False)
+        batch_op.create_index(batch_op.f('ix_projects_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_projects_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_projects_name'), ['name'], unique=False)
+        batch_op.create_index(batch_op.f('ix_projects_status'), ['status'], unique=False)
+        batch_op.create_index(batch_op.f('ix_projects_updated_at'), ['updated_at'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('password_hash', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_id'), ['id'], unique=False)
+
+    op.create_table('document_processing_results',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('extracted_data', sa.JSON(), nullable=True),
+    sa.Column('confidence_scores', sa.JSON(), nullable=True),
+    sa.Column('missing_fields', sa.JSON(), nullable=True),
+    sa.Column('processing_summary', sa.JSON(), nullable=True),
+    sa.Column('tokens_used', sa.Integer(), nullable=True),
+    sa.Column('processing_time_seconds', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('document_processing_results', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_document_processing_results_id'), ['id'], unique=False)
+
+    op.create_table('project_drafts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('step', sa.String(), nullable=False),
+    sa.Column('draft_data', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('project_drafts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_project_drafts_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_project_drafts_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_project_drafts_project_id'), ['project_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_project_drafts_step'), ['step'], unique=False)
+
+    op.create_table('step1_data',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('organization_data', sa.JSON(), nullable=True),
+    sa.Column('questionnaire_answers', sa.JSON(), nullable=True),
+    sa.Column('processes_list', sa.JSON(), nullable=True),
+    sa.Column('analysis_results', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('project_id'),
+    sa.UniqueConstraint('project_id', name='uq_step1_project_id')
+    )
+    with op.batch_alter_table('step1_data', schema=None) as batch_op:
+        batch_op.create_index('idx_step1_project_updated', ['project_id', 'updated_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_step1_data_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_step1_data_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_step1_data_updated_at'), ['updated_at'], unique=False)
+
+    op.create_table('step2_processes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('process_name', sa.String(length=200), nullable=False),
+    sa.Column('process_data', sa.JSON(), nullable=True),
+    sa.Column('analysis_results', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint('length(process_name) >= 3', name='check_process_name_length'),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('step2_processes', schema=None) as batch_op:
+        batch_op.create_index('idx_step2_project_name', ['project_id', 'process_name'], unique=False)
+        batch_op.create_index('idx_step2_project_updated', ['project_id', 'updated_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_step2_processes_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_step2_processes_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_step2_processes_process_name'), ['process_name'], unique=False)
+        batch_op.create_index(batch_op.f('ix_step2_processes_project_id'), ['project_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_step2_processes_updated_at'), ['updated_at'], unique=False)
+
+    op.create_table('step3_data',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('budget_preferences', sa.JSON(), nullable=True),
+    sa.Column('tech_preferences', sa.JSON(), nullable=True),
+    sa.Column('analysis_results', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('step3_data', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_step3_data_id'), ['id'], unique=False)
+
+    op.create_table('step4_outputs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('output_type', sa.String(), nullable=False),
+    sa.Column('gamma_url', sa.String(), nullable=True),
+    sa.Column('file_path', sa.String(), nullable=True),
+    sa.Column('settings', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('step4_outputs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_step4_outputs_id'), ['id'], unique=False)
+
+    op.create_table('uploaded_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(), nullable=False),
+    sa.Column('file_path', sa.String(), nullable=False),
+    sa.Column('file_type', sa.String(), nullable=False),
+    sa.Column('file_size', sa.BigInteger(), nullable=False),
+    sa.Column('uploaded_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('uploaded_documents', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_uploaded_documents_id'), ['id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('uploaded_documents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_uploaded_documents_id'))
+
+    op.drop_table('uploaded_documents')
+    with op.batch_alter_table('step4_outputs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_step4_outputs_id'))
+
+    op.drop_table('step4_outputs')
+    with op.batch_alter_table('step3_data', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_step3_data_id'))
+
+    op.drop_table('step3_data')
+    with op.batch_alter_table('step2_processes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_step2_processes_updated_at'))
+        batch_op.drop_index(batch_op.f('ix_step2_processes_project_id'))
+        batch_op.drop_index(batch_op.f('ix_step2_processes_process_name'))
+        batch_op.drop_index(batch_op.f('ix_step2_processes_id'))
+        batch_op.drop_index(batch_op.f('ix_step2_processes_created_at'))
+        batch_op.drop_index('idx_step2_project_updated')
+        batch_op.drop_index('idx_step2_project_name')
+
+    op.drop_table('step2_processes')
+    with op.batch_alter_table('step1_data', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_step1_data_updated_at'))
+        batch_op.drop_index(batch_op.f('ix_step1_data_id'))
+        batch_op.drop_index(batch_op.f('ix_step1_data_created_at'))
+        batch_op.drop_index('idx_step1_project_updated')
+
+    op.drop_table('step1_data')
+    with op.batch_alter_table('project_drafts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_project_drafts_step'))
+        batch_op.drop_index(batch_op.f('ix_project_drafts_project_id'))
+        batch_op.drop_index(batch_op.f('ix_project_drafts_id'))
+        batch_op.drop_index(batch_op.f('ix_project_drafts_created_at'))
+
+    op.drop_table('project_drafts')
+    with op.batch_alter_table('document_processing_results', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_document_processing_results_id'))
+
+    op.drop_table('document_processing_results')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_projects_updated_at'))
+        batch_op.drop_index(batch_op.f('ix_projects_status'))
+        batch_op.drop_index(batch_op.f('ix_projects_name'))
+        batch_op.drop_index(batch_op.f('ix_projects_id'))
+        batch_op.drop_index(batch_op.f('ix_projects_created_at'))
+        batch_op.drop_index(batch_op.f('ix_projects_client_name'))
+        batch_op.drop_index('idx_project_status_updated')
+        batch_op.drop_index('idx_project_name_client')
+
+    op.drop_table('projects')
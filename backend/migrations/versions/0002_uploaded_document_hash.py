@@ -0,0 +1,34 @@
+"""Uploaded document content hash
+
+SHA-256 of each uploaded file, keying the cache of parsed documents.
+Documents uploaded before this revision get theirs when they are next
+analysed.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 02:55:36.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('uploaded_documents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_uploaded_documents_content_hash'), ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('uploaded_documents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_uploaded_documents_content_hash'))
+        batch_op.drop_column('content_hash')
@@ -0,0 +1,64 @@
+"""Document chunks
+
+Passages of uploaded documents and the per-project inverted index over
+them. Documents uploaded before this revision are indexed when they are
+next parsed.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 02:55:45.093317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('document_chunks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('location', sa.String(), nullable=True),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('term_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['uploaded_documents.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('document_chunks', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_document_chunks_document_id'), ['document_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_document_chunks_project_id'), ['project_id'], unique=False)
+
+    op.create_table('chunk_terms',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('term', sa.String(length=16), nullable=False),
+    sa.Column('chunk_id', sa.Integer(), nullable=False),
+    sa.Column('frequency', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['chunk_id'], ['document_chunks.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id', 'term', 'chunk_id')
+    )
+    with op.batch_alter_table('chunk_terms', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_chunk_terms_chunk_id'), ['chunk_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('chunk_terms', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_chunk_terms_chunk_id'))
+
+    op.drop_table('chunk_terms')
+    with op.batch_alter_table('document_chunks', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_document_chunks_project_id'))
+        batch_op.drop_index(batch_op.f('ix_document_chunks_document_id'))
+
+    op.drop_table('document_chunks')
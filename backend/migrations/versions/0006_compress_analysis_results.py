@@ -0,0 +1,96 @@
+"""Compress analysis results
+
+Step 1-3 analysis results and document extraction results written as
+plain JSON before CompressedJSON are rewritten zstd-compressed, in
+batches; the json columns are converted to bytea (BLOB on SQLite) first.
+Values are encoded as CompressedJSON encoded them when this revision
+was written. SQLite gives the freed pages back to the filesystem only on
+VACUUM, which is left to run by hand.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 02:55:48.731204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import json
+
+import sqlalchemy as sa
+import zstandard
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column) of every CompressedJSON column
+COLUMNS = [
+    ("step1_data", "analysis_results"),
+    ("step2_processes", "analysis_results"),
+    ("step3_data", "analysis_results"),
+    ("document_processing_results", "extracted_data"),
+]
+BATCH_ROWS = 200
+COMPRESS_MIN_BYTES = 256
+COMPRESSION_LEVEL = 3
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    for table, column in COLUMNS:
+        types = {c["name"]: str(c["type"]).lower() for c in inspector.get_columns(table)}
+        if types.get(column) not in ("json", "jsonb"):
+            continue
+        if connection.dialect.name == "postgresql":
+            op.execute(
+                f"ALTER TABLE {table} ALTER COLUMN {column} TYPE BYTEA "
+                f"USING convert_to({column}::text, 'UTF8')"
+            )
+        else:
+            # SQLite keeps the stored text as it is; compress_column reads both
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.alter_column(column, existing_type=sa.JSON(), type_=sa.LargeBinary())
+    for table, column in COLUMNS:
+        compress_column(connection, table, column)
+
+
+def downgrade() -> None:
+    # CompressedJSON reads compressed and plain values alike
+    pass
+
+
+def compress_column(connection, table: str, column: str):
+    """Rewrite the column's plain JSON values compressed."""
+    last_id = 0
+    while True:
+        rows = connection.execute(sa.text(
+            f"SELECT id, {column} FROM {table} WHERE id > :last_id AND {column} IS NOT NULL "
+            f"ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": BATCH_ROWS}).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        updates = []
+        for row_id, stored in rows:
+            stored = stored.encode("utf-8") if isinstance(stored, str) else bytes(stored)
+            if stored.startswith(ZSTD_MAGIC):
+                continue
+            value = json.loads(stored)
+            encoded = None if value is None else encode_json(value)
+            if encoded != stored:
+                updates.append({"id": row_id, "value": encoded})
+        if updates:
+            connection.execute(sa.text(f"UPDATE {table} SET {column} = :value WHERE id = :id"), updates)
+
+
+def encode_json(value) -> bytes:
+    data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(data) < COMPRESS_MIN_BYTES:
+        return data
+    return zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(data)
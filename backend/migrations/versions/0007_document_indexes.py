@@ -0,0 +1,69 @@
+"""Indexes for per-project document, step and draft queries
+
+Documents, Step 3 data and Step 4 outputs are fetched by project, the
+latest analysis is a project's newest processing result, drafts are
+fetched by project and step, expired upload sessions by updated_at, and
+projects are listed by client, most recently updated first.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 02:56:12.324800
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('document_processing_results', schema=None) as batch_op:
+        batch_op.create_index('idx_processing_result_project_created', ['project_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('project_drafts', schema=None) as batch_op:
+        batch_op.create_index('idx_draft_project_step', ['project_id', 'step'], unique=False)
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.create_index('idx_project_client_updated', ['client_name', 'updated_at'], unique=False)
+
+    with op.batch_alter_table('step3_data', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_step3_data_project_id'), ['project_id'], unique=False)
+
+    with op.batch_alter_table('step4_outputs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_step4_outputs_project_id'), ['project_id'], unique=False)
+
+    with op.batch_alter_table('upload_sessions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_upload_sessions_updated_at'), ['updated_at'], unique=False)
+
+    with op.batch_alter_table('uploaded_documents', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_uploaded_documents_project_id'), ['project_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('uploaded_documents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_uploaded_documents_project_id'))
+
+    with op.batch_alter_table('upload_sessions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_upload_sessions_updated_at'))
+
+    with op.batch_alter_table('step4_outputs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_step4_outputs_project_id'))
+
+    with op.batch_alter_table('step3_data', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_step3_data_project_id'))
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_index('idx_project_client_updated')
+
+    with op.batch_alter_table('project_drafts', schema=None) as batch_op:
+        batch_op.drop_index('idx_draft_project_step')
+
+    with op.batch_alter_table('document_processing_results', schema=None) as batch_op:
+        batch_op.drop_index('idx_processing_result_project_created')
@@ -0,0 +1,135 @@
+"""Portfolio metrics
+
+Per-project metrics and their portfolio totals, computed for the
+projects there are from their step results as portfolio_service
+computed them when this revision was written.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 03:00:47.922133
+
+"""
+import json
+from typing import Any, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import zstandard
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def upgrade() -> None:
+    portfolio_metrics = op.create_table('portfolio_metrics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_count', sa.Integer(), nullable=False),
+    sa.Column('process_count', sa.Integer(), nullable=False),
+    sa.Column('analyzed_process_count', sa.Integer(), nullable=False),
+    sa.Column('current_cost', sa.Float(), nullable=False),
+    sa.Column('waste_cost', sa.Float(), nullable=False),
+    sa.Column('savings_potential', sa.Float(), nullable=False),
+    sa.Column('maturity_score_total', sa.Float(), nullable=False),
+    sa.Column('maturity_scored_projects', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    project_metrics_table = op.create_table('project_metrics',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('process_count', sa.Integer(), nullable=False),
+    sa.Column('analyzed_process_count', sa.Integer(), nullable=False),
+    sa.Column('current_cost', sa.Float(), nullable=False),
+    sa.Column('waste_cost', sa.Float(), nullable=False),
+    sa.Column('savings_potential', sa.Float(), nullable=False),
+    sa.Column('maturity_score', sa.Float(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+
+    connection = op.get_bind()
+    rows = [
+        {"project_id": project_id, **project_metrics(*step_results(connection, project_id))}
+        for (project_id,) in connection.execute(sa.text("SELECT id FROM projects")).all()
+    ]
+    if rows:
+        op.bulk_insert(project_metrics_table, rows)
+    scored = [row["maturity_score"] for row in rows if row["maturity_score"] is not None]
+    op.bulk_insert(portfolio_metrics, [{
+        "id": 1,
+        "project_count": len(rows),
+        **{column: sum(row[column] for row in rows) for column in (
+            "process_count", "analyzed_process_count", "current_cost", "waste_cost", "savings_potential"
+        )},
+        "maturity_score_total": sum(scored),
+        "maturity_scored_projects": len(scored)
+    }])
+
+
+def downgrade() -> None:
+    op.drop_table('project_metrics')
+    op.drop_table('portfolio_metrics')
+
+
+def step_results(connection, project_id: int):
+    """A project's Step 1 results, Step 2 process results and Step 3 results."""
+    def results(table: str):
+        return [
+            None if value is None else decode_json(value)
+            for (value,) in connection.execute(
+                sa.text(f"SELECT analysis_results FROM {table} WHERE project_id = :project_id ORDER BY id"),
+                {"project_id": project_id}
+            )
+        ]
+    step1, step3 = results("step1_data"), results("step3_data")
+    return step1[0] if step1 else None, results("step2_processes"), step3[0] if step3 else None
+
+
+def decode_json(data):
+    if isinstance(data, str):
+        return json.loads(data)
+    data = bytes(data)
+    if data.startswith(ZSTD_MAGIC):
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return json.loads(data)
+
+
+def _number(data: Any, key: str) -> Optional[float]:
+    value = data.get(key) if isinstance(data, dict) else None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _best_benefits(result: Any) -> float:
+    scenarios = result.get("scenarios") if isinstance(result, dict) else None
+    if not isinstance(scenarios, list):
+        return 0.0
+    return max((_number(s.get("benefits_year1"), "total") or 0.0 for s in scenarios if isinstance(s, dict)), default=0.0)
+
+
+def project_metrics(step1_results, step2_results, step3_results):
+    """Metrics for a project's Step 1 results, Step 2 process results and Step 3 results."""
+    analyzed = [result for result in step2_results if isinstance(result, dict) and result]
+    if isinstance(step3_results, dict) and isinstance(step3_results.get("process_scenarios"), list):
+        savings_potential = sum(
+            _best_benefits(process.get("scenarios"))
+            for process in step3_results["process_scenarios"] if isinstance(process, dict)
+        )
+    else:
+        savings_potential = _best_benefits(step3_results)
+
+    return {
+        "process_count": len(step2_results),
+        "analyzed_process_count": len(analyzed),
+        "current_cost": sum(_number(result.get("process_costs"), "total_cost") or 0.0 for result in analyzed),
+        "waste_cost": sum(_number(result.get("muda_analysis"), "total_waste_cost") or 0.0 for result in analyzed),
+        "savings_potential": savings_potential,
+        "maturity_score": _number((step1_results or {}).get("digital_maturity"), "overall_score")
+    }
@@ -0,0 +1,182 @@
+"""Full-text search
+
+Findings extracted from the projects' step results (as search_index
+extracted them when this revision was written), and full-text
+indexes over them and the document passages: FTS5 tables kept in sync
+by triggers on SQLite, generated tsvector columns with GIN indexes on
+PostgreSQL.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 05:12:31.406518
+
+"""
+import json
+from typing import Any, Iterator, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import zstandard
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (source table, indexed columns); the FTS5 table is <source>_fts
+FULL_TEXT = [
+    ("findings", ["title", "content"]),
+    ("document_chunks", ["text"]),
+]
+# Folds diacritics except ł, which the triggers fold before indexing
+TOKENIZE = "unicode61 remove_diacritics 2"
+STEP1_FIELDS = ["key_findings", "processes_scoring", "recommendations"]
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def fold(expression: str) -> str:
+    """SQL folding ł like stem() does; token positions are unchanged, so snippets still line up."""
+    return f"replace(replace({expression}, 'ł', 'l'), 'Ł', 'L')"
+
+
+def upgrade() -> None:
+    findings = op.create_table('findings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('step', sa.String(), nullable=False),
+    sa.Column('process_id', sa.Integer(), nullable=True),
+    sa.Column('field', sa.String(), nullable=False),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['process_id'], ['step2_processes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('findings', schema=None) as batch_op:
+        batch_op.create_index('idx_finding_project_step', ['project_id', 'step'], unique=False)
+
+    if op.get_bind().dialect.name == "postgresql":
+        for table, columns in FULL_TEXT:
+            document = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+            op.execute(
+                f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+                f"GENERATED ALWAYS AS (to_tsvector('simple', {document})) STORED"
+            )
+            op.execute(f"CREATE INDEX idx_{table}_search ON {table} USING gin (search_vector)")
+    else:
+        for table, columns in FULL_TEXT:
+            create_fts5(table, columns)
+        op.execute(f"INSERT INTO document_chunks_fts(rowid, text) SELECT id, {fold('text')} FROM document_chunks")
+
+    backfill = list(existing_findings(op.get_bind()))
+    if backfill:
+        op.bulk_insert(findings, backfill)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for table, _ in FULL_TEXT:
+            op.execute(f"DROP INDEX idx_{table}_search")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
+    else:
+        for table, _ in FULL_TEXT:
+            for event in ("insert", "delete", "update"):
+                op.execute(f"DROP TRIGGER {table}_fts_{event}")
+            op.execute(f"DROP TABLE {table}_fts")
+
+    with op.batch_alter_table('findings', schema=None) as batch_op:
+        batch_op.drop_index('idx_finding_project_step')
+    op.drop_table('findings')
+
+
+def create_fts5(table: str, columns: list):
+    """An external-content FTS5 table over a table's columns, and the triggers keeping it in sync."""
+    names = ", ".join(columns)
+    new = ", ".join(fold(f"new.{column}") for column in columns)
+    old = ", ".join(fold(f"old.{column}") for column in columns)
+    fts = f"{table}_fts"
+    op.execute(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{table}', content_rowid='id', tokenize='{TOKENIZE}')"
+    )
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});"
+    delete = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});"
+    op.execute(f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN {insert} END")
+    op.execute(f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN {delete} END")
+    op.execute(f"CREATE TRIGGER {fts}_update AFTER UPDATE ON {table} BEGIN {delete} {insert} END")
+
+
+def existing_findings(connection):
+    """Findings of the step results saved before this revision."""
+    def results(table: str, columns: str = ""):
+        return connection.execute(sa.text(
+            f"SELECT project_id, analysis_results{columns} FROM {table} WHERE analysis_results IS NOT NULL ORDER BY id"
+        ))
+
+    for project_id, value in results("step1_data"):
+        yield from rows(project_id, "step1", findings_from("step1", decode_json(value)))
+    for project_id, value, process_id, process_name in results("step2_processes", ", id, process_name"):
+        yield from rows(project_id, "step2", findings_from("step2", decode_json(value), process_name), process_id)
+    for project_id, value in results("step3_data"):
+        yield from rows(project_id, "step3", findings_from("step3", decode_json(value)))
+
+
+def rows(project_id: int, step: str, findings: list, process_id: int = None):
+    for field, title, content in findings:
+        yield {
+            "project_id": project_id, "step": step, "process_id": process_id,
+            "field": field, "title": title, "content": content
+        }
+
+
+def decode_json(data):
+    if isinstance(data, str):
+        return json.loads(data)
+    data = bytes(data)
+    if data.startswith(ZSTD_MAGIC):
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return json.loads(data)
+
+
+def _strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        if value.strip():
+            yield value.strip()
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def _finding(field: str, title: Optional[str], value: Any):
+    content = "\n".join(_strings(value))
+    return (field, title, content) if content else None
+
+
+def findings_from(step: str, results: Any, process_name: Optional[str] = None) -> list:
+    """(field, title, content) of each finding in a step's analysis results (for Step 2, of one process)."""
+    if not isinstance(results, dict):
+        return []
+    findings = []
+    if step == "step1":
+        for field in STEP1_FIELDS:
+            value = results.get(field)
+            for item in value if isinstance(value, list) else [value]:
+                title = item.get("process_name") if isinstance(item, dict) else None
+                findings.append(_finding(field, title, item))
+    elif step == "step2":
+        for bottleneck in results.get("bottlenecks") or []:
+            findings.append(_finding("bottlenecks", process_name, bottleneck))
+    elif step == "step3":
+        for process in results.get("process_scenarios") or []:
+            if isinstance(process, dict) and isinstance(process.get("scenarios"), dict):
+                comparison = process["scenarios"].get("comparison") or {}
+                findings.append(_finding(
+                    "recommendations", process.get("process_name"),
+                    [comparison.get("recommendation"), comparison.get("rationale")] if isinstance(comparison, dict) else None
+                ))
+    return [finding for finding in findings if finding]
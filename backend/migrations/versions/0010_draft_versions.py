@@ -0,0 +1,31 @@
+"""Draft versions
+
+Drafts count their autosaves, so a save is acknowledged with a version
+before it is written.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 06:02:44.187301
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('project_drafts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('project_drafts', schema=None) as batch_op:
+        batch_op.drop_column('version')
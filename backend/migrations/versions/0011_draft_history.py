@@ -0,0 +1,64 @@
+"""Draft history
+
+Versions of each draft, as snapshots and merge patches, starting from a
+snapshot of every existing draft.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 07:21:09.558214
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import zstandard
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Snapshots are written as CompressedJSON wrote them when this revision was
+COMPRESS_MIN_BYTES = 256
+COMPRESSION_LEVEL = 3
+
+
+def upgrade() -> None:
+    draft_versions = op.create_table('draft_versions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('draft_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('is_snapshot', sa.Boolean(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['draft_id'], ['project_drafts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('draft_versions', schema=None) as batch_op:
+        batch_op.create_index('idx_draft_version', ['draft_id', 'version'], unique=True)
+
+    drafts = sa.table('project_drafts', sa.column('id'), sa.column('version'),
+                      sa.column('draft_data', sa.JSON()), sa.column('updated_at', sa.DateTime()))
+    snapshots = [
+        {"draft_id": id, "version": version, "is_snapshot": True, "data": encode_json(draft_data), "created_at": updated_at}
+        for id, version, draft_data, updated_at in op.get_bind().execute(sa.select(drafts))
+    ]
+    if snapshots:
+        op.bulk_insert(draft_versions, snapshots)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('draft_versions', schema=None) as batch_op:
+        batch_op.drop_index('idx_draft_version')
+    op.drop_table('draft_versions')
+
+
+def encode_json(value) -> bytes:
+    data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(data) < COMPRESS_MIN_BYTES:
+        return data
+    return zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(data)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Test that a project and its step data load with one aggregate query pair."""
+
+import pytest
+from sqlalchemy import event
+
+from app.models import Project, Step1Data, Step2Process, Step3Data
+from app.services.analysis_service import AnalysisService
+
+
+@pytest.fixture
+def db(Session):
+    with Session() as db:
+        db.add(Project(id=1, name="Audyt", client_name="Klient SA"))
+        db.add(Step1Data(project_id=1, analysis_results={"key_findings": ["Ręczne faktury"]}))
+        db.add_all(
+            Step2Process(project_id=1, process_name=name, process_data={"basic_info": {"name": name}},
+                         analysis_results={"process_costs": {"total_cost": cost}})
+            for name, cost in (("Obieg faktur", 1000), ("Urlopy", 250))
+        )
+        db.add(Step3Data(project_id=1, analysis_results={"scenarios": [{"benefits_year1": {"total": 600}}]}))
+        db.commit()
+    with Session() as db:
+        yield db
+
+
+def count_queries(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_summary_takes_two_queries(db):
+    statements = count_queries(db)
+    summary = AnalysisService.get_project_summary(db, 1)
+
+    assert len(statements) == 2
+    assert summary["project"] == {"id": 1, "name": "Audyt", "client_name": "Klient SA", "status": "step1"}
+    assert summary["step1_results"] == {"key_findings": ["Ręczne faktury"]}
+    assert [process["process_name"] for process in summary["step2_results"]] == ["Obieg faktur", "Urlopy"]
+    assert summary["step2_results"][1]["analysis_results"] == {"process_costs": {"total_cost": 250}}
+    assert summary["step3_results"] == {"scenarios": [{"benefits_year1": {"total": 600}}]}
+
+    savings = AnalysisService.calculate_total_savings(summary["step2_results"], summary["step3_results"])
+    assert savings == {"total_current_cost": 1250, "total_waste_cost": 0,
+                       "total_savings_potential": 600, "roi_potential": 48}
+
+
+def test_unlisted_step_data_is_not_loaded(db):
+    statements = count_queries(db)
+    project = AnalysisService.load_project_aggregate(
+        db, 1, step1_columns=[Step1Data.analysis_results], step2_columns=None, step3_columns=None
+    )
+    assert len(statements) == 1
+    assert project.step1_data.analysis_results == {"key_findings": ["Ręczne faktury"]}
+
+
+def test_missing_project(db):
+    assert AnalysisService.load_project_aggregate(db, 2) is None
+    assert AnalysisService.get_project_summary(db, 2) == {}
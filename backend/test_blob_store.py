@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Test reference counting of shared uploaded files."""
+
+import hashlib
+import threading
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.database import create_db_engine, migrate_db
+from app.models import DocumentBlob, Project, UploadedDocument
+from app.services.blob_store import BlobStore
+
+CONTENT = b"Proces fakturowania: 12 faktur dziennie"
+CONTENT_HASH = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Parsed cache lives under the working directory
+    return BlobStore(tmp_path / "blobs")
+
+
+@pytest.fixture
+def Session(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'blobs.db'}")
+    migrate_db(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(Project(id=1, name="Audyt", client_name="Klient SA"))
+        db.commit()
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def upload(db, store: BlobStore) -> UploadedDocument:
+    incoming = store.incoming_path()
+    incoming.write_bytes(CONTENT)
+    file_path = store.add(db, incoming, CONTENT_HASH, len(CONTENT))
+    document = UploadedDocument(
+        project_id=1, filename="faktury.txt", file_path=file_path, file_type="txt",
+        file_size=len(CONTENT), content_hash=CONTENT_HASH
+    )
+    db.add(document)
+    db.commit()
+    return document
+
+
+def delete(db, store: BlobStore, document: UploadedDocument):
+    released = store.release(db, [document])
+    db.delete(document)
+    db.commit()
+    store.purge(db, released)
+
+
+def ref_count(db):
+    return db.query(DocumentBlob.ref_count).filter(DocumentBlob.content_hash == CONTENT_HASH).scalar()
+
+
+def test_identical_uploads_share_one_file(Session, store):
+    with Session() as db:
+        first, second = upload(db, store), upload(db, store)
+        assert first.file_path == second.file_path
+        assert ref_count(db) == 2
+        assert list(store.incoming_dir.iterdir()) == []
+
+        delete(db, store, first)
+        assert ref_count(db) == 1
+        assert store.blob_path(CONTENT_HASH).read_bytes() == CONTENT
+
+        delete(db, store, second)
+        assert ref_count(db) is None
+        assert not store.blob_path(CONTENT_HASH).exists()
+
+
+def test_purge_keeps_file_referenced_by_upload_in_progress(Session, store):
+    with Session() as db:
+        document = upload(db, store)
+        released = store.release(db, [document])
+        db.delete(document)
+        db.commit()
+
+    # Another upload of the same content takes a reference before the purge
+    # runs, and commits only after the purge has started
+    with Session() as uploading, Session() as purging:
+        incoming = store.incoming_path()
+        incoming.write_bytes(CONTENT)
+        store.add_reference(uploading, CONTENT_HASH, len(CONTENT))
+        purge = threading.Thread(target=store.purge, args=(purging, released))
+        purge.start()
+        time.sleep(0.3)
+        store.store_file(incoming, CONTENT_HASH)
+        uploading.commit()
+        purge.join()
+
+        assert ref_count(uploading) == 1
+        assert store.blob_path(CONTENT_HASH).read_bytes() == CONTENT
+
+
+def test_purge_removes_file_of_rolled_back_upload(Session, store):
+    with Session() as db:
+        incoming = store.incoming_path()
+        incoming.write_bytes(CONTENT)
+        file_path = store.add(db, incoming, CONTENT_HASH, len(CONTENT))
+        db.rollback()
+
+        store.purge(db, [(CONTENT_HASH, file_path)])
+        assert ref_count(db) is None
+        assert not store.blob_path(CONTENT_HASH).exists()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Test that analysis results are stored compressed and loaded only when read."""
+
+import json
+
+import pytest
+from sqlalchemy import event, text
+
+from app.models import Project, Step1Data
+from app.models.types import ZSTD_MAGIC, decode_json, encode_json
+
+RESULTS = {
+    "key_findings": [f"Proces {i}: faktury są przepisywane ręcznie do systemu księgowego" for i in range(50)],
+    "digital_maturity": {"overall_score": 42},
+}
+
+
+def test_large_values_are_compressed_and_small_ones_kept_plain():
+    stored = encode_json(RESULTS)
+    assert stored.startswith(ZSTD_MAGIC)
+    assert len(stored) < len(json.dumps(RESULTS, ensure_ascii=False).encode()) / 5
+    assert decode_json(stored) == RESULTS
+
+    assert encode_json({"score": 42}) == b'{"score":42}'
+    assert decode_json(b'{"score":42}') == {"score": 42}
+    # Rows written as text before compression
+    assert decode_json('{"ocena": "średnia"}') == {"ocena": "średnia"}
+
+
+@pytest.fixture
+def db(Session):
+    with Session() as db:
+        db.add(Project(id=1, name="Audyt", client_name="Klient SA"))
+        db.add(Step1Data(project_id=1, analysis_results=RESULTS, processes_list=["Obieg faktur"]))
+        db.commit()
+    with Session() as db:
+        yield db
+
+
+def test_results_are_compressed_in_the_database(db):
+    stored = db.execute(text("SELECT analysis_results FROM step1_data")).scalar()
+    assert stored.startswith(ZSTD_MAGIC)
+    assert db.query(Step1Data).one().analysis_results == RESULTS
+
+
+def test_results_are_loaded_on_access(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    step1 = db.query(Step1Data).one()
+    assert step1.processes_list == ["Obieg faktur"]
+    assert "analysis_results" not in statements[0]
+    assert step1.analysis_results == RESULTS
+    assert len(statements) == 2
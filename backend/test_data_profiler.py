@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Test that table profiles fed in chunks describe the whole table."""
+
+import pandas as pd
+
+from app.utils.data_profiler import TableProfiler
+
+
+def profile(rows, chunk_rows: int, decimal: str = ".") -> TableProfiler:
+    frame = pd.DataFrame(rows[1:], columns=rows[0])
+    profiler = TableProfiler(list(frame.columns), decimal=decimal)
+    for start in range(0, len(frame), chunk_rows):
+        profiler.update(frame.iloc[start:start + chunk_rows])
+    return profiler
+
+
+def test_group_aggregates_cover_every_chunk():
+    # Hours look like a sequential ID until the last chunk
+    rows = [["Proces", "Dział", "Godziny"]] + [
+        [f"P{i}", "Kadry" if i % 2 else "Księgowość", str(10 * (i + 1))] for i in range(6)
+    ] + [["P6", "Księgowość", "5"]]
+    profiler = profile(rows, chunk_rows=3)
+
+    assert profiler.group_aggregates() == {"Dział": {
+        "Księgowość": {"rows": 4, "Godziny": {"sum": 95, "mean": 23.75}},
+        "Kadry": {"rows": 3, "Godziny": {"sum": 120, "mean": 40}},
+    }}
+
+
+def test_sequential_ids_are_not_aggregated():
+    rows = [["Lp", "Dział", "Koszt"]] + [
+        [str(i), "Kadry" if i % 2 else "Księgowość", "1,5"] for i in range(1, 9)
+    ]
+    profiler = profile(rows, chunk_rows=3, decimal=",")
+
+    assert profiler.to_dict()["Lp"] == {
+        "dtype": "number", "count": 8, "nulls": 0, "distinct": 8, "distinct_is_lower_bound": False,
+        "sequential_id": True, "min": 1, "max": 8
+    }
+    assert profiler.group_aggregates()["Dział"]["Kadry"] == {"rows": 4, "Koszt": {"sum": 6, "mean": 1.5}}
+
+
+def test_outliers_keep_their_rows():
+    rows = [["Czas"]] + [[str(10 + i % 3)] for i in range(40)] + [["500"]] + [[str(10 + i % 3)] for i in range(9)]
+    outliers = profile(rows, chunk_rows=7).to_dict()["Czas"]["outliers"]
+
+    assert outliers["highest"] == [{"row": 41, "value": 500}]
+    assert outliers["lowest"] == []
+    assert outliers["estimated_count"] == 1
+
+
+def test_date_columns_report_their_span():
+    rows = [["Data"]] + [[f"2024-0{month}-15"] for month in (1, 1, 2, 3)] + [[""]]
+    span = profile(rows, chunk_rows=2).to_dict()["Data"]
+
+    assert (span["dtype"], span["count"], span["nulls"]) == ("datetime", 4, 1)
+    assert (span["min"][:10], span["max"][:10], span["span_days"]) == ("2024-01-15", "2024-03-15", 60)
+    assert span["rows_per_month"] == {"2024-01": 2, "2024-02": 1, "2024-03": 1}
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Test how SQLite connections are configured and pooled."""
+
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.database import async_database_url, create_async_db_engine, create_db_engine, settings
+
+
+def pragma(connection, name: str):
+    return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_file_database_connections_use_wal(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    assert isinstance(engine.pool, QueuePool)
+    with engine.connect() as connection:
+        assert pragma(connection, "journal_mode") == "wal"
+        assert pragma(connection, "foreign_keys") == 1
+        assert pragma(connection, "synchronous") == 1  # NORMAL
+        assert pragma(connection, "busy_timeout") == settings.sqlite_busy_timeout_ms
+    engine.dispose()
+
+
+def test_readers_are_not_blocked_by_a_writer(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE drafts (id INTEGER PRIMARY KEY, data TEXT)"))
+        connection.execute(text("INSERT INTO drafts (data) VALUES ('v1')"))
+
+    with engine.connect() as writer, engine.connect() as reader:
+        writer.execute(text("BEGIN IMMEDIATE"))
+        writer.execute(text("UPDATE drafts SET data = 'v2'"))
+        # Sees the last committed version while the write is in progress
+        assert reader.execute(text("SELECT data FROM drafts")).scalar() == "v1"
+        writer.execute(text("COMMIT"))
+        assert reader.execute(text("SELECT data FROM drafts")).scalar() == "v2"
+    engine.dispose()
+
+
+def test_in_memory_database_is_one_shared_connection():
+    engine = create_db_engine("sqlite://")
+    assert isinstance(engine.pool, StaticPool)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE t (id INTEGER)"))
+    with engine.connect() as connection:
+        assert pragma(connection, "foreign_keys") == 1
+        assert connection.execute(text("SELECT count(*) FROM t")).scalar() == 0
+
+
+def test_async_engine_uses_the_async_driver_and_same_pragmas(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    assert async_database_url(url).drivername == "sqlite+aiosqlite"
+    assert async_database_url("postgresql://db/audit").drivername == "postgresql+asyncpg"
+
+    async def run():
+        engine = create_async_db_engine(url)
+        async with engine.connect() as connection:
+            modes = [(await connection.execute(text(f"PRAGMA {name}"))).scalar()
+                     for name in ("journal_mode", "foreign_keys")]
+        await engine.dispose()
+        return modes
+
+    assert asyncio.run(run()) == ["wal", 1]
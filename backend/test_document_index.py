@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Test that document passages are chunked, indexed per project and ranked by BM25."""
+
+import hashlib
+
+import pytest
+
+from app.models import ChunkTerm, DocumentChunk, Project, UploadedDocument
+from app.services import document_index as index_module
+from app.services.document_index import chunk_document, document_index, process_query
+from app.utils.parsed_cache import store_parsed
+
+INVOICES = {
+    "type": "markdown",
+    "content": "Wstęp\n# Obieg faktur\nFaktury kosztowe są skanowane i ręcznie przepisywane do systemu FK.\n"
+               "# Urlopy\nWnioski urlopowe zatwierdza kierownik w arkuszu.",
+    "sections": [
+        {"title": "Obieg faktur", "content": "Faktury kosztowe są skanowane i ręcznie przepisywane do systemu FK."},
+        {"title": "Urlopy", "content": "Wnioski urlopowe zatwierdza kierownik w arkuszu."},
+    ],
+}
+COSTS = {
+    "type": "csv",
+    "columns": ["Proces", "Koszt"],
+    "column_profiles": {"Proces": {"top_values": [{"value": "Fakturowanie", "count": 3}]}},
+    "data": [{"Proces": "Fakturowanie", "Koszt": "12,5"}, {"Proces": "Kadry", "Koszt": "4,0"}],
+}
+
+
+@pytest.fixture
+def db(Session):
+    with Session() as db:
+        db.add_all([Project(id=1, name="Audyt", client_name="Klient SA"),
+                    Project(id=2, name="Inny audyt", client_name="Inny klient")])
+        db.commit()
+        yield db
+
+
+def add_document(db, project_id: int, filename: str, parsed=None) -> UploadedDocument:
+    content_hash = hashlib.sha256(filename.encode()).hexdigest()
+    document = UploadedDocument(project_id=project_id, filename=filename, file_path=filename,
+                                file_type=filename.rsplit(".", 1)[-1], file_size=1, content_hash=content_hash)
+    db.add(document)
+    db.flush()
+    if parsed is not None:
+        document_index.index(db, [document], [parsed])
+    db.commit()
+    return document
+
+
+def test_passages_keep_their_location():
+    assert chunk_document(INVOICES) == [
+        (None, "Wstęp"),
+        ("Obieg faktur", "Obieg faktur\nFaktury kosztowe są skanowane i ręcznie przepisywane do systemu FK."),
+        ("Urlopy", "Urlopy\nWnioski urlopowe zatwierdza kierownik w arkuszu."),
+    ]
+    assert chunk_document(COSTS) == [
+        ("wiersze", "Kolumny: Proces, Koszt\nProces: Fakturowanie"),
+        ("wiersze", "Proces | Koszt\nFakturowanie | 12,5\nKadry | 4,0"),
+    ]
+    pdf = {"type": "pdf", "content": [{"page": 3, "text": "Akceptacja faktur"}]}
+    assert chunk_document(pdf) == [("strona 3", "Akceptacja faktur")]
+
+
+def test_long_lines_are_cut_between_words(monkeypatch):
+    monkeypatch.setattr(index_module, "CHUNK_CHARS", 20)
+    passages = chunk_document({"type": "text", "content": "krótka linia\n" + "słowo " * 8})
+    assert [text for _, text in passages] == ["krótka linia", "słowo słowo słowo", "słowo słowo słowo", "słowo słowo"]
+
+
+def test_inflected_query_finds_the_relevant_passage(db):
+    add_document(db, 1, "procedury.md", INVOICES)
+    add_document(db, 1, "koszty.csv", COSTS)
+
+    results = document_index.search(db, 1, "faktura kosztowa przepisywana ręcznie")
+    assert [(result["filename"], result["location"]) for result in results][0] == ("procedury.md", "Obieg faktur")
+    assert results == sorted(results, key=lambda result: -result["score"])
+    assert document_index.search(db, 1, "i w do") == []
+
+
+def test_search_stays_within_the_project_and_text_budget(db):
+    add_document(db, 1, "procedury.md", INVOICES)
+    add_document(db, 2, "inne.md", INVOICES)
+
+    results = document_index.search(db, 2, "faktury urlopy")
+    assert {result["filename"] for result in results} == {"inne.md"}
+    assert len(document_index.search(db, 2, "faktury urlopy", max_chars=80)) == 1
+
+
+def test_passages_go_with_their_document(db):
+    document = add_document(db, 1, "procedury.md", INVOICES)
+    db.delete(document)
+    db.commit()
+    assert db.query(DocumentChunk).count() == 0
+    assert db.query(ChunkTerm).count() == 0
+
+
+def test_documents_uploaded_before_the_index_are_indexed_from_the_parsed_cache(db):
+    cached = add_document(db, 1, "procedury.md")
+    add_document(db, 1, "niesparsowany.md")
+    store_parsed(cached.content_hash, INVOICES)
+
+    document_index.ensure_indexed(db, 1)
+    assert {chunk.document_id for chunk in db.query(DocumentChunk)} == {cached.id}
+    assert document_index.search(db, 1, "urlop")[0]["location"] == "Urlopy"
+
+
+def test_process_query_weighs_the_process_name():
+    query = process_query("Obieg faktur", {
+        "systems": {"systems_used": ["SAP"]},
+        "as_is": {"steps": [{"name": "Skan", "system_used": "OCR"}]},
+        "problems": {"problems": [{"description": "Ręczne przepisywanie"}]},
+    }, {"bottlenecks": [{"name": "Akceptacja"}]})
+    assert query == "Obieg faktur Obieg faktur SAP Skan OCR Ręczne przepisywanie Akceptacja"
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Test that draft autosaves are buffered and written behind in one go."""
+
+import pytest
+
+from app.models import DraftVersion, Project, ProjectDraft
+
+
+@pytest.fixture
+def project(Session):
+    with Session() as db:
+        db.add(Project(id=1, name="Audyt", client_name="Klient SA"))
+        db.commit()
+
+
+def autosave(client, step, patch, base_version=None):
+    params = {"step": step, **({"base_version": base_version} if base_version is not None else {})}
+    response = client.patch("/api/projects/1/drafts/save", params=params, json=patch)
+    assert response.status_code == 200, response.text
+    return response.json()["version"]
+
+
+def saved_drafts(Session):
+    with Session() as db:
+        return {draft.step: (draft.version, draft.draft_data) for draft in db.query(ProjectDraft)}
+
+
+def test_burst_of_autosaves_is_written_once(client, Session, project, draft_buffer):
+    for i in range(1, 6):
+        assert autosave(client, "step1", {"company": {"name": "Klient SA", "employees": i}}) == i
+    assert autosave(client, "step1", {"company": {"employees": None}, "notes": "ręcznie"}) == 6
+
+    # Acknowledged and readable before anything is written
+    assert saved_drafts(Session) == {}
+    loaded = client.get("/api/projects/1/drafts/load", params={"step": "step1"}).json()
+    assert (loaded["version"], loaded["draft_data"]) == (6, {"company": {"name": "Klient SA"}, "notes": "ręcznie"})
+    assert client.get("/api/projects/1/drafts/all").json()["drafts"][0]["version"] == 6
+
+    assert draft_buffer.flush() == 1
+    assert draft_buffer.flush() == 0
+    assert saved_drafts(Session) == {"step1": (6, {"company": {"name": "Klient SA"}, "notes": "ręcznie"})}
+    with Session() as db:
+        assert [version for (version,) in db.query(DraftVersion.version)] == [6]
+
+
+def test_stale_base_version_is_rejected(client, project, draft_buffer):
+    assert autosave(client, "step1", {"notes": "pierwsza"}, base_version=0) == 1
+    response = client.patch("/api/projects/1/drafts/save", params={"step": "step1", "base_version": 0},
+                            json={"notes": "nadpisana"})
+    assert response.status_code == 409
+    assert client.get("/api/projects/1/drafts/load", params={"step": "step1"}).json()["draft_data"] == {"notes": "pierwsza"}
+    assert autosave(client, "step1", {"notes": "druga"}, base_version=1) == 2
+
+
+def test_moving_to_another_step_writes_the_previous_one(client, Session, project, draft_buffer):
+    autosave(client, "step1", {"notes": "krok 1"})
+    autosave(client, "step1", {"notes": "krok 1, poprawiony"})
+    autosave(client, "step2", {"process": "Obieg faktur"})
+    assert saved_drafts(Session) == {"step1": (2, {"notes": "krok 1, poprawiony"}), "step2": (1, {"process": "Obieg faktur"})}
+    assert draft_buffer.pending(1) == {}
+
+    # Loaded again, a draft continues from the written version
+    draft_buffer.discard(1)
+    assert autosave(client, "step1", {"notes": "krok 1, znowu"}, base_version=2) == 3
+
+
+def test_missing_project(client, draft_buffer):
+    response = client.patch("/api/projects/1/drafts/save", params={"step": "step1"}, json={"notes": "brak"})
+    assert response.status_code == 404
+    assert client.get("/api/projects/1/drafts/load", params={"step": "step1"}).status_code == 404
+    assert draft_buffer.pending(1) == {}
+
+
+def test_cleared_and_deleted_drafts_are_not_written_back(client, Session, project, draft_buffer):
+    autosave(client, "step1", {"notes": "do usunięcia"})
+    assert client.delete("/api/projects/1/drafts/clear", params={"step": "step1"}).status_code == 200
+    assert draft_buffer.flush() == 0
+    assert client.get("/api/projects/1/drafts/load", params={"step": "step1"}).json()["has_draft"] is False
+
+    autosave(client, "step2", {"notes": "projekt usunięty"})
+    assert client.delete("/api/projects/1").status_code == 200
+    draft_buffer.flush()
+    assert saved_drafts(Session) == {}
+    assert draft_buffer.pending(1) == {}
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Test that earlier draft versions are kept as snapshots and diffs and can be restored."""
+
+import pytest
+
+from app.models import DraftVersion, Project, ProjectDraft
+from app.services import draft_history
+from app.services.draft_history import DraftHistory
+from app.utils.helpers import merge_diff, merge_patch
+
+
+@pytest.fixture
+def project(Session, monkeypatch):
+    monkeypatch.setattr(draft_history, "SNAPSHOT_EVERY", 3)
+    monkeypatch.setattr(draft_history, "KEEP_SNAPSHOTS", 2)
+    with Session() as db:
+        db.add(Project(id=1, name="Audyt", client_name="Klient SA"))
+        db.commit()
+
+
+def version_data(i):
+    return {"company": {"name": "Klient SA", "employees": 10 * i}, "processes": [f"Proces {n}" for n in range(i)]}
+
+
+def save(client, draft_buffer, data):
+    response = client.post("/api/projects/1/drafts/save", params={"step": "step1"}, json=data)
+    assert response.status_code == 200, response.text
+    draft_buffer.flush()
+
+
+def versions(client):
+    response = client.get("/api/projects/1/drafts/versions", params={"step": "step1"})
+    assert response.status_code == 200, response.text
+    return [(version["version"], version["is_snapshot"]) for version in response.json()["versions"]]
+
+
+def test_merge_diff_round_trips():
+    source = {"a": 1, "b": {"c": [1, 2], "d": "x"}, "e": "usunięte"}
+    target = {"a": 1, "b": {"c": [1, 2, 3]}, "f": {"g": True}}
+    assert merge_diff(source, target) == {"b": {"c": [1, 2, 3], "d": None}, "e": None, "f": {"g": True}}
+    assert merge_patch(source, merge_diff(source, target)) == target
+    # A null value cannot be set by a merge patch
+    assert merge_patch(source, merge_diff(source, {"a": None})) != {"a": None}
+
+
+def test_versions_are_rebuilt_from_snapshots_and_diffs(client, Session, project, draft_buffer):
+    for i in range(1, 9):
+        save(client, draft_buffer, version_data(i))
+
+    # A snapshot every 3 versions; those before the last 2 snapshots are dropped
+    assert versions(client) == [(8, False), (7, True), (6, False), (5, False), (4, True)]
+    with Session() as db:
+        draft_id = db.query(ProjectDraft.id).scalar()
+        for i in range(4, 9):
+            assert DraftHistory.get_version(db, draft_id, i) == version_data(i)
+        assert DraftHistory.get_version(db, draft_id, 3) is None
+        assert DraftHistory.get_version(db, draft_id, 9) is None
+        diff = db.query(DraftVersion.data).filter(DraftVersion.version == 8).scalar()
+        assert diff == {"company": {"employees": 80}, "processes": version_data(8)["processes"]}
+
+
+def test_null_values_are_kept_as_snapshots(client, Session, project, draft_buffer):
+    save(client, draft_buffer, {"notes": "pierwsza", "owner": "Anna"})
+    save(client, draft_buffer, {"notes": "druga"})
+    save(client, draft_buffer, {"notes": "druga", "owner": None})
+    assert versions(client) == [(3, True), (2, False), (1, True)]
+    with Session() as db:
+        draft_id = db.query(ProjectDraft.id).scalar()
+        assert DraftHistory.get_version(db, draft_id, 2) == {"notes": "druga"}
+        assert DraftHistory.get_version(db, draft_id, 3) == {"notes": "druga", "owner": None}
+
+
+def test_restore_saves_a_new_version(client, Session, project, draft_buffer):
+    for i in range(1, 4):
+        save(client, draft_buffer, version_data(i))
+
+    response = client.post("/api/projects/1/drafts/restore", params={"step": "step1", "version": 2})
+    assert response.status_code == 200, response.text
+    assert (response.json()["version"], response.json()["draft_data"]) == (4, version_data(2))
+    loaded = client.get("/api/projects/1/drafts/load", params={"step": "step1"}).json()
+    assert (loaded["version"], loaded["draft_data"]) == (4, version_data(2))
+    assert versions(client)[0] == (4, True)
+
+    response = client.post("/api/projects/1/drafts/restore", params={"step": "step1", "version": 9})
+    assert response.status_code == 404
+    assert client.get("/api/projects/2/drafts/versions", params={"step": "step1"}).status_code == 404
+
+
+def test_history_out_of_step_with_the_draft_restarts(Session, project):
+    with Session() as db:
+        draft = ProjectDraft(project_id=1, step="step1", draft_data={}, version=0)
+        db.add(draft)
+        db.flush()
+        previous = None
+        for i in range(1, 4):
+            draft.draft_data, draft.version = version_data(i), i
+            DraftHistory.record(db, draft, previous)
+            db.commit()  # One version per write, as DraftBuffer.flush records them
+            previous = draft.draft_data
+
+        # The draft's versions start over, e.g. after it was written from an older buffer
+        draft.draft_data, draft.version = {"notes": "od nowa"}, 2
+        DraftHistory.record(db, draft, previous)
+        db.commit()
+        assert [(v["version"], v["is_snapshot"]) for v in DraftHistory.list_versions(db, draft.id)] == [(2, True), (1, True)]
+        assert DraftHistory.get_version(db, draft.id, 2) == {"notes": "od nowa"}
+        assert DraftHistory.get_version(db, draft.id, 1) == version_data(1)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Test what the document parsers extract from each supported format."""
+
+import io
+import zipfile
+from datetime import date
+
+import openpyxl
+import pytest
+
+from app.utils.file_parsers import CSVParser, DocxParser, ExcelParser, PDFParser
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+
+
+def make_docx(body: str) -> bytes:
+    styles = (f'<w:styles xmlns:w="{W_NS}"><w:style w:type="paragraph" w:styleId="Nagwek1">'
+              f'<w:name w:val="heading 1"/></w:style></w:styles>')
+    document = f'<w:document xmlns:w="{W_NS}" xmlns:mc="{MC_NS}"><w:body>{body}</w:body></w:document>'
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", document)
+        archive.writestr("word/styles.xml", styles)
+    return out.getvalue()
+
+
+def paragraph(text: str, properties: str = "") -> str:
+    return f"<w:p>{properties}<w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def test_docx_headings_tables_and_text_boxes(monkeypatch):
+    text_box = paragraph("Pole tekstowe")
+    docx = make_docx(
+        paragraph("Obieg faktur", '<w:pPr><w:pStyle w:val="Nagwek1"/></w:pPr>')
+        + '<w:p><w:r><w:t>Krok 1</w:t><w:tab/><w:t>skan &amp; OCR</w:t></w:r>'
+        f'<w:r><mc:AlternateContent><mc:Choice><w:txbxContent>{text_box}</w:txbxContent></mc:Choice>'
+        f'<mc:Fallback><w:txbxContent>{text_box}</w:txbxContent></mc:Fallback></mc:AlternateContent></w:r></w:p>'
+        + paragraph("Akceptacja", '<w:pPr><w:outlineLvl w:val="1"/></w:pPr>')
+        + "<w:tbl><w:tr>"
+        + f"<w:tc>{paragraph('Etap')}{paragraph('pierwszy')}</w:tc>"
+        + f"<w:tc><w:tbl><w:tr><w:tc>{paragraph('zagnieżdżona')}</w:tc></w:tr></w:tbl></w:tc>"
+        + "</w:tr></w:tbl>"
+    )
+
+    # Feed the XML a few bytes at a time, splitting every tag
+    monkeypatch.setattr(DocxParser, "CHUNK_BYTES", 7)
+    result = DocxParser.parse(docx, "procedura.docx")
+
+    assert result["content"] == (
+        "# Obieg faktur\nKrok 1\tskan & OCR Pole tekstowe\n## Akceptacja\nEtap pierwszy | zagnieżdżona"
+    )
+    assert result["sections"] == [
+        {"title": "Obieg faktur", "content": "Krok 1\tskan & OCR Pole tekstowe"},
+        {"title": "Akceptacja", "content": "Etap pierwszy | zagnieżdżona"},
+    ]
+    assert (result["paragraphs"], result["tables"]) == (3, 1)
+
+
+def make_xlsx(sheets) -> bytes:
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for title, rows in sheets.items():
+        sheet = workbook.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
+    out = io.BytesIO()
+    workbook.save(out)
+    return out.getvalue()
+
+
+def test_excel_sheets_headers_and_ragged_rows():
+    xlsx = make_xlsx({
+        "Procesy": [
+            ["Proces", "Dział", None, "Dział"],
+            [None, None, None, None],
+            ["Fakturowanie", "Księgowość", 12, "FK"],
+            ["Rekrutacja", "HR", 4.5, "HR", "uwaga"],
+            ["Zamknięcie", date(2024, 1, 31)],
+        ],
+        "Pusty": [],
+    })
+    result = ExcelParser.parse(xlsx, "procesy.xlsx")
+
+    assert list(result["sheets"]) == ["Procesy", "Pusty"]
+    sheet = result["sheets"]["Procesy"]
+    assert sheet["rows"] == 4  # Empty rows are skipped
+    assert sheet["columns"] == ["Proces", "Dział", "Unnamed: 2", "Dział.1", "Unnamed: 4"]
+    # Rows are read as wide as the widest one
+    assert sheet["data"][1] == ["Fakturowanie", "Księgowość", "12", "FK", ""]
+    assert sheet["dataframe"] == [
+        {"Proces": "Fakturowanie", "Dział": "Księgowość", "Unnamed: 2": 12, "Dział.1": "FK", "Unnamed: 4": None},
+        {"Proces": "Rekrutacja", "Dział": "HR", "Unnamed: 2": 4.5, "Dział.1": "HR", "Unnamed: 4": "uwaga"},
+        {"Proces": "Zamknięcie", "Dział": "2024-01-31T00:00:00", "Unnamed: 2": None,
+         "Dział.1": None, "Unnamed: 4": None},
+    ]
+    assert sheet["column_profiles"]["Unnamed: 4"]["nulls"] == 2
+    assert not sheet["truncated"]
+    assert result["sheets"]["Pusty"]["rows"] == 0
+
+
+def test_excel_profiles_cover_rows_past_the_kept_ones(monkeypatch):
+    monkeypatch.setattr(ExcelParser, "MAX_ROWS", 5)
+    monkeypatch.setattr(ExcelParser, "CHUNK_ROWS", 3)
+    xlsx = make_xlsx({"Czas": [["Proces", "Godziny"]] + [[f"P{i}", i % 7] for i in range(20)]})
+    sheet = ExcelParser.parse(xlsx, "czas.xlsx")["sheets"]["Czas"]
+
+    assert sheet["rows"] == 21
+    assert len(sheet["data"]) == 5 and len(sheet["dataframe"]) == 4
+    assert sheet["truncated"]
+    hours = sheet["column_profiles"]["Godziny"]
+    assert (hours["dtype"], hours["count"], hours["sum"], hours["max"]) == ("number", 20, 57, 6)
+
+
+def make_pdf(pages) -> bytes:
+    """A PDF with one line of Helvetica text per page, empty pages for empty strings."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def test_pdf_pages_and_blank_pages():
+    result = PDFParser.parse(make_pdf(["Obieg faktur", "", "Akceptacja"]), "procedura.pdf")
+
+    assert (result["pages"], result["pages_extracted"], result["truncated"]) == (3, 3, False)
+    assert result["content"] == [{"page": 1, "text": "Obieg faktur"}, {"page": 3, "text": "Akceptacja"}]
+    assert result["full_text"] == "Obieg faktur\n\nAkceptacja"
+
+
+def test_pdf_extraction_stops_at_the_text_budget():
+    pdf = make_pdf([f"Strona {page} procedury" for page in range(1, 11)])
+    result = PDFParser.parse(pdf, "procedura.pdf", max_chars=40)
+
+    # Each page has 18 characters; the third meets the budget
+    assert (result["pages"], result["pages_extracted"], result["truncated"]) == (10, 3, True)
+    assert [page["page"] for page in result["content"]] == [1, 2, 3]
+
+
+def test_csv_polish_excel_export_in_chunks(monkeypatch):
+    monkeypatch.setattr(CSVParser, "CHUNK_ROWS", 4)
+    monkeypatch.setattr(CSVParser, "SAMPLE_ROWS", 5)
+    rows = "".join(f"P{i};{'Kadry' if i % 2 else 'Księgowość'};{i},5\n" for i in range(10))
+    result = CSVParser.parse(f"Proces;Dział;Koszt\n{rows}".encode("cp1250"), "koszty.csv")
+
+    assert (result["encoding"], result["delimiter"], result["rows"]) == ("cp1250", ";", 10)
+    assert result["columns"] == ["Proces", "Dział", "Koszt"]
+    # Evenly spaced over the whole file, not its first rows
+    assert [row["Proces"] for row in result["data"]] == ["P0", "P2", "P4", "P6", "P8"]
+    assert result["sampled"]
+    cost = result["column_profiles"]["Koszt"]
+    assert (cost["dtype"], cost["count"], cost["min"], cost["max"], cost["sum"]) == ("number", 10, 0.5, 9.5, 50)
+    assert result["column_profiles"]["Dział"]["top_values"][0] == {"value": "Księgowość", "count": 5}
+
+
+def test_csv_comma_separated_with_quotes():
+    result = CSVParser.parse(b'Proces,Opis\nP1,"Skan, OCR"\nP2, Akceptacja\n', "opis.csv")
+
+    assert (result["encoding"], result["delimiter"], result["rows"]) == ("utf-8", ",", 2)
+    assert result["data"] == [{"Proces": "P1", "Opis": "Skan, OCR"}, {"Proces": "P2", "Opis": "Akceptacja"}]
+    assert not result["sampled"]
+
+
+def test_csv_empty_file_is_rejected():
+    with pytest.raises(ValueError, match="file is empty"):
+        CSVParser.parse(b"", "pusty.csv")
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Test that databases created before migrations are upgraded to the models' schema."""
+
+import json
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.database import MIGRATIONS_CONFIG, create_db_engine, migrate_db
+from app.models import (
+    Finding, PortfolioMetrics, Project, ProjectDraft, ProjectMetrics, Step1Data, UploadedDocument
+)
+from app.models.draft import DraftVersion
+
+# What init_db() created with create_all() before there were migrations
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL,
+    email VARCHAR NOT NULL,
+    password_hash VARCHAR NOT NULL,
+    name VARCHAR NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE INDEX ix_users_id ON users (id);
+CREATE TABLE projects (
+    id INTEGER NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    client_name VARCHAR(100) NOT NULL,
+    status VARCHAR(9),
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    CONSTRAINT check_name_length CHECK (length(name) >= 3),
+    CONSTRAINT check_client_name_length CHECK (length(client_name) >= 3)
+);
+CREATE INDEX ix_projects_client_name ON projects (client_name);
+CREATE INDEX ix_projects_id ON projects (id);
+CREATE INDEX idx_project_name_client ON projects (name, client_name);
+CREATE INDEX ix_projects_updated_at ON projects (updated_at);
+CREATE INDEX idx_project_status_updated ON projects (status, updated_at);
+CREATE INDEX ix_projects_name ON projects (name);
+CREATE INDEX ix_projects_status ON projects (status);
+CREATE INDEX ix_projects_created_at ON projects (created_at);
+CREATE TABLE step1_data (
+    id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    organization_data JSON,
+    questionnaire_answers JSON,
+    processes_list JSON,
+    analysis_results JSON,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_step1_project_id UNIQUE (project_id),
+    UNIQUE (project_id),
+    FOREIGN KEY(project_id) REFERENCES projects (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_step1_data_updated_at ON step1_data (updated_at);
+CREATE INDEX ix_step1_data_created_at ON step1_data (created_at);
+CREATE INDEX idx_step1_project_updated ON step1_data (project_id, updated_at);
+CREATE INDEX ix_step1_data_id ON step1_data (id);
+CREATE TABLE step2_processes (
+    id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    process_name VARCHAR(200) NOT NULL,
+    process_data JSON,
+    analysis_results JSON,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    CONSTRAINT check_process_name_length CHECK (length(process_name) >= 3),
+    FOREIGN KEY(project_id) REFERENCES projects (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_step2_processes_created_at ON step2_processes (created_at);
+CREATE INDEX ix_step2_processes_project_id ON step2_processes (project_id);
+CREATE INDEX ix_step2_processes_updated_at ON step2_processes (updated_at);
+CREATE INDEX ix_step2_processes_process_name ON step2_processes (process_name);
+CREATE INDEX idx_step2_project_name ON step2_processes (project_id, process_name);
+CREATE INDEX ix_step2_processes_id ON step2_processes (id);
+CREATE INDEX idx_step2_project_updated ON step2_processes (project_id, updated_at);
+CREATE TABLE step3_data (
+    id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    budget_preferences JSON,
+    tech_preferences JSON,
+    analysis_results JSON,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(project_id) REFERENCES projects (id)
+);
+CREATE INDEX ix_step3_data_id ON step3_data (id);
+CREATE TABLE step4_outputs (
+    id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    output_type VARCHAR NOT NULL,
+    gamma_url VARCHAR,
+    file_path VARCHAR,
+    settings JSON,
+    created_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(project_id) REFERENCES projects (id)
+);
+CREATE INDEX ix_step4_outputs_id ON step4_outputs (id);
+CREATE TABLE project_drafts (
+    id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    step VARCHAR NOT NULL,
+    draft_data JSON NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(project_id) REFERENCES projects (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_project_drafts_project_id ON project_drafts (project_id);
+CREATE INDEX ix_project_drafts_created_at ON project_drafts (created_at);
+CREATE INDEX ix_project_drafts_step ON project_drafts (step);
+CREATE INDEX ix_project_drafts_id ON project_drafts (id);
+CREATE TABLE uploaded_documents (
+    id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    filename VARCHAR NOT NULL,
+    file_path VARCHAR NOT NULL,
+    file_type VARCHAR NOT NULL,
+    file_size BIGINT NOT NULL,
+    uploaded_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(project_id) REFERENCES projects (id)
+);
+CREATE INDEX ix_uploaded_documents_id ON uploaded_documents (id);
+CREATE TABLE document_processing_results (
+    id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    extracted_data JSON,
+    confidence_scores JSON,
+    missing_fields JSON,
+    processing_summary JSON,
+    tokens_used INTEGER,
+    processing_time_seconds INTEGER,
+    created_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(project_id) REFERENCES projects (id)
+);
+CREATE INDEX ix_document_processing_results_id ON document_processing_results (id);
+"""
+
+ANALYSIS = {
+    "key_findings": ["Faktury są przepisywane ręcznie do systemu ERP"],
+    "digital_maturity": {"overall_score": 42},
+    "summary": "ż" * 500
+}
+
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA.split(";"):
+            if statement.strip():
+                connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(
+            "INSERT INTO projects (id, name, client_name, status, created_at, updated_at) "
+            "VALUES (1, 'Audyt', 'Klient SA', 'step1', '2024-05-01 10:00:00', '2024-05-01 10:00:00')"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO step1_data (project_id, analysis_results) VALUES (1, ?)", (json.dumps(ANALYSIS),)
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO uploaded_documents (project_id, filename, file_path, file_type, file_size) "
+            "VALUES (1, 'faktury.csv', 'uploads/1/faktury.csv', 'csv', 120)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO project_drafts (project_id, step, draft_data, updated_at) "
+            "VALUES (1, 'step1', '{\"name\": \"Audyt\"}', '2024-05-01 10:00:00')"
+        )
+    yield engine
+    engine.dispose()
+
+
+def _schema(engine):
+    inspector = inspect(engine)
+    return {
+        table: (
+            [(column["name"], str(column["type"]), column["nullable"]) for column in inspector.get_columns(table)],
+            sorted((index["name"], tuple(index["column_names"]), bool(index["unique"]))
+                   for index in inspector.get_indexes(table))
+        )
+        for table in inspector.get_table_names() if table != "alembic_version"
+    }
+
+
+def test_initial_migration_is_baseline(baseline_engine, tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    migrate_db(engine, "0001")
+    try:
+        assert _schema(engine) == _schema(baseline_engine)
+    finally:
+        engine.dispose()
+
+
+def test_baseline_database_upgrades_to_head(baseline_engine):
+    migrate_db(baseline_engine)
+
+    config = Config(str(MIGRATIONS_CONFIG))
+    with baseline_engine.connect() as connection:
+        config.attributes["connection"] = connection
+        command.check(config)  # Raises if the models differ from the migrated schema
+
+    with Session(baseline_engine) as db:
+        assert db.get(Project, 1).client_name == "Klient SA"
+        assert db.query(Step1Data).one().analysis_results == ANALYSIS
+        assert db.query(UploadedDocument).one().content_hash is None  # Hashed on next analysis
+        draft = db.query(ProjectDraft).one()
+        assert (draft.draft_data, draft.version) == ({"name": "Audyt"}, 0)
+        assert [(v.version, v.is_snapshot, v.data) for v in db.query(DraftVersion)] == [(0, True, {"name": "Audyt"})]
+        assert db.query(Finding).filter(Finding.field == "key_findings").count() == 1
+        assert db.get(ProjectMetrics, 1).maturity_score == 42
+        portfolio = db.query(PortfolioMetrics).one()
+        assert (portfolio.project_count, portfolio.maturity_score_total) == (1, 42)
+
+    migrate_db(baseline_engine)  # Nothing left to run
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Test that the parser pool isolates slow and large files to their own worker."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.utils.file_parsers import PDFParser, open_mapped
+from app.utils.parse_pool import ParserPool, ParseTimeoutError
+from test_file_parsers import make_pdf
+
+
+# Tasks run in the worker processes; like the parser tasks, they take the stored file first
+def _sleep(file_path: str, seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def _read_every_mb(file_path: str) -> int:
+    with open_mapped(file_path) as content:
+        return sum(content[i] for i in range(0, len(content), 1 << 20))
+
+
+@pytest.fixture
+def pool():
+    pool = ParserPool(workers=2, timeout_seconds=2, memory_limit_mb=256)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def test_timeout_kills_only_its_worker(pool, tmp_path):
+    path = tmp_path / "upload.bin"
+    path.write_bytes(b"x")
+
+    async def run():
+        return await asyncio.gather(
+            pool._run(_sleep, (str(path), 30), "slow.pdf"),
+            pool._run(_sleep, (str(path), 1), "other.pdf"),
+            return_exceptions=True
+        )
+
+    started = time.monotonic()
+    slow, other = asyncio.run(run())
+    assert isinstance(slow, ParseTimeoutError)
+    assert other == 1  # Not failed with the slow file's worker
+    assert time.monotonic() - started < 10
+    assert asyncio.run(pool._run(_sleep, (str(path), 0), "next.pdf")) == 0
+
+
+def test_mapped_file_does_not_count_against_memory_limit(pool, tmp_path):
+    path = tmp_path / "large.bin"
+    with open(path, "wb") as f:
+        f.truncate(512 * 1024 * 1024)  # Sparse, twice the memory limit
+
+    assert asyncio.run(pool._run(_read_every_mb, (str(path),), "large.xlsx")) == 0
+
+
+def test_pdf_pages_are_extracted_in_parallel_until_the_budget(pool, tmp_path, monkeypatch):
+    monkeypatch.setattr(PDFParser, "MAX_CHARS", 40)
+    monkeypatch.setattr(ParserPool, "PDF_PAGES_PER_TASK", 2)
+    path = tmp_path / "procedura.pdf"
+    path.write_bytes(make_pdf([f"Strona {page} procedury" for page in range(1, 21)]))
+
+    result = asyncio.run(pool.parse(str(path), "procedura.pdf"))
+    assert result == PDFParser.parse(path.read_bytes(), "procedura.pdf")
+    assert (result["pages"], result["pages_extracted"]) == (20, 3)
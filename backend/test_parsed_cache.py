@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Test that parsed documents are cached by content hash and parser version."""
+
+import hashlib
+
+import pytest
+
+from app.utils import parsed_cache
+from app.utils.parsed_cache import compute_file_hash, discard_parsed, load_parsed, store_parsed
+
+CONTENT_HASH = hashlib.sha256(b"faktury").hexdigest()
+PARSED = {"filename": "faktury.txt", "type": "text", "content": "Obieg faktur – 12 dziennie"}
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(parsed_cache, "PARSED_CACHE_DIR", tmp_path / ".parsed")
+    return tmp_path / ".parsed"
+
+
+def test_hit_takes_the_uploaded_filename():
+    assert load_parsed(CONTENT_HASH, "faktury.txt") is None
+    store_parsed(CONTENT_HASH, PARSED)
+    assert load_parsed(CONTENT_HASH, "kopia.txt") == {**PARSED, "filename": "kopia.txt"}
+    assert load_parsed(None, "faktury.txt") is None
+
+
+def test_new_parser_version_misses_and_replaces_old_entries(cache_dir, monkeypatch):
+    store_parsed(CONTENT_HASH, PARSED)
+    monkeypatch.setattr(parsed_cache, "PARSER_VERSION", parsed_cache.PARSER_VERSION + 1)
+    assert load_parsed(CONTENT_HASH, "faktury.txt") is None
+
+    reparsed = {**PARSED, "content": "Obieg faktur"}
+    store_parsed(CONTENT_HASH, reparsed)
+    assert load_parsed(CONTENT_HASH, "faktury.txt") == reparsed
+    assert [path.name for path in cache_dir.iterdir()] == [
+        f"{CONTENT_HASH}.v{parsed_cache.PARSER_VERSION}.json.gz"
+    ]
+
+
+def test_unreadable_entry_is_discarded(cache_dir):
+    store_parsed(CONTENT_HASH, PARSED)
+    (entry,) = cache_dir.iterdir()
+    entry.write_bytes(b"not gzip")
+    assert load_parsed(CONTENT_HASH, "faktury.txt") is None
+    assert not entry.exists()
+
+
+def test_discard_removes_every_version(cache_dir):
+    store_parsed(CONTENT_HASH, PARSED)
+    (cache_dir / f"{CONTENT_HASH}.v0.json.gz").write_bytes(b"")
+    other = hashlib.sha256(b"inne").hexdigest()
+    store_parsed(other, PARSED)
+
+    discard_parsed(CONTENT_HASH)
+    assert [path.name for path in cache_dir.iterdir()] == [
+        f"{other}.v{parsed_cache.PARSER_VERSION}.json.gz"
+    ]
+
+
+def test_file_hash_is_read_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(parsed_cache, "HASH_CHUNK_BYTES", 3)
+    path = tmp_path / "faktury.txt"
+    path.write_bytes(b"faktury")
+    assert compute_file_hash(str(path)) == CONTENT_HASH
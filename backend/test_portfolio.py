@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Test that portfolio totals follow each project's step results by deltas."""
+
+from app.models import PortfolioMetrics, Project, Step1Data, Step2Process, Step3Data
+from app.services.portfolio_service import PortfolioService, project_metrics
+
+TOTALS = ["project_count", "process_count", "analyzed_process_count", "total_current_cost",
+          "total_waste_cost", "total_savings_potential", "roi_potential", "average_maturity_score"]
+
+
+def totals(db):
+    summary = PortfolioService.get_summary(db)
+    return {key: summary[key] for key in TOTALS}
+
+
+def rebuilt(db):
+    """Totals recomputed from scratch, which the deltas must match."""
+    PortfolioService.rebuild(db)
+    return totals(db)
+
+
+def add_project(db, id: int, maturity=None, costs=(), scenarios=None):
+    db.add(Project(id=id, name=f"Audyt {id}", client_name="Klient SA"))
+    db.add(Step1Data(project_id=id, analysis_results={"digital_maturity": {"overall_score": maturity}}))
+    db.add_all(
+        Step2Process(project_id=id, process_name=f"Proces {i}",
+                     analysis_results={"process_costs": {"total_cost": cost}, "muda_analysis": {"total_waste_cost": cost / 4}}
+                     if cost is not None else None)
+        for i, cost in enumerate(costs)
+    )
+    if scenarios is not None:
+        db.add(Step3Data(project_id=id, analysis_results={"scenarios": scenarios}))
+    PortfolioService.refresh_project(db, id)
+    db.commit()
+
+
+def test_project_metrics_ignore_malformed_output():
+    assert project_metrics(
+        {"digital_maturity": {"overall_score": "wysoka"}},
+        [{"process_costs": {"total_cost": True}}, {}, None, {"process_costs": {"total_cost": 100}}],
+        {"process_scenarios": [
+            {"scenarios": {"scenarios": [{"benefits_year1": {"total": 30}}, {"benefits_year1": {"total": 50}}]}},
+            "brak", {"scenarios": None}
+        ]}
+    ) == {"process_count": 4, "analyzed_process_count": 2, "current_cost": 100, "waste_cost": 0,
+          "savings_potential": 50, "maturity_score": None}
+
+
+def test_totals_follow_changes_to_step_results(Session):
+    with Session() as db:
+        add_project(db, 1, maturity=40, costs=[1000, 500, None],
+                    scenarios=[{"benefits_year1": {"total": 300}}, {"benefits_year1": {"total": 450}}])
+        add_project(db, 2, maturity=60, costs=[250])
+        assert totals(db) == {
+            "project_count": 2, "process_count": 4, "analyzed_process_count": 3, "total_current_cost": 1750,
+            "total_waste_cost": 437.5, "total_savings_potential": 450, "roi_potential": 25.71,
+            "average_maturity_score": 50
+        }
+
+        # Re-analysing a process replaces its numbers instead of adding them again
+        process = db.query(Step2Process).filter(Step2Process.project_id == 2).one()
+        process.analysis_results = {"process_costs": {"total_cost": 750}}
+        db.query(Step1Data).filter(Step1Data.project_id == 2).one().analysis_results = {}
+        PortfolioService.refresh_project(db, 2)
+        db.commit()
+        assert totals(db)["total_current_cost"] == 2250
+        assert totals(db)["average_maturity_score"] == 40
+        assert totals(db) == rebuilt(db)
+
+        PortfolioService.refresh_project(db, 2)  # Unchanged: no delta
+        db.commit()
+        assert totals(db) == rebuilt(db)
+
+
+def test_deleted_projects_leave_the_totals(client, Session):
+    for name in ("Audyt pierwszy", "Audyt drugi"):
+        assert client.post("/api/projects/", json={"name": name, "client_name": "Klient SA"}).status_code == 200
+    with Session() as db:
+        add_project(db, 3, maturity=80, costs=[100])
+
+    assert client.get("/api/portfolio/").json()["project_count"] == 3
+    assert client.delete("/api/projects/3").status_code == 200
+    summary = client.get("/api/portfolio/").json()
+    assert (summary["project_count"], summary["process_count"], summary["average_maturity_score"]) == (2, 0, None)
+    with Session() as db:
+        assert totals(db) == rebuilt(db)
+
+
+def test_missing_totals_row_is_rebuilt(Session):
+    with Session() as db:
+        add_project(db, 1, maturity=40, costs=[1000])
+        db.query(PortfolioMetrics).delete()
+        db.commit()
+        assert totals(db)["project_count"] == 0
+
+        add_project(db, 2, costs=[500])
+        assert totals(db)["project_count"] == 2
+        assert totals(db)["total_current_cost"] == 1500
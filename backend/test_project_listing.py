@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Test that project listings page by keyset without repeating or skipping projects."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Project
+from app.models.project import ProjectStatus
+
+NOW = datetime(2024, 5, 1, 12, 0)
+# (name, client, status, minutes before NOW it was updated); three share a timestamp
+PROJECTS = [
+    ("Audyt A", "Klient SA", ProjectStatus.step1, 0),
+    ("Audyt B", "Klient SA", ProjectStatus.step2, 5),
+    ("Audyt C", "Inny klient", ProjectStatus.step2, 5),
+    ("Audyt D", "Klient SA", ProjectStatus.step2, 5),
+    ("Audyt E", "Inny klient", ProjectStatus.step1, 10),
+    ("Audyt F", "Klient SA", ProjectStatus.step3, 20),
+    ("Audyt G", "Klient SA", ProjectStatus.step2, 30),
+]
+
+
+@pytest.fixture
+def projects(Session):
+    with Session() as db:
+        db.add_all(
+            Project(id=id, name=name, client_name=client, status=project_status,
+                    created_at=NOW - timedelta(days=id), updated_at=NOW - timedelta(minutes=minutes))
+            for id, (name, client, project_status, minutes) in enumerate(PROJECTS, 1)
+        )
+        db.commit()
+
+
+def read_pages(client, limit: int, **params):
+    pages = []
+    cursor = None
+    while True:
+        response = client.get("/api/projects/", params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        pages.append([project["name"] for project in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_ties_on_updated_at_are_broken_by_id(client, projects):
+    # Newest first; among equal timestamps the highest id first
+    assert read_pages(client, 2) == [["Audyt A", "Audyt D"], ["Audyt C", "Audyt B"], ["Audyt E", "Audyt F"], ["Audyt G"]]
+    assert read_pages(client, 2, sort_order="asc") == [["Audyt G", "Audyt F"], ["Audyt E", "Audyt B"], ["Audyt C", "Audyt D"], ["Audyt A"]]
+
+
+def test_filters_apply_on_every_page(client, projects):
+    assert read_pages(client, 1, client_name="Klient SA", status="step2") == [["Audyt D"], ["Audyt B"], ["Audyt G"]]
+    assert read_pages(client, 5, status="step1") == [["Audyt A", "Audyt E"]]
+    assert read_pages(client, 5, client_name="Nieznany") == [[]]
+
+
+@pytest.mark.parametrize("sort_by", ["id", "name", "client_name", "status", "created_at"])
+def test_every_sort_field_pages_through_all_projects(client, projects, sort_by):
+    pages = read_pages(client, 3, sort_by=sort_by, sort_order="asc")
+    names = [name for page in pages for name in page]
+    assert sorted(names) == [name for name, *_ in PROJECTS]
+    assert names == [project["name"] for project in client.get(
+        "/api/projects/", params={"sort_by": sort_by, "sort_order": "asc"}
+    ).json()]
+
+
+def test_exact_page_has_no_cursor(client, projects):
+    response = client.get("/api/projects/", params={"limit": len(PROJECTS)})
+    assert len(response.json()) == len(PROJECTS)
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_invalid_cursors_are_rejected(client, projects):
+    cursor = client.get("/api/projects/", params={"limit": 2}).headers["X-Next-Cursor"]
+    response = client.get("/api/projects/", params={"limit": 2, "cursor": cursor, "sort_by": "name"})
+    assert response.status_code == 400
+    assert client.get("/api/projects/", params={"cursor": "nie-kursor"}).status_code == 400
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Test that migrations build the models' schema and hot queries use its indexes."""
+
+from datetime import datetime
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import select
+
+from app.database import MIGRATIONS_CONFIG, create_db_engine, migrate_db
+from app.models import (
+    DocumentChunk, DocumentProcessingResult, Project, ProjectDraft, Step1Data, Step2Process,
+    Step3Data, Step4Output, UploadSession, UploadedDocument
+)
+
+# (query, index it must search); the queries are those of the endpoints
+# named, None accepts any index
+HOT_QUERIES = {
+    "documents list": (
+        select(UploadedDocument).where(UploadedDocument.project_id == 1),
+        "ix_uploaded_documents_project_id"
+    ),
+    "latest analysis": (
+        select(DocumentProcessingResult).where(DocumentProcessingResult.project_id == 1)
+        .order_by(DocumentProcessingResult.created_at.desc()).limit(1),
+        "idx_processing_result_project_created"
+    ),
+    "step 1 data": (select(Step1Data).where(Step1Data.project_id == 1), None),
+    "step 2 processes": (select(Step2Process).where(Step2Process.project_id == 1), None),
+    "step 3 data": (select(Step3Data).where(Step3Data.project_id == 1), "ix_step3_data_project_id"),
+    "step 4 outputs": (select(Step4Output).where(Step4Output.project_id == 1), "ix_step4_outputs_project_id"),
+    "open upload sessions": (
+        select(UploadSession).where(UploadSession.project_id == 1), "ix_upload_sessions_project_id"
+    ),
+    "expired upload sessions": (
+        select(UploadSession).where(UploadSession.updated_at < datetime(2024, 1, 1)),
+        "ix_upload_sessions_updated_at"
+    ),
+    "draft": (
+        select(ProjectDraft).where(ProjectDraft.project_id == 1, ProjectDraft.step == "step1"),
+        "idx_draft_project_step"
+    ),
+    "projects by client": (
+        select(Project.id).where(Project.client_name == "Klient SA")
+        .order_by(Project.updated_at.desc(), Project.id.desc()).limit(50),
+        "idx_project_client_updated"
+    ),
+    "projects by status": (
+        select(Project.id).where(Project.status == "step2")
+        .order_by(Project.updated_at.desc(), Project.id.desc()).limit(50),
+        "idx_project_status_updated"
+    ),
+    "document passages": (
+        select(DocumentChunk.id).where(DocumentChunk.project_id == 1), "ix_document_chunks_project_id"
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = create_db_engine(f"sqlite:///{tmp_path_factory.mktemp('db') / 'plans.db'}")
+    migrate_db(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_migrations_match_models(engine):
+    config = Config(str(MIGRATIONS_CONFIG))
+    with engine.connect() as connection:
+        config.attributes["connection"] = connection
+        command.check(config)  # Raises if the models differ from the migrated schema
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index(engine, name):
+    query, index = HOT_QUERIES[name]
+    sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as connection:
+        plan = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+    assert plan[0].startswith("SEARCH"), plan
+    assert f"INDEX {index} " in plan[0] if index else "INDEX" in plan[0], plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan  # Sorted by the index
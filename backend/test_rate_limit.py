@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Test the GCRA rate limiter's allowance, Retry-After and idle-key eviction."""
+
+import pytest
+
+from app.middleware.rate_limit import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    return RateLimiter(cleanup_interval=60.0, clock=clock)
+
+
+def test_burst_then_sustained_rate(limiter, clock):
+    # 5 requests per 10 s: a burst of 5, then one every 2 s
+    assert all(limiter.check("ip", 5, 10)[0] for _ in range(5))
+    assert limiter.check("ip", 5, 10) == (False, 2)
+
+    clock.now += 1.5
+    assert limiter.check("ip", 5, 10) == (False, 1)  # 0.5 s left, rounded up
+    clock.now += 0.5
+    assert limiter.check("ip", 5, 10) == (True, 0)
+    assert limiter.check("ip", 5, 10)[0] is False
+
+
+def test_rejections_do_not_consume_allowance(limiter, clock):
+    for _ in range(5):
+        limiter.check("ip", 5, 10)
+    for _ in range(20):
+        assert limiter.check("ip", 5, 10)[0] is False
+
+    clock.now += 2
+    assert limiter.check("ip", 5, 10) == (True, 0)
+
+
+def test_keys_are_independent(limiter):
+    for _ in range(5):
+        limiter.check("a", 5, 10)
+    assert limiter.check("a", 5, 10)[0] is False
+    assert limiter.check("b", 5, 10) == (True, 0)
+
+
+def test_cost_counts_as_several_requests(limiter, clock):
+    assert limiter.check("ip", 100, 100, cost=80) == (True, 0)
+    # 80 + 30 is 10 s of allowance over the window
+    assert limiter.check("ip", 100, 100, cost=30) == (False, 10)
+    clock.now += 10
+    assert limiter.check("ip", 100, 100, cost=30) == (True, 0)
+
+
+def test_adjust_refunds_and_charges(limiter, clock):
+    for _ in range(5):
+        limiter.check("ip", 5, 10)
+    limiter.adjust("ip", 5, 10, -2)
+    assert limiter.check("ip", 5, 10)[0] is True
+    assert limiter.check("ip", 5, 10)[0] is True
+    assert limiter.check("ip", 5, 10)[0] is False
+
+    # A refund larger than the backlog leaves a full allowance, not more
+    limiter.adjust("ip", 5, 10, -100)
+    assert sum(limiter.check("ip", 5, 10)[0] for _ in range(10)) == 5
+
+
+def test_retry_after_until_replenished(limiter, clock):
+    assert limiter.get_retry_after("ip", 10) == 0
+    for _ in range(3):
+        limiter.check("ip", 5, 10)
+    assert limiter.get_retry_after("ip", 10) == 6
+    clock.now += 6
+    assert limiter.get_retry_after("ip", 10) == 0
+
+
+def test_idle_keys_are_evicted(limiter, clock):
+    for i in range(100):
+        limiter.check(f"scan-{i}", 5, 10)
+    limiter.check("busy", 1, 600)
+    assert limiter.get_stats() == {"tracked_keys": 101}
+
+    # Swept by the next check after the cleanup interval
+    clock.now += 61
+    limiter.check("other", 5, 10)
+    assert limiter.get_stats() == {"tracked_keys": 2}
+
+    clock.now += 600
+    limiter.cleanup()
+    assert limiter.get_stats() == {"tracked_keys": 0}
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Test that rate limiters sharing a SQLite store enforce one limit between them."""
+
+import sqlite3
+import time
+
+import pytest
+
+from app.middleware.rate_limit import RateLimiter
+from app.middleware.rate_limit_store import SQLiteRateLimitStore
+
+# Long enough that no allowance refills while a test runs on the wall clock
+WINDOW = 3600
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "rate_limits.db")
+
+
+def test_workers_share_the_limit(store_path):
+    workers = [RateLimiter(store=SQLiteRateLimitStore(store_path)) for _ in range(2)]
+
+    assert all(workers[0].check("ip", 5, WINDOW)[0] for _ in range(3))
+    assert all(workers[1].check("ip", 5, WINDOW)[0] for _ in range(2))
+    for worker in workers:
+        allowed, retry_after = worker.check("ip", 5, WINDOW)
+        assert not allowed
+        assert retry_after == pytest.approx(WINDOW / 5, abs=1)
+
+
+def test_refund_is_seen_by_other_workers(store_path):
+    first, second = (RateLimiter(store=SQLiteRateLimitStore(store_path)) for _ in range(2))
+    for _ in range(5):
+        first.check("ip", 5, WINDOW)
+
+    first.adjust("ip", 5, WINDOW, -2)
+    assert second.check("ip", 5, WINDOW)[0]
+    assert second.check("ip", 5, WINDOW)[0]
+    assert not second.check("ip", 5, WINDOW)[0]
+    assert not first.check("ip", 5, WINDOW)[0]
+
+
+def test_state_survives_a_restart(store_path):
+    for _ in range(5):
+        RateLimiter(store=SQLiteRateLimitStore(store_path)).check("ip", 5, WINDOW)
+    assert not RateLimiter(store=SQLiteRateLimitStore(store_path)).check("ip", 5, WINDOW)[0]
+
+
+def test_store_errors_fail_open_to_the_local_limit(store_path, monkeypatch):
+    store = SQLiteRateLimitStore(store_path)
+    limiter = RateLimiter(store=store)
+
+    def unavailable(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "acquire", unavailable)
+    assert sum(limiter.check("ip", 5, WINDOW)[0] for _ in range(10)) == 5
+
+
+def test_cleanup_deletes_replenished_keys(store_path):
+    store = SQLiteRateLimitStore(store_path)
+    store.acquire("idle", 0.001, 1)
+    store.acquire("busy", WINDOW / 5, WINDOW)
+    time.sleep(0.01)
+    store.cleanup()
+
+    with sqlite3.connect(store_path) as conn:
+        assert [key for (key,) in conn.execute("SELECT key FROM rate_limits")] == ["busy"]
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Test the resumable upload lifecycle: chunks, resume, completion, finalisation and expiry."""
+
+import hashlib
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from app.models import DocumentBlob, Project, UploadSession, UploadedDocument
+from app.models.document import get_utc_now
+from app.routers import documents
+
+CONTENT = "Obieg faktur\nFaktury są skanowane, opisywane i akceptowane ręcznie.\n".encode("utf-8")
+UPLOADS = "/api/projects/1/documents/uploads"
+
+
+@pytest.fixture
+def project_id(Session):
+    with Session() as db:
+        db.add(Project(id=1, name="Audyt", client_name="Klient SA"))
+        db.commit()
+    return 1
+
+
+def start(client, filename="procedura.txt", file_size=len(CONTENT)):
+    response = client.post(UPLOADS, json={"filename": filename, "file_size": file_size})
+    assert response.status_code == 200, response.text
+    return response.json()["upload_id"]
+
+
+def put(client, upload_id, offset, data):
+    return client.put(f"{UPLOADS}/{upload_id}", params={"offset": offset}, content=data)
+
+
+def send(client, upload_id, content=CONTENT):
+    response = put(client, upload_id, 0, content)
+    assert response.json()["status"] == "complete", response.text
+
+
+def blob_refs(Session):
+    with Session() as db:
+        return {blob.content_hash: blob.ref_count for blob in db.query(DocumentBlob)}
+
+
+def test_upload_resumes_after_the_bytes_received(client, Session, project_id):
+    upload_id = start(client)
+    assert put(client, upload_id, 0, CONTENT[:20]).json()["received_bytes"] == 20
+
+    # Resumed from the progress the server reports
+    assert client.get(f"{UPLOADS}/{upload_id}").json()["received_bytes"] == 20
+    response = put(client, upload_id, 30, CONTENT[30:])
+    assert response.status_code == 409
+    # A resent earlier chunk does not move progress back
+    assert put(client, upload_id, 10, CONTENT[10:20]).json()["received_bytes"] == 20
+
+    status = put(client, upload_id, 20, CONTENT[20:]).json()
+    assert (status["received_bytes"], status["status"]) == (len(CONTENT), "complete")
+    assert put(client, upload_id, 0, CONTENT).status_code == 409  # Already complete
+
+    content_hash = hashlib.sha256(CONTENT).hexdigest()
+    with Session() as db:
+        session = db.get(UploadSession, upload_id)
+        assert session.content_hash == content_hash
+        assert Path(session.file_path).read_bytes() == CONTENT
+    # The session holds a reference until it is finalised
+    assert blob_refs(Session) == {content_hash: 1}
+
+
+def test_chunk_past_the_declared_size_is_rejected(client, project_id):
+    upload_id = start(client)
+    response = put(client, upload_id, 0, CONTENT + b"x")
+    assert response.status_code == 400
+    assert client.get(f"{UPLOADS}/{upload_id}").json()["received_bytes"] == 0
+
+
+def test_finalize_adds_documents_and_runs_the_analysis(client, Session, project_id, analyzed):
+    first, second = start(client), start(client, "kopia.txt")
+    send(client, first)
+    assert client.post(f"{UPLOADS}/finalize", json={"upload_ids": [first, second]}).status_code == 409
+
+    send(client, second)
+    response = client.post(f"{UPLOADS}/finalize", json={"upload_ids": [second, first]})
+    assert response.status_code == 200, response.text
+    assert [file["filename"] for file in response.json()["files"]] == ["kopia.txt", "procedura.txt"]
+    assert [parsed["content"] for parsed in analyzed[0]] == [CONTENT.decode("utf-8")] * 2
+
+    with Session() as db:
+        assert db.query(UploadSession).count() == 0
+        documents_stored = db.query(UploadedDocument).all()
+        assert len({document.file_path for document in documents_stored}) == 1
+    # Each document took over its upload's reference to the shared file
+    assert blob_refs(Session) == {hashlib.sha256(CONTENT).hexdigest(): 2}
+    assert client.get(f"{UPLOADS}/{first}").status_code == 404
+
+
+def test_cancel_discards_the_bytes_received(client, Session, project_id):
+    partial = start(client)
+    put(client, partial, 0, CONTENT[:20])
+    complete = start(client)
+    send(client, complete)
+
+    for upload_id in (partial, complete):
+        assert client.delete(f"{UPLOADS}/{upload_id}").status_code == 200
+    with Session() as db:
+        assert db.query(UploadSession).count() == 0
+    assert blob_refs(Session) == {}
+    assert [path for path in Path("uploaded_documents/blobs").rglob("*") if path.is_file()] == []
+
+
+def test_abandoned_uploads_expire(client, Session, project_id):
+    upload_id = start(client)
+    send(client, upload_id)
+    with Session() as db:
+        db.get(UploadSession, upload_id).updated_at = get_utc_now() - documents.UPLOAD_SESSION_TTL - timedelta(minutes=1)
+        db.commit()
+
+    start(client, "nowy.txt")
+    with Session() as db:
+        assert [session.filename for session in db.query(UploadSession)] == ["nowy.txt"]
+    assert blob_refs(Session) == {}
+
+
+def test_open_uploads_count_towards_the_document_limit(client, project_id, monkeypatch):
+    monkeypatch.setattr(documents, "MAX_FILES_PER_PROJECT", 2)
+    start(client)
+    start(client)
+    response = client.post(UPLOADS, json={"filename": "trzeci.txt", "file_size": 10})
+    assert response.status_code == 400
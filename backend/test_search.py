@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Test full-text search over the findings and documents of all audits."""
+
+import pytest
+
+from app.models import Finding, Project, Step2Process
+from app.services.search_index import findings_from, match_terms, search_index
+
+STEP1 = {
+    "key_findings": ["Faktury kosztowe są przepisywane ręcznie do systemu księgowego",
+                     "Wnioski urlopowe krążą w papierowym obiegu"],
+    "processes_scoring": [{"process_name": "Obieg faktur", "automation_potential": "wysoki"}],
+    "recommendations": [],
+}
+PROCEDURE = "Obieg faktur\nKsięgowa ręcznie dekretuje każdą fakturę w systemie FK.\n".encode("utf-8")
+
+
+@pytest.fixture
+def projects(Session):
+    with Session() as db:
+        db.add_all([Project(id=1, name="Audyt Alfa", client_name="Alfa SA"),
+                    Project(id=2, name="Audyt Beta", client_name="Beta SA")])
+        db.flush()
+        search_index.index_results(db, 1, "step1", STEP1)
+        db.commit()
+
+
+def search(client, q, **params):
+    response = client.get("/api/search/", params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_findings_of_step_results():
+    assert findings_from("step1", STEP1) == [
+        ("key_findings", None, STEP1["key_findings"][0]),
+        ("key_findings", None, STEP1["key_findings"][1]),
+        ("processes_scoring", "Obieg faktur", "Obieg faktur\nwysoki"),
+    ]
+    assert findings_from("step2", {"bottlenecks": [{"name": "Akceptacja", "impact": ""}]}, "Obieg faktur") == [
+        ("bottlenecks", "Obieg faktur", "Akceptacja")
+    ]
+    assert findings_from("step1", None) == []
+
+
+def test_inflected_and_unaccented_queries_match(client, projects):
+    for query in ("faktura ręczna", "faktury reczne", "FAKTUR recznie"):
+        (hit,) = search(client, query)["results"]
+        assert (hit["project_name"], hit["source"], hit["field"]) == ("Audyt Alfa", "step1", "key_findings")
+        assert "**Faktury**" in hit["snippet"] and "**ręcznie**" in hit["snippet"]
+    # Every word must match
+    assert search(client, "faktury urlopowe")["results"] == []
+    assert match_terms("i w do 2024") == []
+    assert search(client, "i w")["results"] == []
+
+
+def test_documents_are_searched_with_findings(client, projects, analyzed):
+    response = client.post("/api/projects/2/documents/upload", files=[("files", ("procedura.txt", PROCEDURE))])
+    assert response.status_code == 200, response.text
+
+    hits = search(client, "dekretacja faktur")["results"]
+    assert [(hit["project_name"], hit["source"]) for hit in hits] == [("Audyt Beta", "document")]
+    assert hits[0]["title"].startswith("procedura.txt")
+    assert "**dekretuje**" in hits[0]["snippet"]
+    # The upload's analysis was indexed as well
+    sources = {(hit["project_id"], hit["source"]) for hit in search(client, "faktury", limit=100)["results"]}
+    assert sources == {(1, "step1"), (2, "step1"), (2, "document")}
+
+
+def test_pages_follow_the_ranking(client, Session, projects):
+    with Session() as db:
+        db.add_all(Step2Process(id=i, project_id=2, process_name=f"Proces {i}") for i in range(1, 6))
+        db.flush()
+        for process in db.query(Step2Process):
+            search_index.index_results(db, 2, "step2", {"bottlenecks": ["Ręczne przepisywanie faktur " * process.id]}, process)
+        db.commit()
+
+    first = search(client, "faktur", limit=4)
+    second = search(client, "faktur", limit=4, offset=first["next_offset"])
+    assert (first["next_offset"], second["next_offset"]) == (4, None)
+    hits = first["results"] + second["results"]
+    assert len(hits) == 7
+    assert len({hit["id"] for hit in hits}) == 7
+    assert [hit["score"] for hit in hits] == sorted((hit["score"] for hit in hits), reverse=True)
+
+
+def test_replaced_and_deleted_results_leave_the_index(client, Session, projects):
+    with Session() as db:
+        search_index.index_results(db, 1, "step1", {"key_findings": ["Magazyn liczony na papierze"]})
+        db.commit()
+    assert search(client, "faktury")["results"] == []
+    assert len(search(client, "magazyn")["results"]) == 1
+
+    assert client.delete("/api/projects/1").status_code == 200
+    assert search(client, "magazyn")["results"] == []
+    with Session() as db:
+        assert db.query(Finding).count() == 0
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Test encoding detection and chunked decoding of uploaded text."""
+
+import pytest
+
+from app.utils import text_encoding
+from app.utils.file_parsers import parse_file
+from app.utils.text_encoding import count_lines, detect_encoding, iter_decoded
+
+POLISH = "Zażółć gęślą jaźń. Świętokrzyskie – Źródło, Ąę.\n" * 3
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "cp1250", "iso-8859-2", "utf-8-sig", "utf-16"])
+def test_polish_text_encodings(encoding):
+    content = POLISH.encode(encoding) if encoding != "iso-8859-2" else POLISH.replace("–", "-").encode(encoding)
+    assert detect_encoding(content) == encoding
+
+
+def test_ascii_is_utf8():
+    assert detect_encoding(b"Obieg faktur\n") == "utf-8"
+    assert detect_encoding(b"") == "utf-8"
+
+
+def test_polish_text_without_distinguishing_letters_is_cp1250():
+    # ł, ó, ż, ę, ć have the same byte in both codepages
+    assert detect_encoding("łóżko ęć\n".encode("cp1250")) == "cp1250"
+
+
+def test_other_languages_go_to_chardet():
+    assert detect_encoding("Привет мир, как дела? Всё хорошо.\n".encode("koi8-r") * 20) == "KOI8-R"
+
+
+def test_invalid_utf8_after_the_first_chunk(monkeypatch):
+    monkeypatch.setattr(text_encoding, "DECODE_CHUNK_BYTES", 8)
+    content = b"Obieg faktur " * 10 + "źródło".encode("cp1250")
+    assert detect_encoding(content) == "cp1250"
+
+
+def test_chunks_split_multibyte_characters():
+    content = POLISH.encode("utf-8")
+    assert "".join(iter_decoded(content, "utf-8", chunk_bytes=3)) == POLISH
+    assert "".join(iter_decoded(POLISH.encode("utf-16"), "utf-16", chunk_bytes=5)) == POLISH
+
+
+def test_count_lines_matches_split():
+    for encoding in ("utf-8", "cp1250", "utf-16"):
+        assert count_lines(POLISH.encode(encoding), encoding) == len(POLISH.split("\n"))
+
+
+def test_text_upload_is_decoded_with_the_detected_encoding():
+    result = parse_file("# Obieg\nŹródło faktur\n".encode("cp1250"), "procedura.md")
+    assert (result["encoding"], result["lines"]) == ("cp1250", 3)
+    assert result["content"] == "# Obieg\nŹródło faktur\n"
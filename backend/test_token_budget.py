@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Test that AI calls reserve their estimated tokens and settle with the actual usage."""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.middleware import rate_limit
+from app.middleware.rate_limit import RateLimiter, TokenBudget
+from app.services.claude_service import ClaudeService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "rate_limiter", RateLimiter(clock=clock))
+    return clock
+
+
+def test_settle_refunds_unused_estimate(clock):
+    # 1000 tokens per 1000 s
+    budget = TokenBudget("ai_tokens:ip", 1000, 1000)
+    budget.reserve(600)
+    budget.settle(100)
+
+    second = TokenBudget("ai_tokens:ip", 1000, 1000)
+    second.reserve(900)
+    with pytest.raises(HTTPException):
+        second.reserve(1)
+
+
+def test_settle_charges_usage_over_estimate(clock):
+    budget = TokenBudget("ai_tokens:ip", 1000, 1000)
+    budget.reserve(300)
+    budget.settle(800)
+
+    with pytest.raises(HTTPException) as error:
+        TokenBudget("ai_tokens:ip", 1000, 1000).reserve(300)
+    assert error.value.status_code == 429
+    assert error.value.headers == {"Retry-After": "100"}
+    assert error.value.detail["retry_after"] == 100
+
+
+def test_settle_twice_charges_only_the_difference(clock):
+    budget = TokenBudget("ai_tokens:ip", 1000, 1000)
+    budget.reserve(500)
+    budget.settle(400)
+    budget.settle(400)
+    assert budget.reserved == 400
+
+    TokenBudget("ai_tokens:ip", 1000, 1000).reserve(600)
+    with pytest.raises(HTTPException):
+        TokenBudget("ai_tokens:ip", 1000, 1000).reserve(1)
+
+
+def test_call_larger_than_budget_runs_once_it_is_full(clock):
+    budget = TokenBudget("ai_tokens:ip", 1000, 1000)
+    budget.reserve(5000)
+    assert budget.reserved == 1000
+
+    with pytest.raises(HTTPException):
+        TokenBudget("ai_tokens:ip", 1000, 1000).reserve(5000)
+    clock.now += 1000
+    TokenBudget("ai_tokens:ip", 1000, 1000).reserve(5000)
+
+
+def test_clients_have_separate_budgets(clock):
+    TokenBudget("ai_tokens:a", 1000, 1000).reserve(1000)
+    TokenBudget("ai_tokens:b", 1000, 1000).reserve(1000)
+
+
+def test_claude_usage_is_accumulated():
+    service = ClaudeService()
+    service._record_usage(SimpleNamespace(usage=SimpleNamespace(input_tokens=1200, output_tokens=300)))
+    service._record_usage(SimpleNamespace(usage=SimpleNamespace(input_tokens=800, output_tokens=None)))
+    service._record_usage(SimpleNamespace())
+    assert service.tokens_used == 2300
+    assert ClaudeService.estimate_tokens("step2_analysis", calls=3) == 3 * ClaudeService.TOKEN_ESTIMATES["step2_analysis"]
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Test that uploads are streamed to disk, hashed and parsed from the stored file."""
+
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from app.models import DocumentBlob, Project, UploadedDocument
+from app.routers import documents
+
+PROCEDURE = "Obieg faktur\nFaktury są skanowane i przepisywane ręcznie.\n".encode("utf-8")
+COSTS = "Proces;Koszt\nFakturowanie;12,5\nKsięgowość;4,0\n".encode("cp1250")
+
+
+@pytest.fixture
+def project_id(Session):
+    with Session() as db:
+        db.add(Project(id=1, name="Audyt", client_name="Klient SA"))
+        db.commit()
+    return 1
+
+
+def upload(client, *files):
+    return client.post(
+        "/api/projects/1/documents/upload",
+        files=[("files", (filename, content)) for filename, content in files]
+    )
+
+
+def test_upload_is_stored_hashed_and_parsed(client, Session, project_id, analyzed, monkeypatch):
+    # Several chunks per file
+    monkeypatch.setattr(documents, "UPLOAD_CHUNK_SIZE", 16)
+    response = upload(client, ("procedura.txt", PROCEDURE), ("koszty.csv", COSTS))
+    assert response.status_code == 200, response.text
+    assert [file["filename"] for file in response.json()["files"]] == ["procedura.txt", "koszty.csv"]
+
+    (parsed,) = analyzed
+    assert parsed[0]["content"] == PROCEDURE.decode("utf-8")
+    assert (parsed[1]["encoding"], parsed[1]["rows"]) == ("cp1250", 2)
+
+    with Session() as db:
+        stored = db.query(UploadedDocument).order_by(UploadedDocument.id).all()
+        assert [(doc.file_size, doc.content_hash) for doc in stored] == [
+            (len(content), hashlib.sha256(content).hexdigest()) for content in (PROCEDURE, COSTS)
+        ]
+        assert [Path(doc.file_path).read_bytes() for doc in stored] == [PROCEDURE, COSTS]
+        assert db.query(DocumentBlob).count() == 2
+    assert not any(Path("uploaded_documents/blobs/incoming").iterdir())
+
+
+def test_size_limit_is_enforced_on_the_bytes_received(client, Session, project_id, analyzed, monkeypatch):
+    monkeypatch.setattr(documents, "UPLOAD_CHUNK_SIZE", 16)
+    monkeypatch.setattr(documents, "MAX_FILE_SIZE", 64)
+    response = upload(client, ("procedura.txt", PROCEDURE), ("duzy.txt", b"x" * 65))
+
+    assert response.status_code == 400
+    assert "too large" in response.json()["message"]
+    assert not analyzed
+    with Session() as db:
+        assert db.query(UploadedDocument).count() == 0
+        assert db.query(DocumentBlob).count() == 0
+    assert not any(Path("uploaded_documents/blobs/incoming").iterdir())
+
+
+def test_total_limit_counts_every_file(client, Session, project_id, analyzed, monkeypatch):
+    monkeypatch.setattr(documents, "MAX_TOTAL_SIZE", len(PROCEDURE) + 10)
+    response = upload(client, ("procedura.txt", PROCEDURE), ("koszty.csv", COSTS))
+
+    assert response.status_code == 400
+    assert "Total file size" in response.json()["message"]
+    with Session() as db:
+        assert db.query(UploadedDocument).count() == 0
+
+
+def test_empty_file_is_rejected(client, project_id, analyzed):
+    response = upload(client, ("pusty.txt", b""))
+    assert response.status_code == 400
+    assert "empty" in response.json()["message"]
@@ -24,6 +24,7 @@ export default function DocumentUploadInterface({ projectId, onComplete }: Docum
     'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': ['.xlsx'],
     'application/vnd.ms-excel': ['.xls'],
     'application/pdf': ['.pdf'],
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': ['.docx'],
     'text/plain': ['.txt'],
     'text/markdown': ['.md'],
     'text/csv': ['.csv']
@@ -65,7 +66,7 @@ export default function DocumentUploadInterface({ projectId, onComplete }: Docum
   const handleFiles = (newFiles: File[]) => {
     const validFiles = newFiles.filter(file => {
       const ext = '.' + file.name.split('.').pop()?.toLowerCase();
-      const validExts = ['.xlsx', '.xls', '.pdf', '.txt', '.md', '.csv'];
+      const validExts = ['.xlsx', '.xls', '.pdf', '.docx', '.txt', '.md', '.csv'];
       return validExts.includes(ext);
     });
 
@@ -162,7 +163,7 @@ export default function DocumentUploadInterface({ projectId, onComplete }: Docum
           Prześlij dokumenty do analizy
         </h2>
         <p className="text-gray-400 mb-6">
-          Możesz przesłać pliki Excel, PDF, TXT, MD lub CSV zawierające informacje o firmie i procesach.
+          Możesz przesłać pliki Excel, PDF, Word, TXT, MD lub CSV zawierające informacje o firmie i procesach.
           Claude automatycznie wyciągnie dane i zmapuje je na formularz audytowy.
         </p>
 
@@ -194,12 +195,12 @@ export default function DocumentUploadInterface({ projectId, onComplete }: Docum
                   type="file"
                   multiple
                   onChange={handleFileInput}
-                  accept=".xlsx,.xls,.pdf,.txt,.md,.csv"
+                  accept=".xlsx,.xls,.pdf,.docx,.txt,.md,.csv"
                   className="hidden"
                 />
               </label>
               <p className="text-sm text-gray-500 mt-4">
-                Wspierane: Excel (.xlsx, .xls), PDF, TXT, Markdown (.md), CSV
+                Wspierane: Excel (.xlsx, .xls), PDF, Word (.docx), TXT, Markdown (.md), CSV
               </p>
               <p className="text-xs text-gray-600 mt-2">
                 Maksymalnie 10 plików, 50MB na plik, 200MB łącznie